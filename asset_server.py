@@ -0,0 +1,213 @@
+"""Embedded HTTP server for the kiosk screens and their assets
+
+The waiting and transition screens used to load over file://, so Chrome
+re-read the Korean-named PNG/MP4 assets from disk on every navigation.
+The server keeps them in memory, marks them immutable so Chrome serves
+repeat loads from its own cache, and answers Range requests so the
+transition video can stream and seek.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+import urllib.parse
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Tuple
+
+# Screens and assets loaded into memory at startup
+KIOSK_ASSETS = (
+    "waiting_screen.html",
+    "transition_screen.html",
+    "res/Gems_대기화면_bg.png",
+    "res/Gems_대기화면_btn.png",
+    "res/Gems 트랜지션.mp4",
+    "res/Gems 트랜지션.gif",
+    "res/GEMS_print_btn.png",
+)
+
+# Transition variants from `python transition_assets.py build`, when present
+OPTIONAL_ASSETS = (
+    "res/transition/transition.webm",
+    "res/transition/sprite.jpg",
+    "res/transition/sprite.json",
+)
+
+
+class Asset:
+    """One file held in memory with its validators"""
+
+    def __init__(self, data: bytes, content_type: str, mtime: float):
+        self.data = data
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single 'bytes=' range, None if unsatisfiable"""
+    if not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, _, end_s = header[6:].strip().partition("-")
+    try:
+        if start_s == "":
+            # Suffix range: last N bytes
+            length = int(end_s)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "GemsAssets/1.0"
+
+    def do_OPTIONS(self):
+        # Private Network Access preflight from the Gemini page
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Private-Network", "true")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head: bool):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).lstrip("/")
+        asset = self.server.assets.get(path)
+        if asset is None:
+            self.send_error(404)
+            return
+
+        if self.headers.get("If-None-Match") == asset.etag:
+            self.send_response(304)
+            self._common_headers(asset)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        size = len(asset.data)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        if range_header:
+            byte_range = parse_range(range_header, size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self._common_headers(asset)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not head:
+            self.wfile.write(memoryview(asset.data)[start:end + 1])
+
+    def _common_headers(self, asset: Asset):
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.send_header("ETag", asset.etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Private-Network", "true")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class AssetServer:
+    """Serves a fixed set of files under root from memory on 127.0.0.1"""
+
+    def __init__(self, root: str, assets: Iterable[str] = KIOSK_ASSETS,
+                 optional_assets: Iterable[str] = OPTIONAL_ASSETS,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+        for relative_path in assets:
+            self.add(relative_path)
+        for relative_path in optional_assets:
+            if os.path.exists(os.path.join(root, relative_path)):
+                self.add(relative_path)
+        self._server = _Server((host, port), _AssetHandler)
+        self._server.assets = self.assets
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, relative_path: str) -> bool:
+        """Load a file under root into memory; False if it is missing"""
+        full_path = os.path.join(self.root, relative_path)
+        try:
+            with open(full_path, "rb") as f:
+                data = f.read()
+            mtime = os.path.getmtime(full_path)
+        except OSError as e:
+            print(f"Asset not loaded: {relative_path} ({e})")
+            return False
+        content_type = mimetypes.guess_type(relative_path)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        self.assets[relative_path.replace(os.sep, "/")] = Asset(data, content_type, mtime)
+        return True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, relative_path: str) -> str:
+        return f"{self.base_url}/{urllib.parse.quote(relative_path.replace(os.sep, '/'))}"
+
+    def start(self) -> "AssetServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="asset-server", daemon=True)
+        self._thread.start()
+        total = sum(len(a.data) for a in self.assets.values())
+        print(f"Asset server on {self.base_url} ({len(self.assets)} files, {total / 2**20:.1f} MB in memory)")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_shared_server = None
+
+
+def get_asset_server() -> Optional[AssetServer]:
+    """Process-wide server for the kiosk screens; None if it can't start"""
+    global _shared_server
+    if _shared_server is None:
+        try:
+            root = os.path.dirname(os.path.abspath(__file__))
+            _shared_server = AssetServer(root).start()
+        except OSError as e:
+            print(f"Asset server unavailable, using file:// pages: {e}")
+            return None
+    return _shared_server
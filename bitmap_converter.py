@@ -1,7 +1,17 @@
 """Convert images to bitmap format for thermal printer"""
 
-from PIL import Image
+from PIL import Image, ImageChops
 import os
+from typing import Iterator
+
+# Rows per band when a receipt is streamed to the printer: one 24-dot text line
+BAND_ROWS = 24
+
+def to_bitmap(img: Image.Image) -> Image.Image:
+    """Threshold an image to 1-bit (black and white) in memory"""
+    if img.mode == '1':
+        return img
+    return img.convert('L').point(lambda x: 0 if x < 128 else 255, '1')
 
 def convert_to_bitmap(input_path: str, output_path: str = None) -> str:
     """Convert image to 1-bit BMP format for thermal printer
@@ -21,11 +31,8 @@ def convert_to_bitmap(input_path: str, output_path: str = None) -> str:
         # Open image
         img = Image.open(input_path)
         
-        # Convert to grayscale first
-        img_gray = img.convert('L')
-        
         # Convert to 1-bit (black and white)
-        img_bw = img_gray.point(lambda x: 0 if x < 128 else 255, '1')
+        img_bw = to_bitmap(img)
         
         # Save as BMP
         img_bw.save(output_path, 'BMP')
@@ -51,6 +58,139 @@ def get_thermal_printer_width():
     # HMK-072 is typically 80mm
     return 576
 
+def to_thermal_bitmap(img: Image.Image, crop_left: int = 0, width: int = None) -> Image.Image:
+    """Convert an image to a 1-bit bitmap at the printer's dot width
+    
+    Args:
+        img: Source image (any mode)
+        crop_left: Columns to drop from the left edge (printer margin)
+        width: Output width in dots (default: printer width)
+        
+    Returns:
+        1-bit image exactly width dots wide, padded white on the right
+    """
+    if width is None:
+        width = get_thermal_printer_width()
+    
+    img_bw = to_bitmap(img)
+    
+    # Take exactly `width` columns starting at crop_left
+    bitmap = Image.new('1', (width, img_bw.height), 1)
+    bitmap.paste(img_bw.crop((crop_left, 0, min(img_bw.width, crop_left + width), img_bw.height)), (0, 0))
+    return bitmap
+
+def pack_raster(bitmap: Image.Image) -> bytes:
+    """Encode a 1-bit bitmap as an ESC/POS raster command (GS v 0)
+    
+    Args:
+        bitmap: 1-bit image, width a multiple of 8
+        
+    Returns:
+        Command bytes ready to send to the printer
+    """
+    if bitmap.mode != '1':
+        bitmap = bitmap.convert('1')
+    width, height = bitmap.size
+    if width % 8:
+        raise ValueError(f"Raster width must be a multiple of 8, got {width}")
+    if height == 0:
+        return b""
+    
+    # PIL packs 1-bit rows MSB first with 1 = white; the printer wants 1 = black
+    data = ImageChops.invert(bitmap).tobytes()
+    width_bytes = width // 8
+    header = bytes([0x1D, 0x76, 0x30, 0x00,
+                    width_bytes & 0xFF, width_bytes >> 8,
+                    height & 0xFF, height >> 8])
+    return header + data
+
+class RasterSegment:
+    """A horizontal strip of a receipt, kept as a bitmap and as packed raster bytes"""
+    
+    def __init__(self, bitmap: Image.Image):
+        self._bitmap = bitmap
+        self._packed = None
+        self._optimized = None
+        self._half_height = None
+        self.width, self.height = bitmap.size
+    
+    @classmethod
+    def from_packed(cls, packed: bytes, width: int, height: int) -> 'RasterSegment':
+        """Segment from a GS v 0 command rendered elsewhere (the bitmap is decoded on demand)"""
+        segment = cls.__new__(cls)
+        segment._bitmap = None
+        segment._packed = packed
+        segment._optimized = None
+        segment._half_height = None
+        segment.width, segment.height = width, height
+        return segment
+    
+    @property
+    def bitmap(self) -> Image.Image:
+        if self._bitmap is None:
+            # Raster bits are 1 = black; PIL's 1-bit images are 1 = white
+            raster = Image.frombytes('1', (self.width, self.height), self._packed[8:])
+            self._bitmap = ImageChops.invert(raster)
+        return self._bitmap
+    
+    @property
+    def packed(self) -> bytes:
+        """GS v 0 command for this strip (packed once, then reused)"""
+        if self._packed is None:
+            self._packed = pack_raster(self._bitmap)
+        return self._packed
+    
+    @property
+    def optimized(self) -> bytes:
+        """packed with white rows turned into feeds and white right columns dropped"""
+        if self._optimized is None:
+            from raster_optimizer import optimize_raster
+            self._optimized = optimize_raster(self.packed)
+        return self._optimized
+    
+    def bands(self, band_rows: int = BAND_ROWS) -> Iterator['RasterSegment']:
+        """This strip as segments of at most band_rows rows, top to bottom"""
+        if self.height <= band_rows:
+            yield self
+            return
+        packed = self.packed
+        width_bytes = self.width // 8
+        for top in range(0, self.height, band_rows):
+            rows = min(band_rows, self.height - top)
+            header = packed[:4] + bytes([width_bytes & 0xFF, width_bytes >> 8, rows & 0xFF, rows >> 8])
+            data = packed[8 + top * width_bytes:8 + (top + rows) * width_bytes]
+            yield RasterSegment.from_packed(header + data, self.width, rows)
+    
+    @property
+    def half_height(self) -> bytes:
+        """optimized at half the rows, printed in double-height mode"""
+        if self._half_height is None:
+            from raster_optimizer import halve_height, optimize_raster
+            self._half_height = optimize_raster(halve_height(self.packed))
+        return self._half_height
+
+def iter_raster_bands(img: Image.Image, crop_left: int = 0, band_rows: int = BAND_ROWS,
+                      top: int = 0, bottom: int = None) -> Iterator[RasterSegment]:
+    """Convert rows top..bottom of img to printer rasters, one band at a time
+    
+    Each band is converted only when it is asked for, so the printer can be
+    busy with the first bands while the rest of the image is converted.
+    """
+    bottom = img.height if bottom is None else bottom
+    for y in range(top, bottom, band_rows):
+        strip = img.crop((0, y, img.width, min(y + band_rows, bottom)))
+        yield RasterSegment(to_thermal_bitmap(strip, crop_left=crop_left))
+
+def stack_segments(segments) -> Image.Image:
+    """Join raster segments top to bottom into one bitmap"""
+    width = max(seg.bitmap.width for seg in segments)
+    img = Image.new('1', (width, sum(seg.height for seg in segments)), 1)
+    y = 0
+    for seg in segments:
+        img.paste(seg.bitmap, (0, y))
+        y += seg.height
+    return img
+
 def create_test_bitmap():
     """Create a simple test bitmap"""
     # Create a simple black and white image
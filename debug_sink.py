@@ -0,0 +1,78 @@
+"""Asynchronous writer for debug image artifacts (thermal_print.png etc.)"""
+
+import queue
+import threading
+from typing import Callable, Union
+
+from PIL import Image
+
+
+class DebugSink:
+    """Saves images on a background thread so the print path never waits on disk
+
+    Images can be passed directly or as a callable producing the image, so
+    that composing the artifact also happens off the print path.
+    """
+
+    def __init__(self, enabled: bool = True, max_pending: int = 8):
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def save(self, image: Union[Image.Image, Callable[[], Image.Image]], path: str, format: str = 'PNG') -> bool:
+        """Queue an image to be written to path
+
+        Returns:
+            True if queued, False if disabled or the queue is full (artifact dropped)
+        """
+        if not self.enabled:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((image, path, format))
+            return True
+        except queue.Full:
+            print(f"Debug sink busy, skipped {path}")
+            return False
+
+    def flush(self, timeout: float = None):
+        """Block until every queued artifact has been written"""
+        if self._thread is None:
+            return
+        if timeout is None:
+            self._queue.join()
+            return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        done.wait(timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="debug-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            image, path, format = self._queue.get()
+            try:
+                if callable(image):
+                    image = image()
+                image.save(path, format)
+                print(f"Debug image saved to: {path}")
+            except Exception as e:
+                print(f"Error saving debug image {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_shared_sink = None
+
+
+def get_debug_sink() -> DebugSink:
+    """Process-wide sink shared by every ReceiptPrinter"""
+    global _shared_sink
+    if _shared_sink is None:
+        _shared_sink = DebugSink()
+    return _shared_sink
@@ -0,0 +1,177 @@
+"""Single owner of the WebDriver session
+
+Selenium drivers are not thread-safe, so every browser call goes through
+one actor thread that serves a command queue. Page state the kiosk polls
+(exit/test/print flags, conversation end, transition end, URL) is read in a
+single execute_script round trip that returns a snapshot, and concurrent
+snapshot requests share that one round trip.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+# Flags that are consumed when read
+ONE_SHOT_FLAGS = ('exitCommand', 'testCommand', 'printButtonClicked')
+STATE_FLAGS = ('gemsConversationEnded', 'transitionComplete')
+
+SNAPSHOT_SCRIPT = """
+var s = {url: window.location.href};
+%s
+%s
+return s;
+""" % (
+    "\n".join(f"s.{name} = !!window.{name}; if (s.{name}) window.{name} = false;" for name in ONE_SHOT_FLAGS),
+    "\n".join(f"s.{name} = !!window.{name};" for name in STATE_FLAGS),
+)
+
+
+class DriverActor:
+    """Runs every WebDriver command on one thread"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.round_trips = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending_snapshot: Optional[Future] = None
+        self._thread = threading.Thread(target=self._serve, name="driver-actor", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args) to run on the actor thread"""
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # Already on the actor thread (nested call), run inline
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        else:
+            self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Run fn(*args) on the actor thread and return its result"""
+        return self.submit(fn, *args, **kwargs).result(timeout)
+
+    def execute_script(self, script: str, *args):
+        return self.call(self._execute, script, *args)
+
+    def get(self, url: str):
+        return self.call(self._get, url)
+
+    @property
+    def current_url(self) -> str:
+        return self.call(lambda: self.driver.current_url)
+
+    def _execute(self, script, *args):
+        self.round_trips += 1
+        return self.driver.execute_script(script, *args)
+
+    def _get(self, url):
+        self.round_trips += 1
+        return self.driver.get(url)
+
+    def snapshot(self, timeout: Optional[float] = None) -> Dict:
+        """All polled page state in one round trip
+
+        One-shot flags come back True once and are cleared in the page.
+        Callers that ask while a snapshot is in flight get the same result.
+        """
+        with self._lock:
+            future = self._pending_snapshot
+            if future is None or future.done():
+                future = self.submit(self._execute, SNAPSHOT_SCRIPT)
+                self._pending_snapshot = future
+        return future.result(timeout) or {}
+
+    def stop(self):
+        """Stop serving commands (the driver itself is left open)"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class LatencyDriver:
+    """Stand-in driver whose every call costs a fixed round-trip latency"""
+
+    def __init__(self, latency: float = 0.004):
+        self.latency = latency
+        self.flags = {}
+        self.current_url = "https://gemini.google.com/gem/demo"
+
+    def execute_script(self, script, *args):
+        time.sleep(self.latency)
+        if script is SNAPSHOT_SCRIPT:
+            state = {name: self.flags.pop(name, False) for name in ONE_SHOT_FLAGS}
+            state.update({name: self.flags.get(name, False) for name in STATE_FLAGS})
+            state['url'] = self.current_url
+            return state
+        return False
+
+    def get(self, url):
+        time.sleep(self.latency)
+        self.current_url = url
+
+
+def _poll_individually(actor: DriverActor) -> Dict:
+    """The per-flag polling the kiosk did before snapshots"""
+    flags = {}
+    for name in ONE_SHOT_FLAGS:
+        if actor.execute_script(f"return window.{name} || false;"):
+            actor.execute_script(f"window.{name} = false;")
+            flags[name] = True
+    for name in STATE_FLAGS:
+        flags[name] = bool(actor.execute_script(f"return window.{name} || false;"))
+    flags['url'] = actor.current_url
+    return flags
+
+
+def run_benchmark(duration: float = 2.0, pollers: int = 2, latency: float = 0.004) -> Dict:
+    """Round trips per second for per-flag polling vs snapshots"""
+    results = {}
+    for label, poll in (("individual", _poll_individually), ("snapshot", DriverActor.snapshot)):
+        actor = DriverActor(LatencyDriver(latency))
+        polls = [0]
+        deadline = time.perf_counter() + duration
+
+        def worker():
+            while time.perf_counter() < deadline:
+                poll(actor)
+                polls[0] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(pollers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        actor.stop()
+        results[label] = {
+            "polls_per_s": round(polls[0] / duration, 1),
+            "round_trips_per_s": round(actor.round_trips / duration, 1),
+            "round_trips_per_poll": round(actor.round_trips / max(1, polls[0]), 2),
+        }
+    return results
+
+
+# Benchmark
+if __name__ == "__main__":
+    import json
+
+    print("Polling page state from 2 threads against a 4ms-latency driver...")
+    print(json.dumps(run_benchmark(), indent=2))
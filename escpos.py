@@ -0,0 +1,98 @@
+"""Buffered ESC/POS command builder"""
+
+ESC = b"\x1B"
+GS = b"\x1D"
+FS = b"\x1C"
+LF = b"\n"
+
+
+class EscPosBuilder:
+    """Collects ESC/POS commands in memory so a whole receipt is one write
+
+    Exposes the same methods and constants as the ThermalPrinter classes
+    (set_align, set_text_size, print_line, feed_lines, cut_paper, ...), so
+    receipt layouts can be composed onto either one.
+    """
+
+    # Alignment
+    ALIGN_LEFT = 0
+    ALIGN_CENTER = 1
+    ALIGN_RIGHT = 2
+
+    # Cut modes
+    CUT_FULL = 0
+    CUT_PARTIAL = 1
+
+    # ESC R international character set
+    CHARSET_KOREA = 13
+
+    def __init__(self, encoding: str = 'cp949', korean: bool = True):
+        """
+        Args:
+            encoding: Text encoding sent to the printer (cp949 for Korean)
+            korean: Select the Korean character set and double-byte mode
+        """
+        self.encoding = encoding
+        self.korean = korean
+        self.buffer = bytearray()
+        self.initialize()
+
+    def initialize(self):
+        """Reset the printer (ESC @) and select the Korean code page"""
+        self.buffer += ESC + b"@"
+        if self.korean:
+            self.buffer += ESC + b"R" + bytes([self.CHARSET_KOREA])
+            self.buffer += FS + b"&"
+        return self
+
+    def set_align(self, align: int):
+        """Set text alignment (0=left, 1=center, 2=right)"""
+        self.buffer += ESC + b"a" + bytes([align])
+        return self
+
+    def set_bold(self, bold: bool):
+        """Set bold text"""
+        self.buffer += ESC + b"E" + bytes([1 if bold else 0])
+        return self
+
+    def set_text_size(self, width: int = 1, height: int = 1):
+        """Set text size multiplier (1-8)"""
+        width = min(max(width, 1), 8)
+        height = min(max(height, 1), 8)
+        self.buffer += GS + b"!" + bytes([((width - 1) << 4) | (height - 1)])
+        return self
+
+    def print_text(self, text: str, encoding: str = None):
+        """Append text without a newline"""
+        self.buffer += text.encode(encoding or self.encoding, errors='replace')
+        return self
+
+    def print_line(self, text: str = ""):
+        """Append text with newline"""
+        self.print_text(text)
+        self.buffer += LF
+        return self
+
+    def feed_lines(self, lines: int):
+        """Feed paper by number of lines (ESC d n)"""
+        while lines > 0:
+            step = min(lines, 255)
+            self.buffer += ESC + b"d" + bytes([step])
+            lines -= step
+        return self
+
+    def cut_paper(self, mode: int = CUT_PARTIAL):
+        """Cut paper (0=full, 1=partial)"""
+        self.buffer += GS + b"V" + bytes([1 if mode == self.CUT_PARTIAL else 0])
+        return self
+
+    def raw(self, data: bytes):
+        """Append pre-encoded command bytes"""
+        self.buffer += data
+        return self
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
+
+    def __len__(self):
+        return len(self.buffer)
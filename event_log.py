@@ -0,0 +1,192 @@
+"""Append-only visitor event log with incremental rollups (SQLite)
+
+Every visitor cycle appends events (visit, print, test_print, parse_failure,
+exit) with the parsed receipt fields and stage timings. Each write also
+bumps the hourly and per-type rollup rows in the same transaction, so the
+dashboard queries read a handful of rows no matter how long the event runs.
+
+    python event_log.py                     hourly rollup + type distribution
+    python event_log.py export out.csv      hourly rollup as CSV
+    python event_log.py export out.json     both rollups as JSON
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gems_events.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL NOT NULL,
+    kind        TEXT NOT NULL,
+    name        TEXT,
+    type_number TEXT,
+    type_name   TEXT,
+    parse_ms    REAL,
+    render_ms   REAL,
+    print_ms    REAL,
+    latency_ms  REAL,
+    ok          INTEGER NOT NULL DEFAULT 1,
+    error       TEXT,
+    data        TEXT
+);
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    hour            TEXT PRIMARY KEY,
+    visits          INTEGER NOT NULL DEFAULT 0,
+    prints          INTEGER NOT NULL DEFAULT 0,
+    test_prints     INTEGER NOT NULL DEFAULT 0,
+    exits           INTEGER NOT NULL DEFAULT 0,
+    parse_failures  INTEGER NOT NULL DEFAULT 0,
+    print_failures  INTEGER NOT NULL DEFAULT 0,
+    parse_ms_sum    REAL NOT NULL DEFAULT 0,
+    parse_count     INTEGER NOT NULL DEFAULT 0,
+    latency_ms_sum  REAL NOT NULL DEFAULT 0,
+    latency_ms_max  REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rollup_types (
+    type_number TEXT PRIMARY KEY,
+    type_name   TEXT,
+    prints      INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Hourly counter bumped by each event kind
+KIND_COUNTERS = {
+    "visit": "visits",
+    "print": "prints",
+    "test_print": "test_prints",
+    "exit": "exits",
+    "parse_failure": "parse_failures",
+}
+
+
+def hour_key(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:00", time.localtime(ts))
+
+
+class EventLog:
+    """SQLite-backed event store; safe to call from any thread"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(rollup_hourly)")}
+        if "parse_count" not in columns:
+            # Log written before parse timings were counted separately from prints
+            self._conn.execute("ALTER TABLE rollup_hourly ADD COLUMN parse_count INTEGER NOT NULL DEFAULT 0")
+
+    def record(self, kind: str, data: Optional[Dict] = None, timings: Optional[Dict[str, float]] = None,
+               ok: bool = True, error: Optional[str] = None, ts: Optional[float] = None) -> bool:
+        """Append one event and update the rollups; never raises"""
+        ts = time.time() if ts is None else ts
+        data = data or {}
+        timings = timings or {}
+        ms = {key: timings[key] * 1000.0 for key in ("parse", "render", "print", "latency") if key in timings}
+        hour = hour_key(ts)
+        counter = KIND_COUNTERS.get(kind)
+        print_failed = kind == "print" and not ok
+
+        try:
+            with self._lock:
+                conn = self._conn
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT INTO events (ts, kind, name, type_number, type_name, parse_ms, render_ms,"
+                    " print_ms, latency_ms, ok, error, data) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                    (ts, kind, data.get("이름"), data.get("번호"), data.get("타입명"),
+                     ms.get("parse"), ms.get("render"), ms.get("print"), ms.get("latency"),
+                     int(ok), error, json.dumps(data, ensure_ascii=False) if data else None))
+                conn.execute("INSERT OR IGNORE INTO rollup_hourly (hour) VALUES (?)", (hour,))
+                if counter:
+                    conn.execute(f"UPDATE rollup_hourly SET {counter} = {counter} + 1 WHERE hour = ?", (hour,))
+                if print_failed:
+                    conn.execute("UPDATE rollup_hourly SET print_failures = print_failures + 1 WHERE hour = ?", (hour,))
+                if "parse" in ms:
+                    conn.execute("UPDATE rollup_hourly SET parse_ms_sum = parse_ms_sum + ?,"
+                                 " parse_count = parse_count + 1 WHERE hour = ?", (ms["parse"], hour))
+                if kind == "print" and "latency" in ms:
+                    conn.execute("UPDATE rollup_hourly SET latency_ms_sum = latency_ms_sum + ?,"
+                                 " latency_ms_max = MAX(latency_ms_max, ?) WHERE hour = ?",
+                                 (ms["latency"], ms["latency"], hour))
+                if kind == "print" and data.get("번호"):
+                    conn.execute("INSERT INTO rollup_types (type_number, type_name, prints) VALUES (?, ?, 1)"
+                                 " ON CONFLICT(type_number) DO UPDATE SET prints = prints + 1,"
+                                 " type_name = excluded.type_name",
+                                 (str(data["번호"]), data.get("타입명")))
+                conn.execute("COMMIT")
+            return True
+        except Exception as e:
+            print(f"Event log write failed: {e}")
+            try:
+                self._conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            return False
+
+    def hourly(self) -> List[Dict]:
+        """Visitors, prints, failures and mean/max print latency per hour"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM rollup_hourly ORDER BY hour")
+            columns = [c[0] for c in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for row in rows:
+            row["parse_ms_avg"] = round(row["parse_ms_sum"] / row["parse_count"], 1) if row["parse_count"] else None
+            row["latency_ms_avg"] = round(row["latency_ms_sum"] / row["prints"], 1) if row["prints"] else None
+        return rows
+
+    def types(self) -> List[Dict]:
+        """Printed receipts per personality type"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT type_number, type_name, prints FROM rollup_types ORDER BY prints DESC").fetchall()
+        return [{"type_number": n, "type_name": name, "prints": prints} for n, name, prints in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def export(log: EventLog, output_path: str):
+    if output_path.endswith(".json"):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"hourly": log.hourly(), "types": log.types()}, f, ensure_ascii=False, indent=2)
+    else:
+        rows = log.hourly()
+        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["hour"])
+            writer.writeheader()
+            writer.writerows(rows)
+    print(f"Exported rollups to {output_path}")
+
+
+def print_summary(log: EventLog):
+    print(f"{'hour':16s} {'visits':>6s} {'prints':>6s} {'tests':>5s} {'exits':>5s} "
+          f"{'parse✗':>6s} {'print✗':>6s} {'parse ms':>9s} {'latency ms':>10s} {'max':>8s}")
+    for row in log.hourly():
+        print(f"{row['hour']:16s} {row['visits']:6d} {row['prints']:6d} {row['test_prints']:5d} "
+              f"{row['exits']:5d} {row['parse_failures']:6d} {row['print_failures']:6d} "
+              f"{row['parse_ms_avg'] or 0:9.0f} {row['latency_ms_avg'] or 0:10.0f} {row['latency_ms_max']:8.0f}")
+    print("\nType distribution:")
+    for row in log.types():
+        print(f"  #{row['type_number']:>2s} {row['type_name'] or '':24s} {row['prints']:5d}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = os.environ.get("GEMS_EVENT_DB", DEFAULT_DB_PATH)
+    event_log = EventLog(db_path)
+    if args and args[0] == "export":
+        export(event_log, args[1] if len(args) > 1 else "gems_rollups.csv")
+    else:
+        print_summary(event_log)
@@ -0,0 +1,109 @@
+"""On-disk cache of the resolved gem URL, per Chrome profile
+
+Discovering the gem means opening Gemini's sidebar and clicking the first
+gem on every launch. The resolved URL is stored next to the profile it was
+found with and trusted on the next boot; the kiosk revalidates it later,
+off the critical path, when a visitor opens the gem anyway.
+"""
+
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+
+CACHE_FILENAME = "gem_url_cache.json"
+GEM_URL_PATTERN = re.compile(r"^https://gemini\.google\.com/gem/[A-Za-z0-9_-]+")
+
+# Checked on the opened gem page: still on the gem, and the chat input is there
+GEM_PAGE_CHECK_SCRIPT = """
+return {
+    url: window.location.href,
+    ready: !!document.querySelector('rich-textarea, div[contenteditable="true"]')
+};
+"""
+
+
+def gem_id(url: str) -> Optional[str]:
+    match = GEM_URL_PATTERN.match(url or "")
+    return match.group(0).rsplit("/", 1)[-1] if match else None
+
+
+class GemUrlCache:
+    """Resolved gem URL plus validation metadata, stored in the profile dir"""
+
+    def __init__(self, profile_dir: str, max_age: float = 30 * 24 * 3600):
+        self.profile_dir = profile_dir
+        self.path = os.path.join(profile_dir, CACHE_FILENAME)
+        self.max_age = max_age
+        self.entry: Optional[Dict] = self._load()
+
+    def _load(self) -> Optional[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not gem_id(entry.get('url')):
+            return None
+        return entry
+
+    def _save(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get_url(self) -> Optional[str]:
+        """Cached URL if present and validated recently enough"""
+        if not self.entry:
+            return None
+        if time.time() - self.entry.get('validated_at', 0) > self.max_age:
+            print("Cached gem URL is too old, rediscovering")
+            return None
+        return self.entry['url']
+
+    def store(self, url: str, gem_name: Optional[str] = None):
+        """Remember a freshly discovered gem URL"""
+        if not gem_id(url):
+            print(f"Not caching non-gem URL: {url}")
+            return
+        now = time.time()
+        self.entry = {
+            "url": url,
+            "gem_name": gem_name,
+            "resolved_at": now,
+            "validated_at": now,
+            "failures": 0,
+        }
+        self._save()
+
+    def mark_validated(self):
+        if self.entry:
+            self.entry['validated_at'] = time.time()
+            self.entry['failures'] = 0
+            self._save()
+
+    def invalidate(self):
+        """Forget the cached URL (gem deleted, moved, or no longer accessible)"""
+        self.entry = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def check_page(self, page: Dict) -> Optional[bool]:
+        """Judge a GEM_PAGE_CHECK_SCRIPT result for the cached gem
+
+        True = gem page is live, False = redirected away from the gem,
+        None = not conclusive yet (page still loading, or not a Gemini page).
+        """
+        if not self.entry:
+            return None
+        if not (page.get('url') or "").startswith("https://gemini.google.com/"):
+            # The kiosk's own waiting/transition screens say nothing about the gem
+            return None
+        if gem_id(page.get('url')) != gem_id(self.entry['url']):
+            return False
+        return True if page.get('ready') else None
@@ -0,0 +1,691 @@
+"""Pluggable generation backends for GeminiParser
+
+GeminiParser only needs "prompt in, response text out". The backends here
+provide that over the real google-generativeai client, over the
+generateContent REST shape (real API or the local FakeGeminiServer), or from
+a record/replay fixture store, so tests and benchmarks can run without the
+network or quota.
+"""
+
+import collections
+import email.utils
+import hashlib
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_MODEL = 'gemini-1.5-flash'
+
+
+class BackendError(Exception):
+    """Raised when a backend could not produce a response"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GeminiBackend:
+    """Interface for anything that can answer a prompt"""
+
+    name = "base"
+
+    def generate(self, prompt: str) -> str:
+        """Return the model's response text for prompt"""
+        raise NotImplementedError
+
+    def warm(self) -> bool:
+        """Open/refresh the connection with a cheap call; False if unsupported"""
+        return False
+
+
+class GenaiBackend(GeminiBackend):
+    """The real google-generativeai client"""
+
+    name = "genai"
+
+    def __init__(self, api_key: str, model_name: str = DEFAULT_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def warm(self) -> bool:
+        # Model metadata lookup: opens the channel without spending generate quota
+        try:
+            self.genai.get_model(f"models/{self.model_name}")
+            return True
+        except Exception as e:
+            print(f"Gemini warm-up failed: {e}")
+            return False
+
+    def generate(self, prompt: str) -> str:
+        try:
+            response = self.model.generate_content(prompt)
+        except Exception as e:
+            # google.api_core errors carry the HTTP status (429 ResourceExhausted, 503 ...)
+            code = getattr(e, 'code', None)
+            status = int(code) if isinstance(code, int) else None
+            raise BackendError(str(e), status=status) from e
+        return response.text
+
+
+class HttpBackend(GeminiBackend):
+    """Speaks the generateContent REST shape over plain HTTP(S)
+
+    Works against the public endpoint
+    (https://generativelanguage.googleapis.com) and against FakeGeminiServer.
+    Idle connections are kept in a small pool and reused, so DNS/TCP/TLS
+    setup is paid once rather than per call (and a warm-up ping's connection
+    serves the next visitor); a connection the server dropped is reopened.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url: str, api_key: str = "", model_name: str = DEFAULT_MODEL,
+                 timeout: float = 30.0, stream: bool = False):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.model_name = model_name
+        self.timeout = timeout
+        self.stream = stream
+        parts = urllib.parse.urlsplit(self.base_url)
+        self._https = parts.scheme == 'https'
+        self._netloc = parts.netloc
+        self._prefix = parts.path
+        self._idle: List[http.client.HTTPConnection] = []
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _url(self, method: str) -> str:
+        url = f"{self._prefix}/v1beta/models/{self.model_name}:{method}"
+        params = []
+        if self.stream:
+            params.append("alt=sse")
+        if self.api_key:
+            params.append(f"key={self.api_key}")
+        return url + ("?" + "&".join(params) if params else "")
+
+    @property
+    def last_connection_fresh(self) -> bool:
+        """Whether this thread's last request had to open a new connection"""
+        return getattr(self._local, 'fresh', True)
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None):
+        """Send over a pooled connection, reopening once if it went stale
+
+        Returns (connection, response); hand both to _finish once the body is read.
+        """
+        for attempt in range(2):
+            with self._pool_lock:
+                conn = self._idle.pop() if self._idle else None
+            fresh = conn is None
+            try:
+                if fresh:
+                    conn_class = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+                    conn = conn_class(self._netloc, timeout=self.timeout)
+                    conn.connect()
+                headers = {'Content-Type': 'application/json'} if body is not None else {}
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                self._local.fresh = fresh
+                return conn, response
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                # Only a reused connection that went stale is worth a second try
+                if fresh or attempt or isinstance(e, TimeoutError):
+                    raise BackendError(f"Connection failed: {e}")
+
+    def _finish(self, conn, response, reusable: bool = True):
+        """Return the connection to the pool unless the server is closing it"""
+        if reusable and not response.will_close:
+            with self._pool_lock:
+                self._idle.append(conn)
+        else:
+            conn.close()
+
+    def generate(self, prompt: str) -> str:
+        method = 'streamGenerateContent' if self.stream else 'generateContent'
+        body = json.dumps({"contents": [{"parts": [{"text": prompt}]}]}).encode('utf-8')
+        conn, response = self._request('POST', self._url(method), body)
+        reusable = False
+        try:
+            if response.status >= 400:
+                response.read()
+                reusable = True
+                raise BackendError(f"HTTP {response.status}: {response.reason}", status=response.status,
+                                   retry_after=parse_retry_after(response.getheader('Retry-After')))
+            try:
+                if self.stream:
+                    text = self._read_stream(response)
+                else:
+                    text = _extract_text(json.loads(response.read().decode('utf-8')))
+            except ValueError as e:
+                # The server answered, just not with a generateContent payload
+                raise BackendError(f"Unreadable response: {e}", status=response.status)
+            reusable = True
+            return text
+        except (http.client.HTTPException, OSError) as e:
+            raise BackendError(f"Connection failed: {e}")
+        finally:
+            self._finish(conn, response, reusable)
+
+    def warm(self) -> bool:
+        # models.get is cheap and doesn't count against generate quota
+        path = f"{self._prefix}/v1beta/models/{self.model_name}"
+        if self.api_key:
+            path += f"?key={self.api_key}"
+        try:
+            conn, response = self._request('GET', path)
+            response.read()
+            self._finish(conn, response)
+            return response.status < 500
+        except (BackendError, http.client.HTTPException, OSError) as e:
+            print(f"Gemini warm-up failed: {e}")
+            return False
+
+    @staticmethod
+    def _read_stream(response) -> str:
+        """Join the text of every server-sent event chunk"""
+        parts = []
+        for raw_line in response:
+            line = raw_line.decode('utf-8').strip()
+            if line.startswith('data:'):
+                parts.append(_extract_text(json.loads(line[5:].strip())))
+        return "".join(parts)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date); None if absent or unreadable"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _extract_text(payload: Dict) -> str:
+    """Pull the response text out of a generateContent payload"""
+    try:
+        parts = payload['candidates'][0]['content']['parts']
+    except (KeyError, IndexError, TypeError):
+        raise ValueError(f"Unexpected response payload: {payload}")
+    return "".join(part.get('text', '') for part in parts)
+
+
+class FixtureBackend(GeminiBackend):
+    """Record/replay store of prompt -> response pairs
+
+    Modes:
+        'replay': answer only from fixtures, a miss raises BackendError
+        'record': call the wrapped backend and write every answer to disk
+        'auto':   replay when a fixture exists, otherwise record
+    """
+
+    name = "fixture"
+
+    def __init__(self, fixture_dir: str, backend: Optional[GeminiBackend] = None, mode: str = 'replay'):
+        if mode not in ('replay', 'record', 'auto'):
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        if mode != 'replay' and backend is None:
+            raise ValueError(f"Fixture mode '{mode}' needs a backend to record from")
+        self.fixture_dir = fixture_dir
+        self.backend = backend
+        self.mode = mode
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    @staticmethod
+    def fixture_key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+    def _path(self, prompt: str) -> str:
+        return os.path.join(self.fixture_dir, f"{self.fixture_key(prompt)}.json")
+
+    def warm(self) -> bool:
+        return self.backend.warm() if self.backend is not None else False
+
+    def generate(self, prompt: str) -> str:
+        path = self._path(prompt)
+        if self.mode != 'record' and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['response']
+        if self.mode == 'replay':
+            raise BackendError(f"No fixture for prompt {self.fixture_key(prompt)}")
+
+        response = self.backend.generate(prompt)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"prompt": prompt, "response": response}, f, ensure_ascii=False, indent=2)
+        return response
+
+
+def default_responder(prompt: str) -> str:
+    """Canned answer used by FakeGeminiServer"""
+    return json.dumps({
+        "이름": "지수",
+        "번호": "1",
+        "타입명": "Bold Creator",
+        "타입_설명": "남다른 시도로 새로운 가치를 만들고, 깊이 있는 전략으로 시장을 이끄는 마케터.",
+        "성향_키워드": "#도전 #전략적 #리더십",
+        "음료": "Negroni",
+        "푸드": "코랄 소스의 랍스터 테일"
+    }, ensure_ascii=False)
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Deep accept backlog so load tests measure the handler, not SYN retries
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # Clients that time out and hang up are part of the tests
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class FakeGeminiServer:
+    """Local HTTP stand-in for the generateContent endpoint
+
+    Args:
+        latency: Seconds to wait before answering
+        jitter: Extra random latency, uniform in [0, jitter]
+        error_rate: Probability of answering with error_status instead
+        error_status: HTTP status used for injected errors (429 adds Retry-After)
+        responder: Function prompt -> response text
+        stream_chunks: Number of SSE chunks for streamGenerateContent
+        chunk_delay: Seconds between streamed chunks
+        quota: (requests, window_seconds) enforced like the API quota, with 429 + Retry-After
+        connect_latency: Seconds added once per new connection (stands in for DNS + TLS setup)
+
+    Set `outage` to True to stand in for a dropped uplink: requests are
+    accepted but never answered, so clients run into their timeouts.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 500,
+                 responder: Optional[Callable[[str], str]] = None, stream_chunks: int = 4,
+                 chunk_delay: float = 0.0, retry_after: float = 1.0,
+                 quota: Optional[Tuple[int, float]] = None, connect_latency: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.responder = responder or default_responder
+        self.stream_chunks = max(1, stream_chunks)
+        self.chunk_delay = chunk_delay
+        self.retry_after = retry_after
+        self.quota = quota
+        self.connect_latency = connect_latency
+        self.connection_count = 0
+        self.outage = False
+        self._admitted: Deque[float] = collections.deque()
+        self.request_count = 0
+        self.error_count = 0
+        self._forced_errors: List[int] = []
+        self._lock = threading.Lock()
+        self._server = _StandInServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, count: int = 1, status: Optional[int] = None):
+        """Force the next count requests to fail with status"""
+        with self._lock:
+            self._forced_errors.extend([status or self.error_status] * count)
+
+    def start(self) -> 'FakeGeminiServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _next_error(self) -> Optional[int]:
+        with self._lock:
+            self.request_count += 1
+            if self._forced_errors:
+                status = self._forced_errors.pop(0)
+            elif self.error_rate and random.random() < self.error_rate:
+                status = self.error_status
+            else:
+                return None
+            self.error_count += 1
+            return status
+
+    def _wait_out_outage(self) -> bool:
+        """Hold a request while the outage lasts; True if it should be dropped"""
+        if not self.outage:
+            return False
+        while self.outage:
+            time.sleep(0.05)
+        return True
+
+    def _quota_retry_after(self) -> Optional[float]:
+        """Seconds until the quota window has room, or None if admitted"""
+        if not self.quota:
+            return None
+        limit, window = self.quota
+        with self._lock:
+            now = time.monotonic()
+            while self._admitted and now - self._admitted[0] >= window:
+                self._admitted.popleft()
+            if len(self._admitted) >= limit:
+                self.request_count += 1
+                self.error_count += 1
+                return self._admitted[0] + window - now
+            self._admitted.append(now)
+            return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+                if server.connect_latency:
+                    time.sleep(server.connect_latency)
+
+            def do_GET(self):
+                if server._wait_out_outage():
+                    self.close_connection = True
+                    return
+                # models.get, used for warm-up pings
+                name = urllib.parse.urlsplit(self.path).path.rsplit('/', 1)[-1]
+                self._send_json(200, {"name": f"models/{name}"})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length).decode('utf-8'))
+                    prompt = "".join(part.get('text', '')
+                                     for content in body.get('contents', [])
+                                     for part in content.get('parts', []))
+                except ValueError:
+                    self._send_json(400, {"error": {"code": 400, "message": "Invalid JSON"}})
+                    return
+                if server._wait_out_outage():
+                    self.close_connection = True
+                    return
+
+                # Quota is checked on arrival, like the real API
+                quota_wait = server._quota_retry_after()
+                if quota_wait is not None:
+                    self._send_json(429, {"error": {"code": 429, "message": "Quota exceeded"}},
+                                    {'Retry-After': f"{quota_wait:.2f}"})
+                    return
+
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+
+                status = server._next_error()
+                if status:
+                    headers = {'Retry-After': str(server.retry_after)} if status == 429 else {}
+                    self._send_json(status, {"error": {"code": status, "message": "Injected error"}}, headers)
+                    return
+
+                text = server.responder(prompt)
+                if ':streamGenerateContent' in self.path:
+                    self._send_stream(text)
+                else:
+                    self._send_json(200, _candidate(text))
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, text):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                size = max(1, -(-len(text) // server.stream_chunks))
+                for start in range(0, len(text), size):
+                    chunk = json.dumps(_candidate(text[start:start + size]), ensure_ascii=False)
+                    self.wfile.write(f"data: {chunk}\r\n\r\n".encode('utf-8'))
+                    self.wfile.flush()
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                self.close_connection = True
+
+        return Handler
+
+
+def _candidate(text: str) -> Dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+class WarmClient(GeminiBackend):
+    """Process-lifetime wrapper that keeps the backend's connection warm
+
+    start() warms the connection in the background at launch; while the
+    kiosk idles a ping is sent every ping_interval seconds so the first
+    visitor after a quiet stretch doesn't pay for connection setup. Every
+    call is timed and classified cold (new connection) or warm.
+    """
+
+    def __init__(self, backend: GeminiBackend, ping_interval: float = 45.0, cold_after: float = 240.0):
+        self.backend = backend
+        self.name = f"warm-{backend.name}"
+        self.ping_interval = ping_interval
+        self.cold_after = cold_after
+        self.pings = 0
+        self.latencies: Dict[str, List[float]] = {"cold": [], "warm": []}
+        self._last_activity = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _innermost(self) -> GeminiBackend:
+        backend = self.backend
+        while getattr(backend, 'backend', None) is not None:
+            backend = backend.backend
+        return backend
+
+    def warm(self) -> bool:
+        ok = self.backend.warm()
+        if ok:
+            self.pings += 1
+            self._last_activity = time.monotonic()
+        return ok
+
+    def generate(self, prompt: str) -> str:
+        idle = time.monotonic() - self._last_activity
+        start = time.perf_counter()
+        try:
+            return self.backend.generate(prompt)
+        finally:
+            elapsed = time.perf_counter() - start
+            fresh = getattr(self._innermost(), 'last_connection_fresh', None)
+            cold = fresh if fresh is not None else idle > self.cold_after
+            self.latencies["cold" if cold else "warm"].append(elapsed)
+            self._last_activity = time.monotonic()
+            print(f"Gemini call {elapsed:.2f}s ({'cold' if cold else 'warm'})")
+
+    def start(self) -> 'WarmClient':
+        """Warm up now (in the background) and keep pinging while idle"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gemini-keepalive", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        self.warm()
+        while not self._stop.wait(min(self.ping_interval, 5.0)):
+            if time.monotonic() - self._last_activity >= self.ping_interval:
+                self.warm()
+
+    def stop(self):
+        self._stop.set()
+
+    def latency_report(self) -> Dict:
+        report = {"pings": self.pings}
+        for kind, values in self.latencies.items():
+            if values:
+                report[kind] = {"calls": len(values),
+                                "mean_ms": round(1000 * statistics.mean(values), 1),
+                                "max_ms": round(1000 * max(values), 1)}
+        return report
+
+
+def create_backend(api_key: str, spec: Optional[str] = None, limited: bool = True) -> GeminiBackend:
+    """Build a backend from a spec string (defaults to $GEMINI_BACKEND)
+
+    Specs:
+        'genai' (default)         real google-generativeai client
+        'http://host:port'        generateContent REST endpoint
+        'fixtures:<dir>'          replay only
+        'record:<dir>'            record answers from the real client
+
+    Backends that reach an API go through the shared rate limiter unless
+    limited is False.
+    """
+    from gemini_limiter import LimitedBackend, get_rate_limiter
+
+    def limit(backend: GeminiBackend) -> GeminiBackend:
+        return LimitedBackend(backend, get_rate_limiter()) if limited else backend
+
+    spec = spec or os.environ.get('GEMINI_BACKEND', 'genai')
+    if spec == 'genai':
+        return limit(GenaiBackend(api_key))
+    if spec.startswith(('http://', 'https://')):
+        return limit(HttpBackend(spec, api_key=api_key))
+    if spec.startswith('fixtures:'):
+        return FixtureBackend(spec.split(':', 1)[1], mode='replay')
+    if spec.startswith('record:'):
+        return FixtureBackend(spec.split(':', 1)[1], backend=limit(GenaiBackend(api_key)), mode='auto')
+    raise ValueError(f"Unknown Gemini backend spec: {spec}")
+
+
+def run_load_test(call: Callable[[], object], total: int = 500, concurrency: int = 32) -> Dict:
+    """Run call() total times across concurrency threads and report latency
+
+    Returns a dict with throughput, latency percentiles (ms) and error count.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    remaining = [total]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                call()
+                ok = True
+            except Exception as e:
+                ok = False
+                err = e
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors.append(err)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "duration_s": round(duration, 3),
+        "rps": round(total / duration, 1) if duration else 0.0,
+        "p50_ms": round(quantiles[49], 1),
+        "p99_ms": round(quantiles[98], 1),
+        "max_ms": round(latencies[-1], 1),
+    }
+
+
+# Load test against the local stand-in
+if __name__ == "__main__":
+    try:
+        from gemini_parser import GeminiParser
+    except ImportError:
+        from gemini_parser_no_pandas import GeminiParser
+
+    conversation = "지수님을 위한 특별한 메뉴를 Gems Station에서 바로 준비해 드리겠습니다."
+
+    with FakeGeminiServer(latency=0.05, jitter=0.05) as server:
+        parser = GeminiParser("", backend=HttpBackend(server.url, timeout=5.0))
+        print("Parse stage, 50-100ms model latency:")
+        print(json.dumps(run_load_test(lambda: parser.parse_conversation(conversation)), indent=2))
+
+    with FakeGeminiServer(latency=0.05, error_rate=0.2, error_status=429) as server:
+        backend = HttpBackend(server.url, timeout=5.0)
+        print("\nRaw backend with 20% injected 429s:")
+        print(json.dumps(run_load_test(lambda: backend.generate(conversation)), indent=2))
+
+    with FakeGeminiServer(latency=2.0) as server:
+        parser = GeminiParser("", backend=HttpBackend(server.url, timeout=0.5))
+        start = time.perf_counter()
+        result = parser.parse_conversation(conversation)
+        print(f"\nTimeout fallback after {time.perf_counter() - start:.2f}s -> {result['타입명']}")
+
+    with FakeGeminiServer(stream_chunks=8, chunk_delay=0.01) as server:
+        text = HttpBackend(server.url, stream=True).generate(conversation)
+        print(f"\nStreamed response reassembled: {json.loads(text)['이름']}")
+
+    # 150ms per new connection stands in for DNS + TLS to the real endpoint
+    with FakeGeminiServer(latency=0.05, connect_latency=0.15) as server:
+        print("\nCold start vs kept-alive connection:")
+        cold_client = WarmClient(HttpBackend(server.url))
+        for _ in range(3):
+            cold_client.generate(conversation)
+        warm_client = WarmClient(HttpBackend(server.url), ping_interval=0.2).start()
+        time.sleep(0.5)
+        for _ in range(3):
+            warm_client.generate(conversation)
+        warm_client.stop()
+        print(json.dumps({"no warm-up": cold_client.latency_report(),
+                          "warmed at start": warm_client.latency_report(),
+                          "connections opened": server.connection_count}, indent=2))
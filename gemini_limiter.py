@@ -0,0 +1,298 @@
+"""Shared Gemini quota manager: token buckets, priorities and 429 backoff
+
+Every generate() call in the process goes through one GeminiRateLimiter:
+
+- a requests/min and a tokens/min bucket keep us under the API quota
+  instead of finding it with 429s
+- waiters are served by priority (live prints before test prints), FIFO
+  within a priority
+- a 429/503 makes every caller pause for the server's Retry-After (or an
+  exponential backoff with jitter) before the request is retried
+
+The limiter is per process; give each station its share of the project
+quota with GEMINI_RPM / GEMINI_TPM.
+
+    python gemini_limiter.py    burst simulation against FakeGeminiServer
+"""
+
+import contextlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from gemini_backends import BackendError, GeminiBackend
+
+PRIORITY_LIVE = 0
+PRIORITY_TEST = 10
+
+# Statuses worth retrying after a pause
+RETRYABLE_STATUSES = (429, 500, 503)
+
+# Rough output allowance added to the prompt estimate
+OUTPUT_TOKEN_ALLOWANCE = 512
+
+_context = threading.local()
+
+
+@contextlib.contextmanager
+def request_priority(priority: int):
+    """Run Gemini calls made by this thread at the given priority"""
+    previous = getattr(_context, 'priority', PRIORITY_LIVE)
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+def current_priority() -> int:
+    return getattr(_context, 'priority', PRIORITY_LIVE)
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Upper-bound token estimate (Korean text runs about 1-2 chars per token)"""
+    return len(prompt) // 2 + 1 + OUTPUT_TOKEN_ALLOWANCE
+
+
+class TokenBucket:
+    """Continuous-refill bucket; not thread-safe (the limiter holds the lock)"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class GeminiRateLimiter:
+    """Admits Gemini calls under rpm/tpm/concurrency limits, by priority"""
+
+    def __init__(self, requests_per_minute: float = 15, tokens_per_minute: float = 1_000_000,
+                 max_concurrency: int = 4, max_retries: int = 4, base_delay: float = 1.0,
+                 max_delay: float = 30.0, burst: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute, capacity=burst)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.stats = {"admitted": 0, "retries": 0, "rate_limited": 0, "failed": 0}
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._order = itertools.count()
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_LIVE, timeout: Optional[float] = None) -> bool:
+        """Block until this call may go out; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        entry = (priority, next(self._order))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._admission_wait(entry, tokens, now)
+                    if wait == 0.0:
+                        heapq.heappop(self._waiters)
+                        self.requests.take(1, now)
+                        self.tokens.take(tokens, now)
+                        self.in_flight += 1
+                        self.stats["admitted"] += 1
+                        self._cond.notify_all()
+                        return True
+                    if deadline is not None:
+                        if now >= deadline:
+                            self._waiters.remove(entry)
+                            heapq.heapify(self._waiters)
+                            self._cond.notify_all()
+                            return False
+                        # None (someone ahead, or no free slot) still has to wake by the deadline
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+
+    def _admission_wait(self, entry, tokens: int, now: float) -> Optional[float]:
+        """0 when entry may go now, else seconds to wait (None = until notified)"""
+        if self._waiters[0] != entry or self.in_flight >= self.max_concurrency:
+            return None
+        return max(self.paused_until - now,
+                   self.requests.wait_time(1, now),
+                   self.tokens.wait_time(tokens, now),
+                   0.0)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Pause everyone after a 429/503; returns the pause in seconds"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)
+        if retry_after:
+            delay = max(delay, retry_after)
+        with self._cond:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + delay)
+            # The server disagrees with our bucket; don't burst once it reopens
+            self.requests.drain(now)
+            self._cond.notify_all()
+        return delay
+
+    def _count(self, key: str):
+        with self._cond:
+            self.stats[key] += 1
+
+    def call(self, fn: Callable[[], str], tokens: int, priority: Optional[int] = None) -> str:
+        """Run fn under the limits, retrying retryable errors with backoff"""
+        priority = current_priority() if priority is None else priority
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority)
+            try:
+                return fn()
+            except BackendError as e:
+                if e.status not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                    self._count("failed")
+                    raise
+                if e.status == 429:
+                    self._count("rate_limited")
+                self._count("retries")
+                delay = self.backoff(attempt, e.retry_after)
+                print(f"Gemini returned {e.status}, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            finally:
+                self.release()
+
+
+class LimitedBackend(GeminiBackend):
+    """Routes another backend's calls through a GeminiRateLimiter"""
+
+    def __init__(self, backend: GeminiBackend, limiter: 'GeminiRateLimiter'):
+        self.backend = backend
+        self.limiter = limiter
+        self.name = f"limited-{backend.name}"
+
+    def generate(self, prompt: str) -> str:
+        return self.limiter.call(lambda: self.backend.generate(prompt), estimate_tokens(prompt))
+
+    def warm(self) -> bool:
+        # Pings don't use generate quota, so they bypass the buckets
+        return self.backend.warm()
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> GeminiRateLimiter:
+    """Process-wide limiter configured from GEMINI_RPM / GEMINI_TPM / GEMINI_CONCURRENCY"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = GeminiRateLimiter(
+                requests_per_minute=float(os.environ.get('GEMINI_RPM', 15)),
+                tokens_per_minute=float(os.environ.get('GEMINI_TPM', 1_000_000)),
+                max_concurrency=int(os.environ.get('GEMINI_CONCURRENCY', 4)))
+        return _shared_limiter
+
+
+def simulate_burst(stations: int = 12, test_prints: int = 6, quota=(5, 1.0),
+                   latency: float = 0.3, limited: bool = True) -> Dict:
+    """Fire a burst of live and test parses at a quota-enforcing fake server
+
+    The quota is (requests, window seconds); a short window keeps the
+    simulation to seconds while behaving like a per-minute quota.
+    """
+    from gemini_backends import FakeGeminiServer, HttpBackend
+
+    count, window = quota
+    with FakeGeminiServer(latency=latency, jitter=latency / 2, quota=quota) as server:
+        backend: GeminiBackend = HttpBackend(server.url)
+        # Smooth admission (burst 1): a full bucket plus refill could exceed a sliding window
+        limiter = GeminiRateLimiter(requests_per_minute=count * 60 / window, burst=1,
+                                    max_concurrency=4, base_delay=0.25, max_retries=6)
+        if limited:
+            backend = LimitedBackend(backend, limiter)
+
+        results = []
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def visitor(priority: int):
+            t0 = time.perf_counter()
+            try:
+                with request_priority(priority):
+                    backend.generate("Gems Station 대화 " * 40)
+                ok = True
+            except BackendError:
+                ok = False
+            with lock:
+                results.append((priority, ok, time.perf_counter() - t0))
+
+        # Test prints queue up first, then the live visitors arrive
+        tests = [threading.Thread(target=visitor, args=(PRIORITY_TEST,)) for _ in range(test_prints)]
+        lives = [threading.Thread(target=visitor, args=(PRIORITY_LIVE,)) for _ in range(stations)]
+        for t in tests:
+            t.start()
+        time.sleep(0.05)
+        for t in lives:
+            t.start()
+        for t in tests + lives:
+            t.join()
+        duration = time.perf_counter() - started
+
+        def summary(priority):
+            lat = sorted(r[2] for r in results if r[0] == priority and r[1])
+            failed = sum(1 for r in results if r[0] == priority and not r[1])
+            if not lat:
+                return {"ok": 0, "failed": failed}
+            return {"ok": len(lat), "failed": failed,
+                    "p50_s": round(lat[len(lat) // 2], 2),
+                    "p99_s": round(lat[min(len(lat) - 1, int(len(lat) * 0.99))], 2),
+                    "max_s": round(lat[-1], 2)}
+
+        return {
+            "limited": limited,
+            "server_429s": server.error_count,
+            "throughput_rps": round(sum(1 for r in results if r[1]) / duration, 2),
+            "live": summary(PRIORITY_LIVE),
+            "test": summary(PRIORITY_TEST),
+            "limiter": dict(limiter.stats) if limited else None,
+        }
+
+
+# Burst simulation
+if __name__ == "__main__":
+    import json
+
+    print("Burst of 12 live prints + 6 test prints against a 5 requests/s quota:\n")
+    for limited in (False, True):
+        print(json.dumps(simulate_burst(limited=limited), indent=2))
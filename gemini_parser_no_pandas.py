@@ -1,22 +1,43 @@
-import google.generativeai as genai
 import json
 import csv
 from typing import Dict, Optional
 import os
+from gemini_backends import BackendError, GeminiBackend, create_backend
+from local_extractor import DEFAULT_THRESHOLD, LocalExtractor
+from transcript_reducer import TranscriptReducer, format_stats
 
 class GeminiParser:
-    def __init__(self, api_key: str, csv_path: str = "res/GML25_F&B Menu.csv"):
-        """Initialize Gemini API parser"""
+    def __init__(self, api_key: str, csv_path: str = "res/GML25_F&B Menu.csv",
+                 backend: Optional[GeminiBackend] = None, local_threshold: Optional[float] = None):
+        """Initialize Gemini API parser
+        
+        Args:
+            api_key: Gemini API key
+            csv_path: Pairing table CSV
+            backend: Generation backend (default: from $GEMINI_BACKEND, else the real client)
+            local_threshold: Confidence at which the offline extraction is used without
+                calling Gemini (default: $GEMS_LOCAL_CONFIDENCE, else 0.8; above 1 disables)
+        """
         self.api_key = api_key
         self.csv_path = csv_path
         
         # Configure Gemini API
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.backend = backend or create_backend(api_key)
         
         # Load CSV data for reference
         self.pairing_data = self.load_csv_data()
         
+        # Trims the scraped transcript to the turns that matter
+        self.reducer = TranscriptReducer.from_csv(csv_path)
+        self.last_reduction: Optional[Dict] = None
+        
+        # Name + CSV type match offline; Gemini only when unsure
+        self.local = LocalExtractor(csv_path)
+        if local_threshold is None:
+            local_threshold = float(os.environ.get('GEMS_LOCAL_CONFIDENCE', DEFAULT_THRESHOLD))
+        self.local_threshold = local_threshold
+        self.last_source: Optional[str] = None
+        
     def load_csv_data(self) -> str:
         """Load CSV data as string for context"""
         try:
@@ -75,6 +96,37 @@ class GeminiParser:
     def parse_conversation(self, conversation_text: str) -> Dict:
         """Parse conversation using Gemini API"""
         
+        conversation_text, self.last_reduction = self.reducer.reduce(conversation_text)
+        print(f"Transcript reduced: {format_stats(self.last_reduction)}")
+        
+        local_result, confidence = self.local.extract(conversation_text)
+        if confidence >= self.local_threshold:
+            print(f"Parsed locally (confidence {confidence:.2f}), skipping Gemini")
+            self.last_source = "local"
+            return local_result
+        print(f"Local confidence {confidence:.2f} below {self.local_threshold:.2f}, asking Gemini")
+        
+        try:
+            result = self.parse_remote(conversation_text)
+        except BackendError as e:
+            # Over quota even after the limiter's retries: the visitor still gets a receipt
+            print(f"Gemini over quota ({e}), printing the local result")
+            self.last_source = "local-quota"
+            return local_result
+        if result is None:
+            # Best local guess beats a type-1 "Unknown" receipt
+            self.last_source = "local-fallback"
+            return local_result
+        self.last_source = "gemini"
+        return result
+    
+    def parse_remote(self, conversation_text: str, raise_errors: bool = False) -> Optional[Dict]:
+        """Ask Gemini for the receipt fields; None when the call or its JSON fails
+        
+        A 429 that survives the rate limiter's retries is re-raised. With
+        raise_errors every failure is: BackendError when the call failed,
+        ValueError when Gemini answered with something other than the JSON.
+        """
         prompt = f"""
 다음 대화에서 고객 정보를 추출해주세요. 대화에는 'Gems Station'이라는 키워드가 포함되어 있으며, 
 고객의 성격 유형과 추천 메뉴가 언급됩니다.
@@ -110,8 +162,7 @@ JSON만 응답하고 다른 설명은 포함하지 마세요.
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
+            result_text = self.backend.generate(prompt).strip()
             
             # Extract JSON from response
             if '```json' in result_text:
@@ -121,20 +172,25 @@ JSON만 응답하고 다른 설명은 포함하지 마세요.
                 
             # Parse JSON
             parsed_data = json.loads(result_text)
+            if not isinstance(parsed_data, dict):
+                raise ValueError(f"expected a JSON object, got {type(parsed_data).__name__}")
             return parsed_data
             
+        except BackendError as e:
+            if e.status == 429:
+                # Still over quota after the limiter's retries; parse_conversation
+                # prints the local result, the reconciler keeps the entry pending
+                print(f"Gemini quota exhausted: {e}")
+                raise
+            print(f"Error parsing with Gemini: {e}")
+            if raise_errors:
+                raise
+            return None
         except Exception as e:
             print(f"Error parsing with Gemini: {e}")
-            # Return default structure
-            return {
-                "이름": "고객",
-                "번호": "1",
-                "타입명": "Unknown",
-                "타입_설명": "",
-                "성향_키워드": "",
-                "음료": "",
-                "푸드": ""
-            }
+            if raise_errors:
+                raise ValueError(f"Unusable Gemini reply: {e}") from e
+            return None
     
     def parse_and_save(self, conversation_text: str, output_path: str = "parsed_conversation.json") -> Dict:
         """Parse conversation and save as JSON"""
@@ -12,20 +12,38 @@ import time
 import os
 import urllib.parse
 import base64
-import threading
-import random
 import platform
+import threading
+import functools
+import multiprocessing
 try:
     from gemini_parser import GeminiParser
 except ImportError:
     # Fallback to no-pandas version if pandas import fails
     from gemini_parser_no_pandas import GeminiParser
 from receipt_printer import ReceiptPrinter
+from kiosk_controller import KioskController
+from event_log import EventLog
+from gemini_backends import WarmClient, create_backend
+from offline_mode import ConnectivityMonitor, OfflineAwareParser, Reconciler, TranscriptJournal
+from driver_actor import DriverActor
+from render_worker import RenderWorker
+from printer_backends import get_printer_registry
+from asset_server import get_asset_server
+from transition_assets import choose_variant
+from gem_cache import GEM_PAGE_CHECK_SCRIPT, GemUrlCache, gem_id
+from wait_engine import (GEMINI_URL, any_of, boot_timeline, document_ready, first_element,
+                         has_session_cookies, js_truthy, url_contains, url_startswith, wait_for)
 
 def load_credentials(filepath='credentials.json'):
     with open(filepath, 'r') as file:
         return json.load(file)
 
+def chrome_user_data_dir():
+    """Persistent Chrome profile directory next to this script"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, 'chrome_user_data')
+
 def setup_driver():
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
@@ -47,8 +65,7 @@ def setup_driver():
         chrome_options.add_argument('--start-fullscreen')  # Fullscreen for other OS
     
     # Use a persistent user data directory to maintain login state
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    user_data_dir = os.path.join(current_dir, 'chrome_user_data')
+    user_data_dir = chrome_user_data_dir()
     
     # Create the directory if it doesn't exist
     if not os.path.exists(user_data_dir):
@@ -142,27 +159,83 @@ def setup_driver():
     
     return driver
 
+SIGNIN_URL = 'https://accounts.google.com/v3/signin/identifier?continue=https://gemini.google.com/&hl=en&theme=glif&flowName=GlifWebSignIn&flowEntry=ServiceLogin'
+
+PASSWORD_SELECTORS = [
+    (By.NAME, "Passwd"),
+    (By.NAME, "password"),
+    (By.CSS_SELECTOR, "input[type='password']"),
+    (By.XPATH, "//input[@type='password']")
+]
+
+NOT_NOW_SELECTORS = [
+    (By.XPATH, "//button[.//span[text()='Not now']]"),
+    (By.XPATH, "//button[contains(@class, 'VfPpkd-LgbsSe') and .//span[text()='Not now']]"),
+    (By.XPATH, "//div[@jsname='QkNstf']//button"),
+    (By.XPATH, "//button[@jsname='LgbsSe' and contains(., 'Not now')]"),
+    (By.XPATH, "//button[contains(@class, 'ksBjEc')]")
+]
+
+on_gemini = url_startswith("https://gemini.google.com")
+on_passkey_page = url_contains("passkeyenrollment")
+
+def wait_for_gemini_interface(driver, timeout=20):
+    """Wait until the Gemini app has rendered its main element"""
+    with boot_timeline.step("gemini interface"):
+        if not wait_for(driver, EC.presence_of_element_located((By.TAG_NAME, "main")), timeout):
+            print("Could not find main element, but continuing anyway...")
+        wait_for(driver, document_ready, 5)
+
+def try_session_fast_path(driver):
+    """Open Gemini directly when the profile already has a Google session
+    
+    Skips the accounts.google.com round trip; returns False (and leaves the
+    normal sign-in flow to run) when there is no session or it has expired.
+    """
+    with boot_timeline.step("session cookie fast path"):
+        if not has_session_cookies(driver):
+            return False
+        print("Session cookies found, opening Gemini directly...")
+        driver.get(GEMINI_URL)
+        result = wait_for(driver, any_of(
+            EC.presence_of_element_located((By.TAG_NAME, "main")),
+            url_contains("accounts.google.com")), 10)
+        return bool(result) and result[0] == 0 and on_gemini(driver)
+
+def skip_passkey_enrollment(driver):
+    """Click 'Not now' on the passkey enrollment page"""
+    not_now_button = wait_for(driver, first_element(NOT_NOW_SELECTORS), 5)
+    if not_now_button:
+        driver.execute_script("arguments[0].click();", not_now_button)
+        print("Clicked 'Not now' button")
+        return True
+    print("Could not find 'Not now' button automatically")
+    print("Please click 'Not now' or 'Continue' manually")
+    return False
+
 def login_to_google_gems(driver, credentials=None):
     try:
-        # Simply navigate to the sign-in page with Gemini as the continue URL
+        # Signed-in kiosk profiles go straight to Gemini
+        if try_session_fast_path(driver):
+            print("✅ Already logged in! Opened Gemini directly")
+            wait_for_gemini_interface(driver, 10)
+            return
+        
+        # Navigate to the sign-in page with Gemini as the continue URL
         # Google will automatically skip login if already authenticated
         print("Navigating to Google sign-in...")
-        driver.get('https://accounts.google.com/v3/signin/identifier?continue=https://gemini.google.com/&hl=en&theme=glif&flowName=GlifWebSignIn&flowEntry=ServiceLogin')
-        
-        # Wait a moment to see where we end up
-        time.sleep(3)
+        with boot_timeline.step("sign-in page"):
+            driver.get(SIGNIN_URL)
+            
+            # Wait until we either land on Gemini or see the email field
+            landed = wait_for(driver, any_of(
+                on_gemini,
+                EC.presence_of_element_located((By.ID, "identifierId"))), 10)
         
         # Check if we were automatically redirected to Gemini (already logged in)
-        current_url = driver.current_url
-        if current_url.startswith("https://gemini.google.com/") and "accounts.google.com" not in current_url:
+        if landed and landed[0] == 0:
             print("✅ Already logged in! Redirected to Gemini automatically")
-            # Wait for the interface to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "main"))
-                )
-            except:
-                pass
+            wait_for_gemini_interface(driver, 10)
             return
         
         # If we're still on the login page, proceed with login
@@ -171,39 +244,27 @@ def login_to_google_gems(driver, credentials=None):
         if credentials:
             # Try automated login if credentials provided
             try:
-                # Wait for and enter email
-                print("Attempting automated login...")
-                email_input = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "identifierId"))
-                )
-                email_input.clear()
-                email_input.send_keys(credentials['email'])
-                
-                # Click next button
-                next_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, "identifierNext"))
-                )
-                driver.execute_script("arguments[0].click();", next_button)
-                time.sleep(2)
-                
-                # Wait for password page to load
-                time.sleep(3)
-                
-                # Try to enter password
-                password_selectors = [
-                    (By.NAME, "Passwd"),
-                    (By.NAME, "password"),
-                    (By.CSS_SELECTOR, "input[type='password']"),
-                    (By.XPATH, "//input[@type='password']")
-                ]
-                
-                password_entered = False
-                for selector_type, selector_value in password_selectors:
-                    try:
-                        password_input = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((selector_type, selector_value))
-                        )
-                        time.sleep(1)  # Wait for field to be ready
+                with boot_timeline.step("automated login"):
+                    # Wait for and enter email
+                    print("Attempting automated login...")
+                    email_input = WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.ID, "identifierId"))
+                    )
+                    email_input.clear()
+                    email_input.send_keys(credentials['email'])
+                    
+                    # Click next button
+                    next_button = WebDriverWait(driver, 10).until(
+                        EC.element_to_be_clickable((By.ID, "identifierNext"))
+                    )
+                    driver.execute_script("arguments[0].click();", next_button)
+                    
+                    # Wait for the password page to load
+                    password_entered = False
+                    password_input = wait_for(driver, first_element(PASSWORD_SELECTORS), 15)
+                    if password_input:
+                        # Wait for field to be ready
+                        wait_for(driver, lambda d: password_input.is_displayed() and password_input.is_enabled(), 5)
                         password_input.clear()
                         password_input.send_keys(credentials['password'])
                         
@@ -216,64 +277,20 @@ def login_to_google_gems(driver, credentials=None):
                             # If no button found, press Enter
                             password_input.send_keys("\n")
                             print("Password entered and Enter pressed")
-                        
                         password_entered = True
-                        break
-                    except:
-                        continue
-                
-                if password_entered:
-                    # Wait a bit for the page to load
-                    time.sleep(10)
-                    
-                    # Check multiple times for passkey page
-                    for attempt in range(10):
-                        time.sleep(2)
-                        
-                        # Handle passkey enrollment page if it appears
-                        try:
-                            # Check if we're on the passkey enrollment page
-                            if "passkeyenrollment" in driver.current_url or "speedbump/passkeyenrollment" in driver.current_url:
-                                print(f"Passkey enrollment page detected (attempt {attempt + 1}/3)...")
-                                
-                                # Try multiple selectors for the "Not now" button
-                                not_now_selectors = [
-                                    "//button[.//span[text()='Not now']]",
-                                    "//button[contains(@class, 'VfPpkd-LgbsSe') and .//span[text()='Not now']]",
-                                    "//div[@jsname='QkNstf']//button",
-                                    "//button[@jsname='LgbsSe' and contains(., 'Not now')]",
-                                    "//button[contains(@class, 'ksBjEc')]"
-                                ]
-                                
-                                clicked = False
-                                for selector in not_now_selectors:
-                                    try:
-                                        not_now_button = WebDriverWait(driver, 3).until(
-                                            EC.element_to_be_clickable((By.XPATH, selector))
-                                        )
-                                        print(f"Found 'Not now' button with selector: {selector}")
-                                        driver.execute_script("arguments[0].click();", not_now_button)
-                                        print("Clicked 'Not now' button")
-                                        clicked = True
-                                        time.sleep(3)
-                                        break
-                                    except:
-                                        continue
-                                
-                                if not clicked:
-                                    print("Could not find 'Not now' button automatically")
-                                    print("Please click 'Not now' or 'Continue' manually")
-                                    
-                                # Exit the attempt loop if we found the passkey page
-                                break
-                                
-                        except Exception as e:
-                            print(f"Error handling passkey page: {e}")
-                            pass
                     
-                    if driver.current_url.startswith("https://gemini.google.com"):
-                        print("Automated login successful!")
-                        return  # Skip the manual login wait
+                    if password_entered:
+                        # Wait until we reach Gemini or the passkey enrollment page
+                        landed = wait_for(driver, any_of(on_gemini, on_passkey_page), 30)
+                        if landed and landed[0] == 1:
+                            print("Passkey enrollment page detected...")
+                            if skip_passkey_enrollment(driver):
+                                wait_for(driver, on_gemini, 15)
+                
+                if on_gemini(driver):
+                    print("Automated login successful!")
+                    wait_for_gemini_interface(driver)
+                    return  # Skip the manual login wait
             except Exception as e:
                 print(f"Automated login failed: {e}")
                 print("Please complete the login manually...")
@@ -284,47 +301,28 @@ def login_to_google_gems(driver, credentials=None):
         print("The script will wait indefinitely until you reach Gemini...")
         print("="*60 + "\n")
         
-        # Check every 2 seconds if we've reached Gemini
-        while True:
-            try:
-                current_url = driver.current_url
-                # Make sure we're actually on gemini.google.com, not just a URL with it as a parameter
-                if current_url.startswith("https://gemini.google.com"):
-                    print("\n✅ Login successful! Now on Gemini page")
-                    break
-                elif "accounts.google.com" in current_url:
-                    # Check if we're on the passkey enrollment page
-                    try:
-                        # Look for the passkey enrollment elements
-                        passkey_heading = driver.find_element(By.XPATH, "//h1[contains(text(), 'Simplify your sign-in')]")
-                        not_now_button = driver.find_element(By.XPATH, "//button[.//span[text()='Not now']]")
-                        if passkey_heading and not_now_button:
-                            print("\n⚠️  Passkey enrollment page detected!")
-                            print("Click 'Not now' to skip or 'Continue' to set up passkey")
-                    except:
-                        # Not on passkey page, just regular login
-                        pass
-                time.sleep(2)
-            except:
-                time.sleep(2)
-                continue
+        with boot_timeline.step("manual login"):
+            passkey_notice_shown = False
+            while not wait_for(driver, on_gemini, 2, poll=0.25):
+                # Check if we're on the passkey enrollment page
+                try:
+                    if not passkey_notice_shown and driver.find_elements(By.XPATH, "//h1[contains(text(), 'Simplify your sign-in')]"):
+                        print("\n⚠️  Passkey enrollment page detected!")
+                        print("Click 'Not now' to skip or 'Continue' to set up passkey")
+                        passkey_notice_shown = True
+                except:
+                    # Not on passkey page, just regular login
+                    pass
+        
+        print("\n✅ Login successful! Now on Gemini page")
         
         # Wait for the main interface to load
         print("Waiting for Google Gemini interface to load...")
-        try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "main"))
-            )
-        except:
-            print("Could not find main element, but continuing anyway...")
+        wait_for_gemini_interface(driver)
         
         print("✅ Successfully logged in to Google Gemini!")
         print(f"Current URL: {driver.current_url}")
         
-        # Additional wait to ensure all content is loaded
-        print("Waiting for page content to fully load...")
-        time.sleep(5)
-        
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         print(f"Current URL: {driver.current_url}")
@@ -535,17 +533,55 @@ def close_sidebar_menu(driver):
     except Exception as e:
         print(f"Error hiding UI elements: {str(e)}")
 
+CONVERSATION_TEXT_SCRIPT = """
+    // Try multiple selectors to find conversation elements
+    const selectors = [
+        '.model-response-text',
+        '.response-container-content', 
+        '.presented-response-container',
+        '[class*="message-content"]',
+        '.message-text',
+        '.response-text',
+        '.markdown-container',
+        'message-content',
+        '[class*="response"]',
+        '[class*="message"]'
+    ];
+    
+    let allElements = new Set();
+    selectors.forEach(selector => {
+        try {
+            document.querySelectorAll(selector).forEach(el => allElements.add(el));
+        } catch(e) {}
+    });
+    
+    let fullText = '';
+    allElements.forEach(el => {
+        if (el.textContent && el.textContent.trim()) {
+            fullText += el.textContent + '\\n';
+        }
+    });
+    
+    return fullText;
+"""
+
+def extract_conversation_text(driver):
+    """Scrape the visible conversation text from the gem page"""
+    try:
+        return driver.execute_script(CONVERSATION_TEXT_SCRIPT)
+    except Exception as e:
+        print(f"Error extracting conversation: {e}")
+        return None
+
 def monitor_chat_and_add_print_button(driver):
-    """Monitor chat for 'Gems Station' keyword and add print button when detected"""
+    """Install the in-page monitor that watches for 'Gems Station' and adds the print button
+    
+    The page only raises flags (gemsConversationEnded, printButtonClicked,
+    exitCommand, testCommand); KioskController reads and acts on them.
+    """
     try:
-        # Get the absolute path to the print button image
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        print_btn_path = os.path.join(current_dir, "res", "GEMS_print_btn.png")
-        transition_path = os.path.join(current_dir, "transition_screen.html")
-        
-        # Convert to base64 for inline embedding
-        with open(print_btn_path, "rb") as img_file:
-            img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
+        # Served by the asset server (or the cached inline copy)
+        print_btn_src = print_button_src()
         
         monitor_script = f"""
         // Create global flags
@@ -662,7 +698,7 @@ def monitor_chat_and_add_print_button(driver):
                 
                 // Create image element that fills the button
                 const printImg = document.createElement('img');
-                printImg.src = 'data:image/png;base64,{img_base64}';
+                printImg.src = '{print_btn_src}';
                 printImg.style.cssText = 'width: 100%; height: auto; display: block;';
                 printImg.alt = 'Print';
                 
@@ -958,194 +994,6 @@ def monitor_chat_and_add_print_button(driver):
         driver.execute_script(monitor_script)
         print("Chat monitoring and print button functionality initialized")
         
-        # Monitor for print button clicks in a separate thread
-        def check_print_button():
-            # Use absolute path for CSV
-            csv_path = os.path.join(current_dir, "res", "GML25_F&B Menu.csv")
-            
-            # Get API key from environment or credentials
-            api_key = os.environ.get('GEMINI_API_KEY')
-            if not api_key:
-                try:
-                    with open('gemini_api_key.txt', 'r') as f:
-                        api_key = f.read().strip()
-                except:
-                    print("WARNING: No Gemini API key found. Please set GEMINI_API_KEY environment variable or create gemini_api_key.txt")
-                    api_key = ""
-            
-            parser = GeminiParser(api_key, csv_path)
-            
-            # Test data for 출력테스트
-            test_names = ["지수", "민준", "서연", "하준", "서준", "도윤", "예준", "시우", "주원", "하은"]
-            test_types = [
-                ("1", "Bold Creator", "남다른 시도로 새로운 가치를 만들고, 깊이 있는 전략으로 시장을 이끄는 마케터.", "#도전 #전략적 #리더십", "Negroni", "코랄 소스의 랍스터 테일"),
-                ("2", "Unexpected Innovator", "틀을 깨는 아이디어로 고객에게 놀라움을 선사하고, 늘 새로운 변화를 시도하는 마케터.", "#열정 #변주 #모험적", "Negroni", "파가든 브리오쉬 한우 버거"),
-                ("3", "Future Seeker", "시대의 흐름을 꿰뚫어 보고, 자신만의 방식으로 새로운 유행을 만들어가는 마케터.", "#전략적 #넓은시야 #영감", "Negroni", "아보카도 리코타 치즈 토스트"),
-                ("4", "Experience Architect", "고객의 오감을 사로잡는 디테일로, 상품을 넘어 완벽한 경험을 디자인하는 마케터.", "#조화 #섬세함 #소통", "Grapefruit Blossom", "망고 크림 새우"),
-                ("5", "Harmony Seeker", "서로 다른 요소를 균형 있게 조화시켜, 모두가 만족할 수 있는 안정적인 솔루션을 제시하는 마케터.", "#밸런스 #조화 #안정성", "Grapefruit Blossom", "고르곤졸라 피자"),
-                ("6", "Curious Explorer", "익숙함 속에서도 새로운 재미를 찾아내고, 고객의 호기심을 자극하며 다양성을 즐기는 마케터.", "#영감 #도전 #다양성", "Grapefruit Blossom", "와사비 젤리 허브 연어"),
-                ("7", "Positive Giver", "고객의 삶에 긍정적인 에너지와 영감을 불어넣으며, 좋은 라이프스타일을 자연스럽게 제안하는 마케터.", "#소통 #효율성 #안정성", "Fuzzy Navel", "아보카도 리코타 치즈 토스트"),
-                ("8", "Cozy Connector", "일상의 작은 행복을 소중히 여기고, 섬세한 감성으로 고객의 마음에 공감하며 편안함을 주는 마케터.", "#조화 #섬세함 #아우름", "Fuzzy Navel", "고르곤졸라 피자")
-            ]
-            
-            while True:
-                try:
-                    # Check for exit command
-                    if driver.execute_script("return window.exitCommand || false;"):
-                        print("Exit command detected, returning to waiting screen...")
-                        driver.execute_script("window.exitCommand = false;")
-                        # Navigate to waiting screen
-                        show_waiting_screen_and_continue(driver)
-                        break
-                    
-                    # Check for test command
-                    if driver.execute_script("return window.testCommand || false;"):
-                        print("Test command detected, creating test data...")
-                        driver.execute_script("window.testCommand = false;")
-                        
-                        # Generate random test data
-                        test_name = random.choice(test_names)
-                        test_type = random.choice(test_types)
-                        
-                        test_data = {
-                            "이름": test_name,
-                            "번호": test_type[0],
-                            "타입명": test_type[1],
-                            "타입_설명": test_type[2],
-                            "성향_키워드": test_type[3],
-                            "음료": test_type[4],
-                            "푸드": test_type[5]
-                        }
-                        
-                        # Save test data
-                        with open("parsed_conversation.json", 'w', encoding='utf-8') as f:
-                            json.dump(test_data, f, ensure_ascii=False, indent=2)
-                        
-                        print(f"Test data saved: {test_name} - {test_type[1]} (Type #{test_type[0]})")
-                        print(json.dumps(test_data, ensure_ascii=False, indent=2))
-                        
-                        # Generate receipt with name
-                        try:
-                            printer = ReceiptPrinter()
-                            printer.add_name_to_receipt(test_data, "thermal_print.png")
-                        except Exception as e:
-                            print(f"Error generating receipt: {e}")
-                        
-                        # Navigate to transition screen
-                        if platform.system() == 'Windows':
-                            driver.get(f"file:///{transition_path.replace(chr(92), '/')}")
-                        else:
-                            driver.get(f"file://{transition_path}")
-                        
-                        # Wait for transition to complete
-                        print("Waiting for transition to complete...")
-                        while True:
-                            try:
-                                if driver.execute_script("return window.transitionComplete || false;"):
-                                    print("Transition complete, returning to waiting screen...")
-                                    # Show waiting screen again
-                                    show_waiting_screen_and_continue(driver)
-                                    break
-                            except:
-                                break
-                            time.sleep(0.1)
-                        break
-                    
-                    # Check for print button click
-                    if driver.execute_script("return window.printButtonClicked || false;"):
-                        print("Print button clicked detected!")
-                        
-                        # Extract conversation text before navigating
-                        conversation_text = None
-                        try:
-                            conversation_text = driver.execute_script("""
-                                // Try multiple selectors to find conversation elements
-                                const selectors = [
-                                    '.model-response-text',
-                                    '.response-container-content', 
-                                    '.presented-response-container',
-                                    '[class*="message-content"]',
-                                    '.message-text',
-                                    '.response-text',
-                                    '.markdown-container',
-                                    'message-content',
-                                    '[class*="response"]',
-                                    '[class*="message"]'
-                                ];
-                                
-                                let allElements = new Set();
-                                selectors.forEach(selector => {
-                                    try {
-                                        document.querySelectorAll(selector).forEach(el => allElements.add(el));
-                                    } catch(e) {}
-                                });
-                                
-                                let fullText = '';
-                                allElements.forEach(el => {
-                                    if (el.textContent && el.textContent.trim()) {
-                                        fullText += el.textContent + '\\n';
-                                    }
-                                });
-                                
-                                return fullText;
-                            """)
-                        except Exception as e:
-                            print(f"Error extracting conversation: {e}")
-                        
-                        driver.execute_script("window.printButtonClicked = false;")
-                        
-                        # Navigate to transition page IMMEDIATELY
-                        print("Navigating to transition page...")
-                        if platform.system() == 'Windows':
-                            driver.get(f"file:///{transition_path.replace(chr(92), '/')}")
-                        else:
-                            driver.get(f"file://{transition_path}")
-                        
-                        # Now do the heavy processing while user sees the transition animation
-                        if conversation_text:
-                            print(f"Processing conversation (length: {len(conversation_text)})...")
-                            
-                            # Parse with Gemini API (this takes time)
-                            try:
-                                print("Parsing conversation data with Gemini...")
-                                parsed_data = parser.parse_and_save(conversation_text)
-                                print(f"Parsed data: {json.dumps(parsed_data, ensure_ascii=False, indent=2)}")
-                                
-                                # Generate receipt image
-                                print("Generating receipt image...")
-                                printer = ReceiptPrinter()
-                                printer.add_name_to_receipt(parsed_data, "thermal_print.png")
-                                
-                                # Print to thermal printer
-                                print("Sending to thermal printer...")
-                                # The printer will automatically print when receipt is generated
-                                
-                            except Exception as ex:
-                                print(f"Error in processing: {ex}")
-                        else:
-                            print("No conversation text found!")
-                        
-                        # Wait for transition to complete
-                        print("Waiting for transition to complete...")
-                        while True:
-                            try:
-                                if driver.execute_script("return window.transitionComplete || false;"):
-                                    print("Transition complete, returning to waiting screen...")
-                                    # Show waiting screen again
-                                    show_waiting_screen_and_continue(driver)
-                                    break
-                            except:
-                                break
-                            time.sleep(0.1)
-                        break
-                except:
-                    break
-                time.sleep(0.1)
-        
-        # Start monitoring in a separate thread
-        monitor_thread = threading.Thread(target=check_print_button, daemon=True)
-        monitor_thread.start()
-        
     except Exception as e:
         print(f"Error setting up chat monitoring: {str(e)}")
 
@@ -1330,13 +1178,22 @@ def remove_transition_overlay(driver):
     driver.execute_script(remove_overlay_script)
     print("Transition overlay and dark backgrounds removed")
 
+# Sidebar discoveries (each reloads Gemini) before the kiosk gives up on finding the gem
+GEM_DISCOVERY_ATTEMPTS = 3
+
+GEM_SIDEBAR_READY_SCRIPT = """
+return document.querySelectorAll('bot-list-item, a[href*="/gem/"]').length > 0 ||
+       !!document.querySelector('button[data-test-id="side-nav-menu-button"], button mat-icon[fonticon="menu"]');
+"""
+
 def find_first_gem_url(driver):
     """Find the first gem in the gems list and return its URL"""
     try:
         print("\nChecking sidebar and looking for gems...")
         
-        # Wait a bit for the page to load
-        time.sleep(2)
+        # Wait until the sidebar (gem list or its menu button) has rendered
+        with boot_timeline.step("gem list: page ready"):
+            wait_for(driver, js_truthy(GEM_SIDEBAR_READY_SCRIPT), 10)
         
         # First, check if sidebar is collapsed and open it if needed
         open_sidebar_script = """
@@ -1391,7 +1248,10 @@ def find_first_gem_url(driver):
         
         if sidebar_status == 'sidebar_opened':
             print("Opened collapsed sidebar")
-            time.sleep(2)  # Wait for sidebar animation
+            # Wait for the sidebar to show the gem buttons
+            with boot_timeline.step("gem list: open sidebar"):
+                wait_for(driver, EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "bot-list-item button.bot-new-conversation-button")), 5)
         else:
             print("Sidebar was already open")
         
@@ -1429,30 +1289,52 @@ def find_first_gem_url(driver):
         
         if gem_name:
             print(f"Clicked on gem: {gem_name}")
-            # Wait for navigation to complete
-            time.sleep(3)
-            
-            # Get the current URL after clicking
-            current_url = driver.current_url
+            # Wait for navigation to the gem to complete
+            with boot_timeline.step("gem list: open gem"):
+                current_url = wait_for(driver, url_contains("/gem/"), 10) or driver.current_url
             print(f"Navigated to: {current_url}")
             
+            if not gem_id(current_url):
+                print("Clicking the gem did not open a gem page")
+                return None
+            
             # Store the URL
             driver.first_gem_url = current_url
+            driver.first_gem_name = gem_name
             return current_url
         else:
             print("Could not click on any gem")
-            # Fallback to hardcoded URL if no gems found
-            fallback_url = "https://gemini.google.com/gem/d43c6f8224ff"
-            print(f"Using fallback URL: {fallback_url}")
-            driver.first_gem_url = fallback_url
-            return fallback_url
+            return None
             
     except Exception as e:
         print(f"Error finding gem URL: {str(e)}")
-        # Fallback to hardcoded URL
-        fallback_url = "https://gemini.google.com/gem/d43c6f8224ff"
-        driver.first_gem_url = fallback_url
-        return fallback_url
+        return None
+
+def resolve_gem_url(driver, gem_cache):
+    """Use the cached gem URL, or discover it from the sidebar and cache it"""
+    cached_url = gem_cache.get_url()
+    if cached_url:
+        print(f"Using cached gem URL: {cached_url}")
+        driver.first_gem_url = cached_url
+        return cached_url
+    
+    gem_url = find_first_gem_url(driver)
+    if gem_url:
+        gem_cache.store(gem_url, getattr(driver, 'first_gem_name', None))
+        print(f"Cached gem URL in {gem_cache.path}")
+    return gem_url
+
+def resolve_gem_url_with_retries(driver, gem_cache, attempts=GEM_DISCOVERY_ATTEMPTS):
+    """resolve_gem_url, reloading Gemini between attempts (the sidebar can be slow on a cold boot)"""
+    for attempt in range(1, attempts + 1):
+        gem_url = resolve_gem_url(driver, gem_cache)
+        if gem_url:
+            return gem_url
+        if attempt < attempts:
+            print(f"No gem found (attempt {attempt}/{attempts}), reloading Gemini...")
+            driver.get(GEMINI_URL)
+            wait_for_gemini_interface(driver, 10)
+    return None
 
 def open_gourmet_gems(driver):
     """Navigate to the gem URL (either found dynamically or stored)"""
@@ -1479,8 +1361,8 @@ def open_gourmet_gems(driver):
         # Hide UI elements immediately
         close_sidebar_menu(driver)
         
-        # Wait a bit for page to stabilize
-        time.sleep(2)
+        # Wait for page to stabilize
+        wait_for(driver, document_ready, 10)
         
         # Clean up any remaining overlays or dark backgrounds
         remove_transition_overlay(driver)
@@ -1594,65 +1476,228 @@ def open_gourmet_gems(driver):
 #     except Exception as e:
 #         print(f"Error while searching for Gourmet gems: {str(e)}")
 
-def show_waiting_screen(driver):
-    """Display the waiting screen HTML page and wait for user to click continue"""
+def open_waiting_screen(driver):
+    """Navigate to the waiting screen HTML page"""
     print("\n" + "="*60)
     print("🎮 Showing waiting screen...")
     print("Click the button on the waiting screen to continue to Gems")
     print("="*60 + "\n")
     
-    # Get the absolute path to the HTML file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    html_path = os.path.join(current_dir, "waiting_screen.html")
+    # Navigate to the waiting screen (it preloads the transition while idle)
+    driver.get(page_url("waiting_screen.html") + f"?transition={choose_variant()}")
     
-    # Convert to file URL - properly handle Windows paths
+    # Inject the gem URL into sessionStorage for the waiting screen to use
+    if getattr(driver, 'first_gem_url', None):
+        driver.execute_script("sessionStorage.setItem('gemUrl', arguments[0]);", driver.first_gem_url)
+        print(f"Gem URL set in sessionStorage: {driver.first_gem_url}")
+    else:
+        # No gem to open yet; don't leave a stale one behind the button
+        driver.execute_script("sessionStorage.removeItem('gemUrl');")
+    
+    print("Waiting for user to click the continue button...")
+
+def file_url(filename):
+    """file:// URL for a file next to this script"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(current_dir, filename)
     if platform.system() == 'Windows':
         # Windows file URLs need three slashes
-        file_url = "file:///" + html_path.replace("\\", "/")
-    else:
-        file_url = "file://" + urllib.parse.quote(html_path.replace("\\", "/"))
+        return "file:///" + path.replace("\\", "/")
+    return "file://" + urllib.parse.quote(path)
+
+def page_url(filename):
+    """URL of a kiosk page/asset: from the asset server, or file:// without it"""
+    server = get_asset_server()
+    return server.url(filename) if server else file_url(filename)
+
+@functools.lru_cache(maxsize=1)
+def print_button_data_url():
+    """Inline copy of the print button, read and encoded once per process"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(current_dir, "res", "GEMS_print_btn.png"), "rb") as img_file:
+        return "data:image/png;base64," + base64.b64encode(img_file.read()).decode('utf-8')
+
+# Set to False once the Gemini page is found unable to load loopback URLs
+print_button_url_reachable = True
+
+def print_button_src():
+    """Image source for the injected print button"""
+    server = get_asset_server()
+    if server and print_button_url_reachable:
+        return server.url("res/GEMS_print_btn.png")
+    return print_button_data_url()
+
+def probe_print_button_url(driver):
+    """Check once whether the Gemini page may load images from the asset server
     
-    # Navigate to the waiting screen
-    driver.get(file_url)
+    Chrome can block public pages from loading loopback resources (Private
+    Network Access); the print button then falls back to the inline image.
+    """
+    global print_button_url_reachable
+    server = get_asset_server()
+    if not server:
+        return
+    loaded = driver.execute_async_script("""
+        const done = arguments[arguments.length - 1];
+        const img = new Image();
+        const timer = setTimeout(() => done(false), 2000);
+        img.onload = () => { clearTimeout(timer); done(true); };
+        img.onerror = () => { clearTimeout(timer); done(false); };
+        img.src = arguments[0];
+    """, server.url("res/GEMS_print_btn.png"))
+    print_button_url_reachable = bool(loaded)
+    if not loaded:
+        print("Gemini page cannot load asset server images, inlining the print button")
+
+def load_api_key():
+    """Get API key from environment or gemini_api_key.txt"""
+    api_key = os.environ.get('GEMINI_API_KEY')
+    if not api_key:
+        try:
+            with open('gemini_api_key.txt', 'r') as f:
+                api_key = f.read().strip()
+        except:
+            print("WARNING: No Gemini API key found. Please set GEMINI_API_KEY environment variable or create gemini_api_key.txt")
+            api_key = ""
+    return api_key
+
+def create_parser():
+    """GeminiParser for the kiosk's lifetime, with its connection warmed in the background"""
+    # Use absolute path for CSV
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(current_dir, "res", "GML25_F&B Menu.csv")
+    api_key = load_api_key()
+    backend = WarmClient(create_backend(api_key)).start()
+    return GeminiParser(api_key, csv_path, backend=backend)
+
+class SeleniumKiosk:
+    """KioskController adapter over the Chrome session
     
-    # Inject the gem URL into sessionStorage for the waiting screen to use
-    if hasattr(driver, 'first_gem_url'):
-        driver.execute_script(f"sessionStorage.setItem('gemUrl', '{driver.first_gem_url}');")
-        print(f"Gem URL set in sessionStorage: {driver.first_gem_url}")
+    All browser work runs on the DriverActor thread; polled page state is
+    read as one snapshot per tick. A cached gem URL is revalidated in the
+    background the first time a visitor opens the gem.
+    """
     
-    # Wait for the user to click the continue button
-    print("Waiting for user to click the continue button...")
+    REVALIDATE_ATTEMPTS = 20
+    
+    def __init__(self, driver, gem_cache=None):
+        self.driver = driver
+        self.actor = DriverActor(driver)
+        self.transition_url = page_url("transition_screen.html") + f"?variant={choose_variant()}"
+        self.print_button_probed = False
+        self.gem_cache = gem_cache
+        self.gem_validated = False
+        self.needs_rediscovery = False
+        # Set while a visitor's chat is open; revalidation only looks at the page then
+        self._chat_open = threading.Event()
+        self._revalidate_thread = None
+    
+    def show_waiting_screen(self):
+        self._chat_open.clear()
+        if self.needs_rediscovery:
+            self.actor.call(self._rediscover_gem)
+        self.actor.call(open_waiting_screen, self.driver)
     
-    while True:
+    def poll_waiting(self):
+        # Check if we've navigated away from the waiting screen to the specific gem
         try:
-            current_url = driver.current_url
+            url = self.actor.snapshot().get('url', '')
+        except Exception:
+            # Page is mid-navigation
+            return False
+        if "gemini.google.com/gem/" in url:
+            return True
+        if self.gem_cache and url.startswith("https://gemini.google.com/"):
+            # Gemini redirected away from the cached gem (deleted or moved)
+            print("Gem URL no longer opens the gem, rediscovering...")
+            self.gem_cache.invalidate()
+            self.needs_rediscovery = True
+            self.show_waiting_screen()
+        return False
+    
+    def start_chat(self):
+        def prepare_chat(driver):
+            # Wait for the gem page to start rendering
+            wait_for(driver, EC.presence_of_element_located((By.TAG_NAME, "main")), 5)
             
-            # Check if we've navigated away from the waiting screen to the specific gem
-            if "gemini.google.com/gem/" in current_url:
-                print("Continue button clicked! Navigated to Gems")
-                # Wait a moment for page to start loading
-                time.sleep(0.5)
-                break
+            # Immediately inject CSS to hide elements
+            inject_hiding_css(driver)
             
-            # Small delay to avoid excessive polling
-            time.sleep(0.5)
+            # Hide UI elements as fast as possible
+            close_sidebar_menu(driver)
             
-        except Exception as e:
-            print(f"Error checking navigation status: {e}")
-            time.sleep(1)
-
-def show_waiting_screen_and_continue(driver):
-    """Show waiting screen and set up the page again when user continues"""
-    show_waiting_screen(driver)
+            if not self.print_button_probed:
+                probe_print_button_url(driver)
+                self.print_button_probed = True
+            
+            # Start monitoring chat for "Gems Station" keyword
+            monitor_chat_and_add_print_button(driver)
+        
+        self.actor.call(prepare_chat, self.driver)
+        self._chat_open.set()
+        
+        in_flight = self._revalidate_thread and self._revalidate_thread.is_alive()
+        if self.gem_cache and not self.gem_validated and not in_flight:
+            self._revalidate_thread = threading.Thread(target=self._revalidate_gem, name="gem-revalidate",
+                                                       daemon=True)
+            self._revalidate_thread.start()
+    
+    def _revalidate_gem(self):
+        """Confirm the cached gem still opens (runs beside the visitor's chat)"""
+        for _ in range(self.REVALIDATE_ATTEMPTS):
+            if not self._chat_open.is_set():
+                # The chat ended; the next visitor's chat tries again
+                return
+            try:
+                verdict = self.gem_cache.check_page(self.actor.execute_script(GEM_PAGE_CHECK_SCRIPT))
+            except Exception:
+                verdict = None
+            if verdict is True:
+                self.gem_cache.mark_validated()
+                self.gem_validated = True
+                print("Cached gem URL revalidated")
+                return
+            if verdict is False:
+                print("Cached gem URL no longer opens the gem, will rediscover")
+                self.gem_cache.invalidate()
+                self.needs_rediscovery = True
+                return
+            time.sleep(0.5)
+    
+    def _rediscover_gem(self):
+        self.driver.get(GEMINI_URL)
+        wait_for_gemini_interface(self.driver, 10)
+        if resolve_gem_url_with_retries(self.driver, self.gem_cache):
+            self.needs_rediscovery = False
+        else:
+            # The old URL no longer opens the gem; the next waiting screen tries again
+            print("Gem rediscovery failed, will retry on the next waiting screen")
+            self.driver.first_gem_url = None
+    
+    def read_flags(self):
+        return self.actor.snapshot()
+    
+    def capture_transcript(self):
+        return self.actor.call(extract_conversation_text, self.driver)
     
-    # Immediately inject CSS to hide elements
-    inject_hiding_css(driver)
+    def show_transition(self):
+        self._chat_open.clear()
+        self.actor.get(self.transition_url)
     
-    # Hide UI elements as fast as possible
-    close_sidebar_menu(driver)
+    def transition_complete(self):
+        return bool(self.actor.snapshot().get('transitionComplete'))
     
-    # Start monitoring chat for "Gems Station" keyword again
-    monitor_chat_and_add_print_button(driver)
+    def close(self):
+        self.actor.stop()
+
+def make_kiosk_printer(event_log):
+    """Receipt printer whose jobs wait for a ready printer; status changes go to the event log"""
+    printer = ReceiptPrinter()
+    if printer.backend:
+        printer.enable_scheduler(event_log=event_log)
+        printer.status_monitor.add_listener(lambda old, new: event_log.record(
+            "printer_status", {"from": old.state, "state": new.state, "near_end": new.near_end}, ok=new.ready))
+    return printer
 
 def main():
     # Print system info for debugging
@@ -1669,7 +1714,8 @@ def main():
     
     print("\nSetting up Chrome driver...")
     try:
-        driver = setup_driver()
+        with boot_timeline.step("setup driver"):
+            driver = setup_driver()
         print("Chrome driver created successfully")
     except Exception as e:
         print(f"Failed to create Chrome driver: {e}")
@@ -1680,17 +1726,56 @@ def main():
         raise
     
     try:
+        # Load the kiosk screens into memory while Chrome is still fresh
+        with boot_timeline.step("asset server"):
+            get_asset_server()
+        
+        # Pillow work runs in its own process, away from the WebDriver threads
+        with boot_timeline.step("render worker"):
+            renderer = RenderWorker().start()
+        
+        # Open each printer backend once and pick the fastest healthy one
+        with boot_timeline.step("printer backends"):
+            get_printer_registry()
+        
+        # Gemini client warms its connection while login runs
+        with boot_timeline.step("gemini client"):
+            parser = create_parser()
+            
+            # Local resolution + journal while the venue network is down
+            event_log = EventLog()
+            monitor = ConnectivityMonitor().start()
+            journal = TranscriptJournal()
+            reconciler = Reconciler(parser, journal, monitor, event_log=event_log).start()
+        
         print("\nStarting login process...")
-        login_to_google_gems(driver, credentials)
+        with boot_timeline.step("login"):
+            login_to_google_gems(driver, credentials)
         
-        # Find and store the first gem URL after login
-        find_first_gem_url(driver)
+        # Use the cached gem URL, or find and cache the first gem after login
+        gem_cache = GemUrlCache(chrome_user_data_dir())
+        with boot_timeline.step("find gem"):
+            if not resolve_gem_url_with_retries(driver, gem_cache):
+                raise RuntimeError("No gem found in the Gemini sidebar - create the gem for this account first")
         
-        # Show the waiting screen after successful login and handle the cycle
-        show_waiting_screen_and_continue(driver)
+        print(boot_timeline.report())
         
-        print("\n📝 Browser will remain open. Press Enter to close it...")
-        input()
+        # Run the waiting -> chatting -> ended -> transitioning cycle
+        kiosk = SeleniumKiosk(driver, gem_cache)
+        try:
+            KioskController(kiosk, OfflineAwareParser(parser, monitor, journal), event_log=event_log,
+                            renderer=renderer, printer_factory=lambda: make_kiosk_printer(event_log)).run()
+        finally:
+            kiosk.close()
+            renderer.stop()
+            reconciler.stop()
+            monitor.stop()
+            print(f"Offline journal: {json.dumps(journal.counts())}")
+            parser.backend.stop()
+            print(f"Gemini latency: {json.dumps(parser.backend.latency_report())}")
+        
+    except KeyboardInterrupt:
+        print("\nStopping kiosk...")
         
     except Exception as e:
         print(f"\n❌ Error occurred: {str(e)}")
@@ -1701,4 +1786,6 @@ def main():
         driver.quit()
 
 if __name__ == "__main__":
+    # The render worker is a spawned process; needed for the frozen Windows build
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
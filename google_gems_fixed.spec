@@ -32,6 +32,7 @@ datas = [
     
     # Python modules that might be needed
     ('gemini_parser.py', '.'),
+    ('gemini_backends.py', '.'),
     ('receipt_printer.py', '.'),
     ('windows_thermal_printer.py', '.'),
 ]
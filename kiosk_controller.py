@@ -0,0 +1,418 @@
+"""Kiosk state machine: waiting -> chatting -> ended -> transitioning -> waiting
+
+One controller loop drives every visitor cycle. Browser work goes through a
+kiosk adapter (SeleniumKiosk in google_gems.py) so the controller can also
+be soak-tested against a simulated kiosk.
+
+Adapter interface:
+    show_waiting_screen()       navigate to the waiting screen
+    poll_waiting() -> bool      visitor pressed continue and the gem is open
+    start_chat()                hide Gemini UI and install the chat monitor
+    read_flags() -> dict        exitCommand / testCommand / printButtonClicked /
+                                gemsConversationEnded (one-shot flags are cleared)
+    capture_transcript() -> str scraped conversation text
+    show_transition()           navigate to the transition screen
+    transition_complete() -> bool
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+from receipt_pipeline import LocalParse, ReceiptJob, SpeculativeReceipt
+
+# Test data for 출력테스트
+TEST_NAMES = ["지수", "민준", "서연", "하준", "서준", "도윤", "예준", "시우", "주원", "하은"]
+TEST_TYPES = [
+    ("1", "Bold Creator", "남다른 시도로 새로운 가치를 만들고, 깊이 있는 전략으로 시장을 이끄는 마케터.", "#도전 #전략적 #리더십", "Negroni", "코랄 소스의 랍스터 테일"),
+    ("2", "Unexpected Innovator", "틀을 깨는 아이디어로 고객에게 놀라움을 선사하고, 늘 새로운 변화를 시도하는 마케터.", "#열정 #변주 #모험적", "Negroni", "파가든 브리오쉬 한우 버거"),
+    ("3", "Future Seeker", "시대의 흐름을 꿰뚫어 보고, 자신만의 방식으로 새로운 유행을 만들어가는 마케터.", "#전략적 #넓은시야 #영감", "Negroni", "아보카도 리코타 치즈 토스트"),
+    ("4", "Experience Architect", "고객의 오감을 사로잡는 디테일로, 상품을 넘어 완벽한 경험을 디자인하는 마케터.", "#조화 #섬세함 #소통", "Grapefruit Blossom", "망고 크림 새우"),
+    ("5", "Harmony Seeker", "서로 다른 요소를 균형 있게 조화시켜, 모두가 만족할 수 있는 안정적인 솔루션을 제시하는 마케터.", "#밸런스 #조화 #안정성", "Grapefruit Blossom", "고르곤졸라 피자"),
+    ("6", "Curious Explorer", "익숙함 속에서도 새로운 재미를 찾아내고, 고객의 호기심을 자극하며 다양성을 즐기는 마케터.", "#영감 #도전 #다양성", "Grapefruit Blossom", "와사비 젤리 허브 연어"),
+    ("7", "Positive Giver", "고객의 삶에 긍정적인 에너지와 영감을 불어넣으며, 좋은 라이프스타일을 자연스럽게 제안하는 마케터.", "#소통 #효율성 #안정성", "Fuzzy Navel", "아보카도 리코타 치즈 토스트"),
+    ("8", "Cozy Connector", "일상의 작은 행복을 소중히 여기고, 섬세한 감성으로 고객의 마음에 공감하며 편안함을 주는 마케터.", "#조화 #섬세함 #아우름", "Fuzzy Navel", "고르곤졸라 피자")
+]
+
+
+def make_test_data() -> Dict:
+    """Random receipt data for the 출력테스트 command"""
+    test_name = random.choice(TEST_NAMES)
+    test_type = random.choice(TEST_TYPES)
+    return {
+        "이름": test_name,
+        "번호": test_type[0],
+        "타입명": test_type[1],
+        "타입_설명": test_type[2],
+        "성향_키워드": test_type[3],
+        "음료": test_type[4],
+        "푸드": test_type[5]
+    }
+
+
+class KioskState(Enum):
+    WAITING = "waiting"
+    CHATTING = "chatting"
+    ENDED = "ended"
+    TRANSITIONING = "transitioning"
+
+
+class VisitorSession:
+    """Everything that belongs to one visitor; dropped when the cycle ends"""
+
+    def __init__(self, parser, renderer=None):
+        self.started_at = time.time()
+        self.speculative = SpeculativeReceipt(parser, renderer)
+        self.last_capture = 0.0
+
+
+class KioskController:
+    """Single loop that owns the kiosk's state and every visitor cycle"""
+
+    # Seconds between transcript re-captures after the conversation ended
+    RECAPTURE_INTERVAL = 1.0
+
+    # Consecutive failing steps before the controller gives up
+    MAX_CONSECUTIVE_ERRORS = 50
+    # Longest the print click waits on Gemini (limiter retries can take minutes); then the local parse prints
+    PRINT_WAIT_SECONDS = 20.0
+
+    def __init__(self, kiosk, parser, printer_factory: Optional[Callable] = None,
+                 poll_interval: float = 0.1, event_log=None, renderer=None):
+        self.kiosk = kiosk
+        self.parser = parser
+        # Anything with build_segments(data), e.g. a RenderWorker; default in-process
+        self.renderer = renderer
+        self.printer_factory = printer_factory
+        self.event_log = event_log
+        self.poll_interval = poll_interval
+        self.state = None
+        self.session: Optional[VisitorSession] = None
+        self.cycles = 0
+        self._printer = None
+        self._errors = 0
+
+    @property
+    def printer(self):
+        """Receipt printer, created once for the process"""
+        if self._printer is None:
+            if self.printer_factory:
+                self._printer = self.printer_factory()
+            else:
+                from receipt_printer import ReceiptPrinter
+                self._printer = ReceiptPrinter()
+        return self._printer
+
+    def enter(self, state: KioskState):
+        """Switch state and run its entry action"""
+        if state != self.state:
+            print(f"Kiosk state: {self.state.value if self.state else '-'} -> {state.value}")
+        self.state = state
+
+        if state == KioskState.WAITING:
+            if self.session is not None:
+                self.session.speculative.reset()
+                self.session = None
+                self.cycles += 1
+            self.kiosk.show_waiting_screen()
+        elif state == KioskState.CHATTING:
+            self.session = VisitorSession(self.parser, self.renderer)
+            self.record("visit")
+            self.kiosk.start_chat()
+        elif state == KioskState.TRANSITIONING:
+            pass
+
+    def run(self, max_cycles: Optional[int] = None, stop_event: Optional[threading.Event] = None):
+        """Run until stopped, or until max_cycles visitor cycles completed"""
+        self.enter(KioskState.WAITING)
+        while not (stop_event and stop_event.is_set()):
+            if max_cycles is not None and self.cycles >= max_cycles:
+                break
+            try:
+                self.step()
+                self._errors = 0
+            except Exception as e:
+                self._errors += 1
+                print(f"Kiosk error in state {self.state.value}: {e}")
+                if self._errors >= self.MAX_CONSECUTIVE_ERRORS:
+                    raise
+                time.sleep(1)
+                self.enter(KioskState.WAITING)
+            if self.poll_interval:
+                time.sleep(self.poll_interval)
+
+    def step(self):
+        """One tick of the state machine"""
+        if self.state == KioskState.WAITING:
+            if self.kiosk.poll_waiting():
+                print("Continue button clicked! Navigated to Gems")
+                self.enter(KioskState.CHATTING)
+
+        elif self.state in (KioskState.CHATTING, KioskState.ENDED):
+            flags = self.kiosk.read_flags()
+
+            if flags.get('exitCommand'):
+                print("Exit command detected, returning to waiting screen...")
+                self.record("exit")
+                self.enter(KioskState.WAITING)
+            elif flags.get('testCommand'):
+                print("Test command detected, creating test data...")
+                self.handle_test_print()
+                self.enter(KioskState.TRANSITIONING)
+            elif flags.get('printButtonClicked'):
+                print("Print button clicked detected!")
+                self.handle_print_click()
+                self.enter(KioskState.TRANSITIONING)
+            elif flags.get('gemsConversationEnded'):
+                if self.state == KioskState.CHATTING:
+                    self.enter(KioskState.ENDED)
+                self.capture_for_speculation()
+
+        elif self.state == KioskState.TRANSITIONING:
+            if self.kiosk.transition_complete():
+                print("Transition complete, returning to waiting screen...")
+                self.enter(KioskState.WAITING)
+
+    def capture_for_speculation(self):
+        """Capture the ended conversation and parse/render it ahead of the click"""
+        now = time.time()
+        if now - self.session.last_capture < self.RECAPTURE_INTERVAL:
+            return
+        self.session.last_capture = now
+        conversation_text = self.kiosk.capture_transcript()
+        if conversation_text:
+            self.session.speculative.update(conversation_text)
+
+    def handle_print_click(self):
+        """Show the transition and print the (usually ready) receipt"""
+        clicked_at = time.perf_counter()
+
+        # Extract the final conversation text before navigating
+        conversation_text = self.kiosk.capture_transcript()
+
+        # Navigate to transition page IMMEDIATELY
+        print("Navigating to transition page...")
+        self.kiosk.show_transition()
+
+        if not conversation_text:
+            print("No conversation text found!")
+            return
+
+        job = self.session.speculative.take(conversation_text)
+        if not job.wait(self.PRINT_WAIT_SECONDS):
+            print(f"Receipt not ready after {self.PRINT_WAIT_SECONDS:.0f}s, printing the local parse")
+            job = ReceiptJob(LocalParse(self.parser), conversation_text, self.renderer)
+            job.wait()
+        if job.segments is None:
+            self.record("parse_failure", job.parsed_data, job.timings, ok=False,
+                        error=str(job.error) if job.error else None)
+            return
+        print(f"Parsed data: {json.dumps(job.parsed_data, ensure_ascii=False, indent=2)}")
+        print("Sending to thermal printer...")
+        timings = dict(job.timings)
+        error = None
+        started = time.perf_counter()
+        try:
+            self.printer.print_prepared(job.parsed_data, job.segments, "thermal_print.png")
+        except Exception as ex:
+            print(f"Error in processing: {ex}")
+            error = str(ex)
+        ticket = getattr(self.printer, 'last_ticket', None)
+        if ticket is not None and error is None:
+            # Queued behind a printer that may not be ready; logged once it's out
+            ticket.add_done_callback(
+                lambda t: self._record_print(job.parsed_data, timings, started, clicked_at, t.error, t))
+        else:
+            self._record_print(job.parsed_data, timings, started, clicked_at, error)
+
+    def _record_print(self, data: Dict, timings: Dict, started: float, clicked_at: float,
+                      error: Optional[str], ticket=None):
+        finished = ticket.finished if ticket is not None else time.perf_counter()
+        timings['print'] = finished - started
+        timings['latency'] = finished - clicked_at
+        plan = getattr(self.printer, 'last_plan', None)
+        if plan is not None:
+            # What was printed and the estimate it was chosen on
+            data = dict(data, print_plan=plan.representation, print_estimate_s=round(plan.seconds, 2))
+        ok = error is None
+        if ticket is not None:
+            ok = ticket.ok
+            error = ticket.error or (None if ok else "print failed")
+            if ticket.held_s:
+                data = dict(data, print_held_s=round(ticket.held_s, 1))
+        self.record("print", data, timings, ok=ok, error=error)
+
+    def record(self, kind: str, data: Optional[Dict] = None, timings: Optional[Dict] = None,
+               ok: bool = True, error: Optional[str] = None):
+        """Append a visitor event to the event log, if there is one"""
+        if self.event_log is not None:
+            self.event_log.record(kind, data, timings, ok=ok, error=error)
+
+    def handle_test_print(self):
+        """출력테스트: print a receipt for random test data"""
+        test_data = make_test_data()
+
+        # Save test data
+        with open("parsed_conversation.json", 'w', encoding='utf-8') as f:
+            json.dump(test_data, f, ensure_ascii=False, indent=2)
+        print(f"Test data saved: {test_data['이름']} - {test_data['타입명']} (Type #{test_data['번호']})")
+
+        # Generate receipt with name
+        error = None
+        started = time.perf_counter()
+        try:
+            if self.renderer is not None:
+                segments = self.renderer.build_segments(test_data)
+                self.printer.print_prepared(test_data, segments, "thermal_print.png")
+            else:
+                self.printer.add_name_to_receipt(test_data, "thermal_print.png")
+        except Exception as e:
+            print(f"Error generating receipt: {e}")
+            error = str(e)
+        self.record("test_print", test_data, {'print': time.perf_counter() - started},
+                    ok=error is None, error=error)
+
+        # Navigate to transition screen
+        self.kiosk.show_transition()
+
+
+class SimulatedKiosk:
+    """Kiosk adapter that plays visitors through every state, for soak tests
+
+    Each visitor waits a few ticks, chats, ends the conversation, and then
+    either prints, runs 출력테스트, or types 종료.
+    """
+
+    def __init__(self, ticks_per_phase: int = 2, seed: int = 0):
+        self.ticks_per_phase = ticks_per_phase
+        self.random = random.Random(seed)
+        self._ticks = 0
+        self._page = None
+        self._script = []
+
+    def _advance(self) -> int:
+        self._ticks += 1
+        return self._ticks
+
+    def show_waiting_screen(self):
+        self._page = 'waiting'
+        self._ticks = 0
+
+    def poll_waiting(self) -> bool:
+        return self._advance() >= self.ticks_per_phase
+
+    def start_chat(self):
+        self._page = 'chat'
+        self._ticks = 0
+        ending = self.random.choices(['print', 'test', 'exit'], weights=[8, 1, 1])[0]
+        self._script = ['chat'] * self.ticks_per_phase
+        if ending == 'print':
+            self._script += ['ended'] * self.ticks_per_phase + ['printButtonClicked']
+        elif ending == 'test':
+            self._script += ['testCommand']
+        else:
+            self._script += ['exitCommand']
+
+    def read_flags(self) -> Dict:
+        event = self._script.pop(0) if self._script else 'chat'
+        flags = {'gemsConversationEnded': event in ('ended', 'printButtonClicked')}
+        if event in ('exitCommand', 'testCommand', 'printButtonClicked'):
+            flags[event] = True
+        return flags
+
+    def capture_transcript(self) -> str:
+        return f"{self.random.choice(TEST_NAMES)}님을 위한 메뉴를 Gems Station에서 준비해 드리겠습니다."
+
+    def show_transition(self):
+        self._page = 'transition'
+        self._ticks = 0
+
+    def transition_complete(self) -> bool:
+        return self._advance() >= self.ticks_per_phase
+
+
+class SimulatedParser:
+    """Instant stand-in for GeminiParser used by the soak benchmark"""
+
+    def parse_and_save(self, conversation_text: str) -> Dict:
+        data = make_test_data()
+        data["이름"] = conversation_text.split("님", 1)[0]
+        return data
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (0 if unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+def run_soak_benchmark(cycles: int = 10000, report_every: int = 1000, warmup: int = 100) -> Dict:
+    """Run simulated visitor cycles and check that threads and RSS stay flat
+
+    Rendering uses the real ReceiptPrinter (no thermal printer, no debug
+    images); parsing and the browser are simulated.
+    """
+    from receipt_printer import ReceiptPrinter
+
+    def make_printer():
+        printer = ReceiptPrinter(enable_thermal=False)
+        printer.save_debug_images = False
+        return printer
+
+    controller = KioskController(SimulatedKiosk(), SimulatedParser(),
+                                 printer_factory=make_printer, poll_interval=0)
+    samples = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        target = 0
+        while target < cycles:
+            target = min(cycles, target + (warmup if target == 0 else report_every))
+            controller.run(max_cycles=target)
+            log.seek(0)
+            log.truncate()
+            gc.collect()
+            samples.append((controller.cycles, threading.active_count(), _rss_bytes()))
+
+    duration = time.perf_counter() - started
+    baseline = samples[0]
+    result = {
+        "cycles": controller.cycles,
+        "duration_s": round(duration, 2),
+        "cycles_per_s": round(controller.cycles / duration, 1),
+        "threads_start": baseline[1],
+        "threads_end": samples[-1][1],
+        "threads_max": max(s[1] for s in samples),
+        "rss_start_mb": round(baseline[2] / 2**20, 1),
+        "rss_end_mb": round(samples[-1][2] / 2**20, 1),
+        "samples": samples,
+    }
+    return result
+
+
+# Soak benchmark
+if __name__ == "__main__":
+    import sys
+
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    result = run_soak_benchmark(cycles)
+    for done, threads, rss in result.pop("samples"):
+        print(f"cycles={done:6d}  threads={threads:3d}  rss={rss / 2**20:7.1f} MB")
+    print(json.dumps(result, indent=2))
+    flat = (result["threads_max"] - result["threads_start"] <= 2 and
+            result["rss_end_mb"] - result["rss_start_mb"] < 20)
+    print("✓ Threads and RSS stayed flat" if flat else "✗ Resource growth detected")
@@ -0,0 +1,186 @@
+"""Offline receipt extraction: visitor name + CSV type match
+
+The name is the only receipt field the pairing table can't supply, and
+the gem addresses the visitor as "OOO님" throughout, ending with the
+"Gems Station" line. Names are scored from:
+
+- honorific patterns (OOO님, 성함은 OOO, 저는 OOO입니다)
+- position (named in the closing Gems Station line, repeated across turns)
+- a frequency list of Korean given names (with or without a surname)
+
+The type comes from the last drink + food pair mentioned (or a type name)
+looked up in the CSV. The parser calls Gemini only when the combined
+confidence is below its threshold.
+
+    python local_extractor.py    extraction and timing on sample closings
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pairing_table import DEFAULT_CSV_PATH, compact, drink_spellings, load_pairing_rows
+
+DEFAULT_THRESHOLD = 0.8
+
+# Most frequent given names of the last few decades of birth registrations
+COMMON_GIVEN_NAMES = frozenset("""
+민준 서준 도윤 예준 시우 하준 주원 지호 지후 준우 준서 도현 건우 현우 우진 선우 서진 민재 현준 연우
+유준 정우 승우 승현 시윤 준혁 은우 지환 승민 지우 유찬 윤우 민성 준영 시후 진우 지훈 성민 수호 재윤
+민우 태윤 한결 이안 윤호 동현 지원 재원 민호 성현 상현 영호 영수 영철 정호 성호 상훈 성진 동훈 준호
+서연 서윤 지우 서현 민서 하은 하윤 윤서 지유 지민 채원 지윤 은서 수아 다은 예은 수빈 지아 소율 예린
+하린 예원 지원 수민 소윤 유나 시은 채은 유진 가은 서영 민지 예진 주아 하율 서아 다인 수연 지현 은지
+지수 수진 혜진 은영 미영 현정 정민 지혜 미경 은정 지영 수정 민정 혜원 유리 보람 소연 나연 다현 하늘
+""".split())
+
+COMMON_SURNAMES = frozenset("김이박최정강조윤장임한오서신권황안송류유전홍고문양손배백허남심노하곽성차주우구민진지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모탁국어은편용예경봉사부가복태목형피두감음빈동온호범좌팽승간상갈시단견당화창")
+
+# "님" words that aren't the visitor
+NOT_NAMES = frozenset("""
+고객 손님 여러분 선생 사장 회원 방문객 하느 선배 후배 교수 작가 대표 팀장 부장 과장 실장 저희 우리
+당신 친구 게스트 귀하 방문자 참가자 이용자 사용자 관리자 셰프 바텐더 """.split())
+
+HONORIFIC = re.compile(r"(?<![가-힣])([가-힣]{2,4})\s?님")
+# Same without the boundary: "안녕하세요지수님" style run-ons
+RUN_ON_HONORIFIC = re.compile(r"([가-힣]{3,6})님")
+SELF_INTRODUCTION = re.compile(
+    r"(?:성함은|이름은|제 이름은|저는)\s*([가-힣]{2,4}?)(?:이에요|예요|이요|입니다|이라고|라고|요)")
+CLOSING_MARKER = "gemsstation"
+
+
+def _given_name_score(name: str) -> float:
+    """1.0 for a common given name (with or without surname), else 0"""
+    if name in COMMON_GIVEN_NAMES:
+        return 1.0
+    if len(name) >= 3 and name[0] in COMMON_SURNAMES and name[1:] in COMMON_GIVEN_NAMES:
+        return 1.0
+    return 0.0
+
+
+def extract_name(text: str) -> Tuple[Optional[str], float]:
+    """(name, confidence 0-1) from the transcript; (None, 0.0) when nobody is named"""
+    lines = [line for line in (text or "").splitlines() if line.strip()]
+    scores: Dict[str, float] = defaultdict(float)
+    mentions: Dict[str, int] = defaultdict(int)
+    in_closing = set()
+
+    for index, line in enumerate(lines):
+        closing = CLOSING_MARKER in compact(line)
+        matches = list(HONORIFIC.finditer(line))
+        found: List[str] = [m.group(1) for m in matches]
+        matched_ends = {m.end() for m in matches}
+        for m in RUN_ON_HONORIFIC.finditer(line):
+            if m.end() in matched_ends:
+                continue
+            run_on = m.group(1)
+            for size in (4, 3, 2):
+                if len(run_on) > size and _given_name_score(run_on[-size:]):
+                    found.append(run_on[-size:])
+                    break
+        for name in found:
+            if name in NOT_NAMES or name[-2:] in NOT_NAMES:
+                continue
+            mentions[name] += 1
+            # Later turns are more likely the settled name
+            scores[name] += 1.0 + index / max(1, len(lines))
+            if closing:
+                in_closing.add(name)
+        for m in SELF_INTRODUCTION.finditer(line):
+            name = m.group(1)
+            if name not in NOT_NAMES:
+                mentions[name] += 1
+                scores[name] += 1.5
+
+    if not scores:
+        return None, 0.0
+
+    best = max(scores, key=lambda n: (scores[n] + 2.0 * (n in in_closing) + _given_name_score(n), mentions[n]))
+    confidence = 0.45
+    if best in in_closing:
+        confidence += 0.25
+    if _given_name_score(best):
+        confidence += 0.2
+    if mentions[best] >= 2:
+        confidence += 0.1
+    # Competing names split the confidence
+    confidence *= scores[best] / sum(scores.values())
+    return best, round(min(confidence, 1.0), 3)
+
+
+def _last_position(key: str, spellings) -> int:
+    return max((key.rfind(compact(s)) for s in spellings if compact(s)), default=-1)
+
+
+def match_type(text: str, csv_path: str = DEFAULT_CSV_PATH) -> Tuple[Optional[Dict[str, str]], float]:
+    """(pairing row, confidence) from the last drink/food pair or type name mentioned"""
+    rows = load_pairing_rows(csv_path)
+    key = compact(text)
+    if not rows or not key:
+        return None, 0.0
+
+    drinks = {row['음료'] for row in rows}
+    foods = {row['푸드'] for row in rows}
+    drink_at = {d: _last_position(key, drink_spellings(d)) for d in drinks}
+    food_at = {f: _last_position(key, (f,)) for f in foods}
+    drink = max(drink_at, key=drink_at.get)
+    food = max(food_at, key=food_at.get)
+    type_at = {row['번호']: key.rfind(compact(row['타입명'])) for row in rows}
+    named = max(type_at, key=type_at.get)
+
+    if drink_at[drink] >= 0 and food_at[food] >= 0:
+        for row in rows:
+            if compact(row['음료']) == compact(drink) and compact(row['푸드']) == compact(food):
+                agrees = type_at[named] < 0 or named == row['번호']
+                return dict(row), 1.0 if agrees else 0.5
+    if type_at[named] >= 0:
+        row = next(r for r in rows if r['번호'] == named)
+        return dict(row), 0.9
+    # Only half of the pair: the first type with it is a weak guess, still better than Unknown
+    for row in rows:
+        if ((drink_at[drink] >= 0 and compact(row['음료']) == compact(drink))
+                or (food_at[food] >= 0 and compact(row['푸드']) == compact(food))):
+            return dict(row), 0.3
+    return None, 0.0
+
+
+class LocalExtractor:
+    """Builds a complete receipt without the network, with a confidence score"""
+
+    def __init__(self, csv_path: str = DEFAULT_CSV_PATH):
+        self.csv_path = csv_path
+
+    def extract(self, conversation_text: str) -> Tuple[Dict[str, str], float]:
+        """(receipt fields, confidence); confidence is the weaker of name and type"""
+        name, name_confidence = extract_name(conversation_text)
+        row, type_confidence = match_type(conversation_text, self.csv_path)
+        result = {
+            "이름": name or "고객",
+            "번호": "1",
+            "타입명": "Unknown",
+            "타입_설명": "",
+            "성향_키워드": "",
+            "음료": "",
+            "푸드": "",
+        }
+        if row:
+            result.update(row)
+        return result, min(name_confidence, type_confidence)
+
+
+if __name__ == "__main__":
+    import time
+
+    samples = [
+        "지수님을 위한 특별한 메뉴를 Gems Station에서 바로 준비해 드리겠습니다.\n"
+        "지수님께는 네그로니와 코랄 소스의 랍스터 테일을 추천드립니다.",
+        "Gems Station에서 민준님을 위한 메뉴를 소개합니다.\n"
+        "Unexpected Innovator 타입이신 민준님께는 네그로니와 파가든 브리오쉬 한우 버거를 추천드립니다.",
+        "서연님, Gems Station입니다. Future Seeker 타입으로 분석되었습니다.",
+        "서빈버스트와 망고크림새우가 잘 어울리는 Universal Pleaser 타입이세요! Gems Station으로 오세요.",
+    ]
+    extractor = LocalExtractor()
+    for sample in samples:
+        started = time.perf_counter()
+        result, confidence = extractor.extract(sample)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{confidence:.2f}  {result['이름']:4s} #{result['번호']:>2s} {result['타입명']:22s} {elapsed:.2f} ms")
@@ -0,0 +1,466 @@
+"""Keep printing through network outages and reconcile afterwards
+
+When the venue Wi-Fi dropped, every parse sat out the Gemini client
+timeout and then printed a type-1 "Unknown" receipt. In offline mode:
+
+- ConnectivityMonitor probes the API host every few seconds, and goes
+  offline at once when a Gemini call fails or its probes stall
+- OfflineAwareParser resolves the receipt locally (LocalExtractor) while
+  offline, prints straight away and journals the transcript
+- Reconciler re-parses the journaled transcripts with Gemini once the link
+  is back, at test-print priority, and flags receipts that came out
+  different from what was printed
+
+    python offline_mode.py    visitor throughput through a simulated outage
+"""
+
+import http.client
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Callable, Dict, List, Optional
+
+from gemini_backends import BackendError
+from gemini_limiter import PRIORITY_TEST, current_priority, request_priority
+from transcript_reducer import format_stats
+
+API_HOST = "generativelanguage.googleapis.com"
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gems_offline_journal.sqlite3")
+
+# Fields compared when a journaled receipt is re-parsed
+RECONCILED_FIELDS = ("이름", "번호")
+# Gemini replies a journaled transcript may get wrong before it is marked failed
+MAX_RECONCILE_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id              INTEGER PRIMARY KEY,
+    ts              REAL NOT NULL,
+    reason          TEXT,
+    transcript      TEXT NOT NULL,
+    local_result    TEXT NOT NULL,
+    confidence      REAL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    remote_result   TEXT,
+    mismatched      TEXT,
+    reconciled_at   REAL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_status ON journal (status, id);
+"""
+
+
+def tcp_probe(host: str = API_HOST, port: int = 443, timeout: float = 1.5) -> Callable[[], bool]:
+    """Probe that succeeds when a TCP connection to host:port opens"""
+    def probe() -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+    return probe
+
+
+def http_probe(base_url: str, timeout: float = 1.0) -> Callable[[], bool]:
+    """Probe that succeeds on any HTTP answer from base_url"""
+    parts = urllib.parse.urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+
+    def probe() -> bool:
+        conn = connection_class(parts.netloc, timeout=timeout)
+        try:
+            conn.request('GET', (parts.path or '') + '/v1beta/models/probe')
+            conn.getresponse().read()
+            return True
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+    return probe
+
+
+class ConnectivityMonitor:
+    """Tracks whether Gemini is reachable; listeners hear every transition"""
+
+    def __init__(self, probe: Optional[Callable[[], bool]] = None, interval: float = 3.0,
+                 stale_after: Optional[float] = None):
+        self.probe = probe or tcp_probe()
+        self.interval = interval
+        # A probe stuck in DNS counts as offline once no probe succeeded for this long
+        self.stale_after = stale_after or interval * 3
+        self.outages = 0
+        self.last_success = time.monotonic()
+        self._online = True
+        self._listeners: List[Callable[[bool], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def online(self) -> bool:
+        with self._lock:
+            return self._online and time.monotonic() - self.last_success < self.stale_after
+
+    def add_listener(self, listener: Callable[[bool], None]):
+        self._listeners.append(listener)
+
+    def report_failure(self):
+        """A Gemini call just failed; go offline until a probe says otherwise"""
+        self._set(False)
+
+    def check(self) -> bool:
+        online = self.probe()
+        self._set(online)
+        return online
+
+    def _set(self, online: bool):
+        with self._lock:
+            if online:
+                self.last_success = time.monotonic()
+            changed = online != self._online
+            self._online = online
+            if changed and not online:
+                self.outages += 1
+        if changed:
+            print(f"Network {'back online' if online else 'OFFLINE'}: "
+                  f"{'reconciling journaled receipts' if online else 'printing from local resolution'}")
+            for listener in self._listeners:
+                try:
+                    listener(online)
+                except Exception as e:
+                    print(f"Connectivity listener failed: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "ConnectivityMonitor":
+        self._thread = threading.Thread(target=self._run, name="connectivity", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+class TranscriptJournal:
+    """Transcripts printed from local resolution, awaiting a Gemini re-parse"""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(journal)")}
+        if "attempts" not in columns:
+            # Journal written before attempts were tracked
+            with self._conn:
+                self._conn.execute("ALTER TABLE journal ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute("ALTER TABLE journal ADD COLUMN last_error TEXT")
+
+    def add(self, transcript: str, local_result: Dict, confidence: float, reason: str) -> Optional[int]:
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO journal (ts, reason, transcript, local_result, confidence) VALUES (?,?,?,?,?)",
+                    (time.time(), reason, transcript, json.dumps(local_result, ensure_ascii=False), confidence))
+            return cursor.lastrowid
+        except Exception as e:
+            print(f"Offline journal write failed: {e}")
+            return None
+
+    def pending(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ts, transcript, local_result FROM journal WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (limit,)).fetchall()
+        return [{"id": i, "ts": ts, "transcript": t, "local_result": json.loads(r)} for i, ts, t, r in rows]
+
+    def resolve(self, entry_id: int, remote_result: Dict, mismatched: List[str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE journal SET status = ?, remote_result = ?, mismatched = ?, reconciled_at = ? WHERE id = ?",
+                ("mismatch" if mismatched else "match", json.dumps(remote_result, ensure_ascii=False),
+                 ",".join(mismatched) or None, time.time(), entry_id))
+
+    def attempt_failed(self, entry_id: int, error: str, max_attempts: int = MAX_RECONCILE_ATTEMPTS) -> bool:
+        """Count a Gemini reply that couldn't be used; True once the entry is marked failed"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE journal SET attempts = attempts + 1, last_error = ?,"
+                " status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE status END WHERE id = ?",
+                (error, max_attempts, entry_id))
+            row = self._conn.execute("SELECT status FROM journal WHERE id = ?", (entry_id,)).fetchone()
+        return bool(row) and row[0] == "failed"
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM journal GROUP BY status").fetchall()
+        return dict(rows)
+
+    def mismatches(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ts, local_result, remote_result, mismatched FROM journal"
+                " WHERE status = 'mismatch' ORDER BY id").fetchall()
+        return [{"id": i, "ts": ts, "local": json.loads(l), "remote": json.loads(r), "fields": m.split(",")}
+                for i, ts, l, r, m in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OfflineAwareParser:
+    """GeminiParser front that never waits on a dead network
+
+    Same parse_conversation / parse_and_save interface as GeminiParser;
+    other attributes are the wrapped parser's.
+    """
+
+    def __init__(self, parser, monitor: ConnectivityMonitor, journal: TranscriptJournal):
+        self.parser = parser
+        self.monitor = monitor
+        self.journal = journal
+
+    def __getattr__(self, name):
+        return getattr(self.parser, name)
+
+    def parse_conversation(self, conversation_text: str) -> Dict:
+        reduced, stats = self.parser.reducer.reduce(conversation_text)
+        print(f"Transcript reduced: {format_stats(stats)}")
+        local_result, confidence = self.parser.local.extract(reduced)
+        if confidence >= self.parser.local_threshold:
+            return local_result
+
+        if self.monitor.online:
+            remote_result, reason = self._parse_remote_while_online(reduced)
+            if remote_result is not None:
+                return remote_result
+        else:
+            reason = "offline"
+        print(f"Printing local resolution ({reason}, confidence {confidence:.2f}); journaled for reconciliation")
+        self.journal.add(conversation_text, local_result, confidence, reason)
+        return local_result
+
+    def _parse_remote_while_online(self, reduced: str):
+        """(result, None), or (None, reason) if Gemini failed or the link dropped mid-call
+
+        The call runs on a helper thread so a visitor waits for the monitor
+        to notice an outage, not for the client timeout.
+        """
+        outcome = {}
+        done = threading.Event()
+        priority = current_priority()
+
+        def call():
+            try:
+                with request_priority(priority):
+                    outcome["result"] = self.parser.parse_remote(reduced, raise_errors=True)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=call, name="remote-parse", daemon=True).start()
+        while not done.wait(0.05):
+            if not self.monitor.online:
+                return None, "went offline"
+        error = outcome.get("error")
+        if isinstance(error, BackendError):
+            if error.status == 429:
+                # Gemini is up but over quota: print locally, reconcile later
+                return None, "gemini over quota"
+            if error.status is None:
+                # Never got an answer: that is the link, not Gemini
+                self.monitor.report_failure()
+                return None, "gemini unreachable"
+            return None, "gemini failed"
+        if isinstance(error, ValueError):
+            # Gemini answered, just not with usable JSON; the link is fine
+            return None, "gemini reply unusable"
+        if error is not None:
+            raise error
+        return outcome["result"], None
+
+    def parse_and_save(self, conversation_text: str, output_path: str = "parsed_conversation.json") -> Dict:
+        result = self.parse_conversation(conversation_text)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        return result
+
+
+class Reconciler:
+    """Re-parses journaled transcripts with Gemini in the background"""
+
+    def __init__(self, parser, journal: TranscriptJournal, monitor: ConnectivityMonitor,
+                 event_log=None, interval: float = 30.0, batch: int = 10):
+        self.parser = parser
+        self.journal = journal
+        self.monitor = monitor
+        self.event_log = event_log
+        self.interval = interval
+        self.batch = batch
+        self.reconciled = 0
+        self.mismatched = 0
+        self.failed = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Reconcile up to one batch; returns how many entries were resolved"""
+        resolved = 0
+        for entry in self.journal.pending(self.batch):
+            if not self.monitor.online or self._stop.is_set():
+                break
+            reduced, _ = self.parser.reducer.reduce(entry["transcript"])
+            try:
+                # Visitors waiting on a live parse go first
+                with request_priority(PRIORITY_TEST):
+                    remote = self.parser.parse_remote(reduced, raise_errors=True)
+            except BackendError as e:
+                if e.status is None:
+                    self.monitor.report_failure()
+                    break
+                if e.status == 429:
+                    # Over quota: the rest of the batch would be refused too
+                    break
+                self._attempt_failed(entry, e)
+                continue
+            except ValueError as e:
+                self._attempt_failed(entry, e)
+                continue
+
+            local = entry["local_result"]
+            mismatched = [field for field in RECONCILED_FIELDS
+                          if str(remote.get(field, "")).strip() != str(local.get(field, "")).strip()]
+            self.journal.resolve(entry["id"], remote, mismatched)
+            resolved += 1
+            self.reconciled += 1
+            if mismatched:
+                self.mismatched += 1
+                detail = ", ".join(f"{f} {local.get(f)!r} vs {remote.get(f)!r}" for f in mismatched)
+                print(f"Offline receipt #{entry['id']} differs from Gemini: {detail}")
+                if self.event_log:
+                    self.event_log.record("reconcile_mismatch", local, ok=False, error=detail)
+        return resolved
+
+    def _attempt_failed(self, entry: Dict, error: Exception):
+        """Gemini answered but the entry couldn't be resolved; give up after a few tries"""
+        if self.journal.attempt_failed(entry["id"], str(error)):
+            self.failed += 1
+            print(f"Offline receipt #{entry['id']} not reconciled after {MAX_RECONCILE_ATTEMPTS} tries: {error}")
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while self.monitor.online and self.run_once() == self.batch:
+                    pass
+            except Exception as e:
+                print(f"Reconciliation failed: {e}")
+
+    def start(self) -> "Reconciler":
+        self.monitor.add_listener(lambda online: online and self.wake())
+        self._thread = threading.Thread(target=self._run, name="reconciler", daemon=True)
+        self._thread.start()
+        self.wake()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+def simulate_outage(visitors: int = 40, arrival: float = 0.1, outage=(1.0, 3.0),
+                    timeout: float = 1.5, offline_mode: bool = True) -> Dict:
+    """Parse a steady stream of visitors while the uplink drops for a while
+
+    outage is (start, end) seconds into the run. Transcripts never reach
+    local confidence, so every parse wants Gemini.
+    """
+    import tempfile
+
+    from gemini_backends import FakeGeminiServer, HttpBackend
+    try:
+        from gemini_parser import GeminiParser
+    except ImportError:
+        from gemini_parser_no_pandas import GeminiParser
+    from kiosk_controller import TEST_NAMES, TEST_TYPES
+    from local_extractor import extract_name, match_type
+
+    # Drink only: locally a weak guess, so every parse wants Gemini
+    transcripts = [f"{TEST_NAMES[i % len(TEST_NAMES)]}님께는 {TEST_TYPES[i % len(TEST_TYPES)][4]}를 추천드려요. "
+                   f"Gems Station에서 만나요!" for i in range(visitors)]
+
+    def responder(prompt: str) -> str:
+        conversation = prompt.split("대화 내용:")[1].split("다음 형식의 JSON")[0]
+        row, _ = match_type(conversation)
+        return json.dumps(dict(row or {}, 이름=extract_name(conversation)[0]), ensure_ascii=False)
+
+    with FakeGeminiServer(latency=0.05, responder=responder) as server, tempfile.TemporaryDirectory() as tmp:
+        parser = GeminiParser("", backend=HttpBackend(server.url, timeout=timeout), local_threshold=1.01)
+        monitor = ConnectivityMonitor(http_probe(server.url, timeout=0.3), interval=0.25).start()
+        journal = TranscriptJournal(os.path.join(tmp, "journal.sqlite3"))
+        reconciler = Reconciler(parser, journal, monitor, interval=0.5).start()
+        front = OfflineAwareParser(parser, monitor, journal) if offline_mode else parser
+
+        def toggle():
+            time.sleep(outage[0])
+            server.outage = True
+            time.sleep(outage[1] - outage[0])
+            server.outage = False
+
+        threading.Thread(target=toggle, daemon=True).start()
+        latencies = []
+        started = time.perf_counter()
+        for i, transcript in enumerate(transcripts):
+            # Visitors arrive on a fixed schedule; a slow parse delays the ones behind it
+            arrived = started + i * arrival
+            time.sleep(max(0.0, arrived - time.perf_counter()))
+            front.parse_conversation(transcript)
+            # Includes waiting behind slower visitors
+            latencies.append(time.perf_counter() - arrived)
+        duration = time.perf_counter() - started
+
+        # Let the reconciler catch up after the outage
+        deadline = time.monotonic() + 5
+        while journal.counts().get("pending") and time.monotonic() < deadline:
+            time.sleep(0.1)
+        reconciler.stop()
+        monitor.stop()
+        counts = journal.counts()
+        journal.close()
+
+    latencies.sort()
+    return {
+        "offline_mode": offline_mode,
+        "visitors": visitors,
+        "duration_s": round(duration, 2),
+        "throughput_per_s": round(visitors / duration, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+        "journal": counts,
+    }
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    print("40 visitors at 10/s, uplink down from 1s to 3s, 1.5s client timeout:\n")
+    for offline_mode in (False, True):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = simulate_outage(offline_mode=offline_mode)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
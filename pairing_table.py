@@ -0,0 +1,96 @@
+"""Pairing table and menu names from the F&B CSV
+
+Reads the same sheet as the parsers with the stdlib csv module: the menu
+list (columns 2-5) and the 24-type pairing list (columns 8-14). Gemini
+usually writes the drinks in Hangul, so the English names carry the
+spellings seen in transcripts as aliases.
+"""
+
+import csv
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+DEFAULT_CSV_PATH = "res/GML25_F&B Menu.csv"
+
+# Hangul spellings of the drink names, as Gemini writes them
+DRINK_ALIASES = {
+    "Negroni": ("네그로니",),
+    "Grapefruit Blossom": ("그레이프프루트 블라썸", "그레이프프루트 블로썸", "자몽 블라썸"),
+    "Fuzzy Navel": ("퍼지 네이블", "퍼지네이블"),
+    "Surbin Burst": ("서빈 버스트", "서빈버스트", "수빈 버스트"),
+    "Blue Hawaii": ("블루 하와이",),
+    "Blue Summer Cooler": ("블루 썸머 쿨러", "블루 서머 쿨러"),
+    "Green Mirage": ("그린 미라지",),
+    "Mojito": ("모히또", "모히토"),
+}
+
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def compact(text: str) -> str:
+    """Lowercase with spaces and punctuation removed, for loose matching"""
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+@lru_cache(maxsize=4)
+def load_pairing_rows(csv_path: str = DEFAULT_CSV_PATH) -> Tuple[Dict[str, str], ...]:
+    """The 24 pairing types, keyed like the parser output (번호, 타입명, ...)"""
+    rows = []
+    try:
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if len(row) <= 14 or not row[8].strip().isdigit():
+                    continue
+                if not 1 <= int(row[8]) <= 24 or not row[10].strip():
+                    continue
+                rows.append({
+                    '번호': row[8].strip(),
+                    '타입명': row[10].strip(),
+                    '타입_설명': row[11].strip(),
+                    '음료': row[12].strip(),
+                    '푸드': row[13].strip(),
+                    '성향_키워드': row[14].strip(),
+                })
+    except Exception as e:
+        print(f"Error loading pairing table: {e}")
+    return tuple(rows)
+
+
+@lru_cache(maxsize=4)
+def load_menu_items(csv_path: str = DEFAULT_CSV_PATH) -> Dict[str, Tuple[str, ...]]:
+    """Drink and food names ({'음료': (...), '푸드': (...)}) from the menu and pairing lists"""
+    items: Dict[str, List[str]] = {'음료': [], '푸드': []}
+    try:
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            category = None
+            for row in csv.reader(f):
+                # Menu list: the category is only filled on its first row
+                if len(row) > 4 and row[3].strip().isdigit() and row[4].strip():
+                    category = row[2].strip() or category
+                    if category in items:
+                        items[category].append(row[4].strip())
+    except Exception as e:
+        print(f"Error loading menu items: {e}")
+    for row in load_pairing_rows(csv_path):
+        items['음료'].append(row['음료'])
+        items['푸드'].append(row['푸드'])
+    return {category: tuple(dict.fromkeys(n for n in names if n)) for category, names in items.items()}
+
+
+def drink_spellings(name: str) -> Tuple[str, ...]:
+    """The drink name plus its Hangul aliases"""
+    for canonical, aliases in DRINK_ALIASES.items():
+        if compact(canonical) == compact(name):
+            return (canonical,) + aliases
+    return (name,)
+
+
+@lru_cache(maxsize=4)
+def menu_terms(csv_path: str = DEFAULT_CSV_PATH) -> Tuple[str, ...]:
+    """Every drink, food and type name worth spotting in a transcript"""
+    items = load_menu_items(csv_path)
+    terms = [spelling for drink in items['음료'] for spelling in drink_spellings(drink)]
+    terms.extend(items['푸드'])
+    terms.extend(row['타입명'] for row in load_pairing_rows(csv_path))
+    return tuple(dict.fromkeys(terms))
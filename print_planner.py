@@ -0,0 +1,168 @@
+"""Choose how to print a receipt so it finishes within a time budget
+
+On the 19200 baud link even the optimized raster receipt takes ~10s, longer
+than the transition animation. For every job the planner estimates how long
+each representation takes (bytes over the link, paper travel under the
+head, the cut) and picks the first one that fits the budget, best first:
+
+- raster       the optimized raster receipt, in bands of BAND_ROWS rows
+- half height  the same at half the rows, printed in double-height mode
+- text body    header / name band as raster, the template body as text
+- text         the text receipt
+
+If none fits, the fastest one is used. The decision is printed and kept
+as ReceiptPrinter.last_plan for the event log. The budget is
+"print_budget_seconds" in credentials.json; without it every job prints
+the full raster (the estimate is still logged), and a receipt that hasn't
+been rendered yet is streamed (band_stream) instead of planned.
+
+    python print_planner.py [budget_s] [baudrate]    decisions for all 24 types
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bitmap_converter import BAND_ROWS
+from raster_optimizer import (CUT_SECONDS, DEFAULT_BAUDRATE, DEFAULT_HEAD_SPEED_MM_S, motion_seconds,
+                              transfer_seconds)
+from receipt_text_printer import ReceiptTextPrinter
+from text_layout import LINE_SPACING_DOTS
+
+# Length of the transition animation the visitor watches while printing;
+# the natural budget on the serial link
+TRANSITION_SECONDS = 5.0
+
+INIT = b"\x1B\x40"
+# Same trailer as WindowsThermalPrinter.print_raster_segments
+CUT = b"\n\n\n\x1D\x56\x01"
+CUT_FEED_DOTS = 3 * LINE_SPACING_DOTS
+
+
+def estimate_seconds(size: int, paper_dots: int, baudrate: int = DEFAULT_BAUDRATE,
+                     head_speed_mm_s: float = DEFAULT_HEAD_SPEED_MM_S) -> float:
+    """Transfer and paper travel overlap, so the slower of the two, plus the cut"""
+    return max(transfer_seconds(size, baudrate), motion_seconds(paper_dots, head_speed_mm_s)) + CUT_SECONDS
+
+
+def text_paper_dots(stream: bytes) -> int:
+    """Rough paper length of a text stream: one line per LF, n per ESC d n"""
+    lines = stream.count(b"\n")
+    start = stream.find(b"\x1Bd")
+    while start >= 0 and start + 2 < len(stream):
+        lines += stream[start + 2]
+        start = stream.find(b"\x1Bd", start + 3)
+    return lines * LINE_SPACING_DOTS
+
+
+def raster_bands(segments, band_rows: int = BAND_ROWS):
+    """Every segment's bands, top to bottom"""
+    for seg in segments:
+        yield from seg.bands(band_rows)
+
+
+def band_stream(bands: Iterable) -> Iterator[bytes]:
+    """The raster receipt as ESC/POS chunks, one per band; a band is only taken when its chunk is wanted"""
+    yield INIT
+    for band in bands:
+        yield band.optimized
+    yield CUT
+
+
+class PrintPlan:
+    """The bytes chosen for one job and why"""
+
+    def __init__(self, representation: str, stream: bytes, seconds: float, budget_s: Optional[float],
+                 estimates: Dict[str, float]):
+        self.representation = representation
+        self.stream = stream
+        self.seconds = seconds
+        self.budget_s = budget_s
+        self.estimates = estimates
+
+    @property
+    def fits(self) -> bool:
+        return self.budget_s is None or self.seconds <= self.budget_s
+
+    def summary(self) -> str:
+        considered = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.estimates.items())
+        budget = "no budget" if self.budget_s is None else f"budget {self.budget_s:.1f}s"
+        verdict = "" if self.fits else ", over budget"
+        return (f"{self.representation}, {len(self.stream):,} bytes, ~{self.seconds:.1f}s "
+                f"({budget}{verdict}; {considered})")
+
+
+class PrintPlanner:
+    """Picks the best receipt representation that prints within budget_s"""
+
+    def __init__(self, budget_s: Optional[float] = None, baudrate: int = DEFAULT_BAUDRATE,
+                 head_speed_mm_s: float = DEFAULT_HEAD_SPEED_MM_S):
+        """
+        Args:
+            budget_s: Seconds a print may take; None or 0 always prints the full raster
+            baudrate: Link speed to the printer
+            head_speed_mm_s: Paper speed while printing
+        """
+        self.budget_s = budget_s or None
+        self.baudrate = baudrate
+        self.head_speed_mm_s = head_speed_mm_s
+        self.text_printer = ReceiptTextPrinter()
+
+    def _candidates(self, data: Dict, segments) -> List[Tuple[str, object]]:
+        """(representation, () -> (stream, paper_dots)) best first; streams are built on demand"""
+        raster_dots = sum(seg.height for seg in segments) + CUT_FEED_DOTS
+
+        def text_body():
+            # The last segment is the template body; anything above it stays raster
+            stream = (INIT + b"".join(seg.optimized for seg in segments[:-1])
+                      + self.text_printer.build_receipt_bytes(data, include_name=False))
+            return stream, sum(seg.height for seg in segments[:-1]) + text_paper_dots(stream)
+
+        def text():
+            stream = self.text_printer.build_receipt_bytes(data)
+            return stream, text_paper_dots(stream)
+
+        return [
+            ("raster", lambda: (b"".join(band_stream(raster_bands(segments))), raster_dots)),
+            ("half height", lambda: (INIT + b"".join(seg.half_height for seg in segments) + CUT, raster_dots)),
+            ("text body", text_body),
+            ("text", text),
+        ]
+
+    def plan(self, data: Dict, segments) -> PrintPlan:
+        estimates: Dict[str, float] = {}
+        fastest = None
+        for representation, build in self._candidates(data, segments):
+            stream, paper_dots = build()
+            seconds = estimate_seconds(len(stream), paper_dots, self.baudrate, self.head_speed_mm_s)
+            estimates[representation] = seconds
+            candidate = (representation, stream, seconds)
+            if self.budget_s is None or seconds <= self.budget_s:
+                fastest = candidate
+                break
+            if fastest is None or seconds < fastest[2]:
+                fastest = candidate
+        plan = PrintPlan(fastest[0], fastest[1], fastest[2], self.budget_s, estimates)
+        print(f"Print plan: {plan.summary()}")
+        return plan
+
+    def streamed(self, stream: bytes, paper_dots: int) -> PrintPlan:
+        """Plan record for a raster receipt that was streamed rather than planned"""
+        seconds = estimate_seconds(len(stream), paper_dots + CUT_FEED_DOTS, self.baudrate, self.head_speed_mm_s)
+        return PrintPlan("raster", stream, seconds, self.budget_s, {"raster": seconds})
+
+
+if __name__ == "__main__":
+    import sys
+    from collections import Counter
+
+    from pairing_table import load_pairing_rows
+    from receipt_printer import ReceiptPrinter
+
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else TRANSITION_SECONDS
+    baudrate = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BAUDRATE
+    printer = ReceiptPrinter(enable_thermal=False)
+    planner = PrintPlanner(budget, baudrate)
+    chosen = Counter()
+    for row in load_pairing_rows():
+        data = dict(row, 이름="김치맛강정은별로야")
+        chosen[planner.plan(data, printer.build_segments(data)).representation] += 1
+    print(f"\nBudget {budget:.1f}s at {baudrate} baud: " + ", ".join(f"{k} x{v}" for k, v in chosen.items()))
@@ -0,0 +1,252 @@
+"""Printer backends, probed once at startup
+
+There used to be three overlapping print paths chosen by import side
+effects: win32print RAW/GDI, HW_API.dll, and the text receipt tried only
+after an image print failed. Each backend here declares what it can do
+and how fast it is; the registry probes every enabled backend once and
+ReceiptPrinter prints through the fastest healthy one, in the form that
+backend supports. A backend that fails a print is taken out, the job goes
+to the next one once, and later jobs go straight to it.
+
+Capabilities:
+    raster   takes raw ESC/POS bytes (GS v 0 rasters, text, cut) in one job
+    image    prints a bitmap through its driver
+    text     prints text commands
+    cut      cuts the paper
+    status   reports real printer status (paper, cover); read_status()
+             feeds printer_status.StatusMonitor
+
+    python printer_backends.py    probe report
+"""
+
+import os
+import platform
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from printer_status import OFFLINE, UNKNOWN, PrinterStatus, decode_dll, decode_realtime, decode_spooler
+from raster_optimizer import DEFAULT_BAUDRATE, transfer_seconds
+
+# Measured on the 24 receipt templates (raster_optimizer / printer_emulator benchmarks)
+TYPICAL_RASTER_BYTES = 73_500
+TYPICAL_OPTIMIZED_BYTES = 19_000
+TYPICAL_TEXT_BYTES = 450
+
+
+class PrinterBackend:
+    """A way of reaching the printer; probe() opens it once"""
+
+    name = "base"
+    capabilities = frozenset()
+
+    def __init__(self, baudrate: int = DEFAULT_BAUDRATE):
+        self.baudrate = baudrate
+        self.printer = None
+        self.healthy = False
+        self.error: Optional[str] = None
+        self.probe_ms: Optional[float] = None
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether this backend can exist on this machine at all"""
+        return True
+
+    def open(self):
+        """Printer object (ThermalPrinter interface); raises if unreachable"""
+        raise NotImplementedError
+
+    def probe(self) -> bool:
+        started = time.perf_counter()
+        try:
+            self.printer = self.open()
+            self.healthy = bool(getattr(self.printer, 'is_connected', True))
+            if not self.healthy:
+                self.error = "not connected"
+        except Exception as e:
+            self.printer = None
+            self.healthy = False
+            self.error = str(e)
+        self.probe_ms = (time.perf_counter() - started) * 1000
+        return self.healthy
+
+    def supports(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+    def read_status(self) -> PrinterStatus:
+        """Printer status right now; UNKNOWN when this backend can't tell"""
+        if self.printer is None:
+            return PrinterStatus(OFFLINE, raw=self.error)
+        if not self.supports("status"):
+            return PrinterStatus(UNKNOWN)
+        return self._read_status()
+
+    def _read_status(self) -> PrinterStatus:
+        raise NotImplementedError
+
+    def receipt_seconds(self) -> float:
+        """Estimated transfer time of a typical receipt in the best form this backend takes"""
+        if self.supports("raster"):
+            size = TYPICAL_OPTIMIZED_BYTES
+        elif self.supports("image"):
+            size = TYPICAL_RASTER_BYTES
+        else:
+            size = TYPICAL_TEXT_BYTES
+        return transfer_seconds(size, self.baudrate)
+
+    def describe(self) -> Dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "capabilities": sorted(self.capabilities),
+            "receipt_s": round(self.receipt_seconds(), 1),
+            "probe_ms": None if self.probe_ms is None else round(self.probe_ms, 1),
+            "error": self.error,
+        }
+
+
+class WindowsRawBackend(PrinterBackend):
+    """win32print RAW jobs to the installed HMK-072 driver (windows_thermal_printer)"""
+
+    name = "win32-raw"
+    # Status is what the spooler knows; drivers differ in how much they report
+    capabilities = frozenset({"raster", "image", "text", "cut", "status"})
+
+    @classmethod
+    def available(cls) -> bool:
+        return platform.system() == 'Windows'
+
+    def open(self):
+        from windows_thermal_printer import ThermalPrinter
+        return ThermalPrinter(port=0, baudrate=self.baudrate, interface='SERIAL')
+
+    def _read_status(self) -> PrinterStatus:
+        return decode_spooler(self.printer.spooler_status())
+
+
+class DllBackend(PrinterBackend):
+    """HW_API.dll on LPT0 (thermal_printer); images go through a BMP file"""
+
+    name = "hw-api-dll"
+    capabilities = frozenset({"image", "text", "cut", "status"})
+
+    @classmethod
+    def available(cls) -> bool:
+        return platform.system() == 'Windows'
+
+    def open(self):
+        from thermal_printer import DllThermalPrinter
+        printer = DllThermalPrinter(port=0, baudrate=self.baudrate, interface='SERIAL')
+        printer.connect()
+        return printer
+
+    def _read_status(self) -> PrinterStatus:
+        return decode_dll(self.printer.get_status())
+
+
+class EmulatorBackend(PrinterBackend):
+    """The virtual HMK-072 (printer_emulator), in-process or over TCP"""
+
+    name = "emulator"
+    capabilities = frozenset({"raster", "image", "text", "cut", "status"})
+
+    def __init__(self, emulator=None, address: Optional[Tuple[str, int]] = None,
+                 baudrate: int = DEFAULT_BAUDRATE):
+        super().__init__(emulator.baudrate if emulator is not None else baudrate)
+        self.emulator = emulator
+        self.address = address
+
+    @classmethod
+    def from_spec(cls, spec: str) -> 'EmulatorBackend':
+        """'local' for an in-process emulator, or 'host:port'"""
+        if spec == 'local':
+            from printer_emulator import PrinterEmulator
+            return cls(emulator=PrinterEmulator())
+        host, _, port = spec.rpartition(':')
+        return cls(address=(host or '127.0.0.1', int(port)))
+
+    def open(self):
+        from printer_emulator import EmulatedThermalPrinter
+        return EmulatedThermalPrinter(self.emulator, self.address, self.baudrate)
+
+    def _read_status(self) -> PrinterStatus:
+        # DLE EOT 1 (online) and 4 (paper sensors) each poll; the cause (2) only when offline
+        replies = {}
+        for n in (1, 4, 2):
+            if n == 2 and not replies.get(1, 0) & 0x08:
+                break
+            reply = self.printer.query_status(n)
+            if reply is None:
+                break
+            replies[n] = reply
+        return decode_realtime(replies)
+
+
+# Preference order when receipt times tie
+BACKENDS = (WindowsRawBackend, DllBackend)
+
+
+class PrinterRegistry:
+    """Probed backends, fastest healthy first"""
+
+    def __init__(self, backends: List[PrinterBackend]):
+        self.backends = list(backends)
+        self._lock = threading.Lock()
+
+    def probe(self) -> 'PrinterRegistry':
+        """Open every backend once and rank the healthy ones"""
+        for backend in self.backends:
+            backend.probe()
+            state = "ok" if backend.healthy else f"unavailable ({backend.error})"
+            print(f"Printer backend {backend.name}: {state}")
+        # Stable sort keeps the declared order between equally fast backends
+        self.backends.sort(key=lambda b: (not b.healthy, b.receipt_seconds()))
+        best = self.best()
+        print(f"Printing through {best.name}" if best else "No printer backend available")
+        return self
+
+    def best(self) -> Optional[PrinterBackend]:
+        with self._lock:
+            return next((b for b in self.backends if b.healthy), None)
+
+    def report_failure(self, backend: PrinterBackend, error: str = "print failed") -> Optional[PrinterBackend]:
+        """Take a backend out after a failed print; returns the next one to use"""
+        with self._lock:
+            backend.healthy = False
+            backend.error = error
+        fallback = self.best()
+        print(f"Printer backend {backend.name} failed ({error}); "
+              f"{'falling back to ' + fallback.name if fallback else 'no fallback left'}")
+        return fallback
+
+    def report(self) -> List[Dict]:
+        return [b.describe() for b in self.backends]
+
+
+def default_backends() -> List[PrinterBackend]:
+    """Backends for this machine; GEMS_PRINTER_EMULATOR ('local' or host:port) adds the emulator"""
+    backends: List[PrinterBackend] = []
+    spec = os.environ.get('GEMS_PRINTER_EMULATOR')
+    if spec:
+        backends.append(EmulatorBackend.from_spec(spec))
+    backends += [cls() for cls in BACKENDS if cls.available()]
+    return backends
+
+
+_registry: Optional[PrinterRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_printer_registry() -> PrinterRegistry:
+    """Process-wide registry, probed on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PrinterRegistry(default_backends()).probe()
+        return _registry
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(get_printer_registry().report(), indent=2, ensure_ascii=False))
@@ -0,0 +1,708 @@
+"""Virtual HMK-072: ESC/POS bytes in, paper image and timing out
+
+Printing could only be tried on the Windows kiosk with the printer attached.
+PrinterEmulator takes the byte stream the kiosk sends and:
+
+- decodes raster (GS v 0), text (cp949 in Korean mode, ESC a, ESC E, GS !),
+  feeds (LF, ESC J, ESC d) and cuts (GS V) onto a paper image
+- models when paper moves: bytes arrive at the link's baud rate and each
+  command is printed at the head speed once it has been received
+- answers real-time status queries (DLE EOT n) from settable paper / cover
+  flags; data received while offline is dropped, which is how a job gets
+  silently lost at the kiosk
+
+Bytes come in from a capture file, a TCP socket (raw port 9100 style) or a
+pseudo-terminal standing in for the serial port. EmulatedThermalPrinter is
+the kiosk-side ThermalPrinter that writes to an emulator.
+
+    python printer_emulator.py [bench [baudrate]]   receipt benchmark (raw / optimized / text)
+    python printer_emulator.py bands [baudrate]     time to first paper, whole vs band-streamed receipt
+    python printer_emulator.py decode capture.bin [out.png]
+    python printer_emulator.py tcp [port]           serve, paper saved as emulator_NNN.png per cut
+    python printer_emulator.py pty                  same, on a pseudo-terminal
+"""
+
+import functools
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from bitmap_converter import RasterSegment, get_thermal_printer_width, pack_raster, to_thermal_bitmap
+from raster_optimizer import (BITS_PER_BYTE, CUT_SECONDS, DEFAULT_BAUDRATE, DEFAULT_HEAD_SPEED_MM_S, DOTS_PER_MM,
+                              MODE_DOUBLE_HEIGHT, MODE_DOUBLE_WIDTH, MOTION_UNIT_DOTS, motion_seconds, parse_raster)
+from text_layout import CHAR_DOTS, LINE_SPACING_DOTS, display_width
+from windows_thermal_printer import ThermalPrinter
+
+# Font A is 12x24
+CHAR_HEIGHT = 24
+DEFAULT_FONT_PATH = "res/NotoSansKR-Medium.ttf"
+
+DLE_EOT = b"\x10\x04"
+# Bits 1 and 4 are always set in DLE EOT replies
+STATUS_FIXED_BITS = 0x12
+
+# Parameter bytes after ESC / FS / GS <code>; GS v 0 and GS V are sized separately
+PARAMETERS = {
+    0x1B: {ord(c): n for c, n in (("@", 0), ("!", 1), ("E", 1), ("a", 1), ("d", 1), ("J", 1), ("R", 1),
+                                   ("2", 0), ("3", 1), ("M", 1), ("-", 1), ("t", 1), ("G", 1),
+                                   ("p", 3), ("{", 1), ("V", 1), ("c", 2))},
+    0x1C: {ord(c): n for c, n in (("&", 0), (".", 0), ("!", 1), ("C", 1))},
+    0x1D: {ord(c): n for c, n in (("!", 1), ("B", 1), ("L", 2), ("W", 2), ("r", 1), ("H", 1),
+                                   ("h", 1), ("w", 1), ("f", 1), ("a", 1))},
+}
+
+
+# Each raster byte spread over two, for double-width mode
+_DOUBLED_BITS = [int("".join(bit * 2 for bit in f"{b:08b}"), 2).to_bytes(2, "big") for b in range(256)]
+
+
+@functools.lru_cache(maxsize=16)
+def _font(font_path: str, size: int):
+    try:
+        return ImageFont.truetype(font_path, size)
+    except Exception:
+        pass
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+class PrinterEmulator:
+    """Software HMK-072 fed with raw ESC/POS bytes"""
+
+    def __init__(self, baudrate: int = DEFAULT_BAUDRATE, head_speed_mm_s: float = DEFAULT_HEAD_SPEED_MM_S,
+                 width_dots: int = None, font_path: str = DEFAULT_FONT_PATH,
+                 on_cut: Optional[Callable[[Image.Image], None]] = None):
+        """
+        Args:
+            baudrate: Link speed used to time byte arrival (8N1)
+            head_speed_mm_s: Paper speed while printing or feeding
+            width_dots: Head width (default: get_thermal_printer_width())
+            on_cut: Called with the page image at every cut
+        """
+        self.baudrate = baudrate
+        self.head_speed_mm_s = head_speed_mm_s
+        self.width_dots = width_dots or get_thermal_printer_width()
+        self.width_bytes = self.width_dots // 8
+        self.font_path = font_path
+        self.on_cut = on_cut
+
+        # Sensor state; set these to emulate a printer that isn't ready
+        self.paper_out = False
+        self.paper_near_end = False
+        self.cover_open = False
+        self.cutter_error = False
+
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._closers: List[Callable[[], None]] = []
+        self.reset()
+
+    def reset(self):
+        """Blank paper, counters and timeline"""
+        with self._lock:
+            self.rows: List[bytes] = []
+            self.cuts: List[int] = []
+            self.stats = {"bytes": 0, "raster_bytes": 0, "text_bytes": 0, "feed_dots": 0,
+                          "printed_rows": 0, "status_queries": 0, "lost_bytes": 0, "unknown": 0}
+            self.first_paper_s: Optional[float] = None
+            # First printed (not just fed) row
+            self.first_ink_s: Optional[float] = None
+            self._pending = bytearray()
+            self._line = bytearray()
+            # Model time in seconds from the first byte
+            self._wire_free = 0.0
+            self._head_free = 0.0
+            self._t0: Optional[float] = None
+            self._initialize()
+
+    def _initialize(self):
+        """ESC @ state"""
+        self.align = 0
+        self.bold = False
+        self.size = (1, 1)
+        self.korean = False
+        self.line_spacing = LINE_SPACING_DOTS
+        self._line.clear()
+
+    @property
+    def ready(self) -> bool:
+        return not (self.paper_out or self.cover_open or self.cutter_error)
+
+    # --- input -----------------------------------------------------------
+
+    def feed(self, data: bytes, at: Optional[float] = None) -> bytes:
+        """Receive bytes and return the printer's replies
+
+        Args:
+            data: ESC/POS bytes
+            at: Model time the bytes were handed to the link (default: right
+                after the previous bytes, i.e. the host never waits)
+        """
+        with self._lock:
+            start = self._wire_free if at is None else max(self._wire_free, at)
+            self._wire_free = start + len(data) * BITS_PER_BYTE / self.baudrate
+            self.stats["bytes"] += len(data)
+            self._pending += data
+            return self._process()
+
+    def start_clock(self):
+        """Start model time now, e.g. when a job starts rendering, for feed_realtime"""
+        with self._lock:
+            self._t0 = time.perf_counter()
+
+    def feed_realtime(self, data: bytes) -> bytes:
+        """feed() with the arrival time taken from the wall clock"""
+        with self._lock:
+            now = time.perf_counter()
+            if self._t0 is None:
+                self._t0 = now
+            return self.feed(data, at=now - self._t0)
+
+    def feed_file(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return self.feed(f.read())
+
+    def _process(self) -> bytes:
+        buf = self._pending
+        replies = bytearray()
+        i = 0
+        while i < len(buf):
+            end = self._command_end(buf, i)
+            if end is None:
+                break
+            command = bytes(buf[i:end])
+            # When the command's last byte is in
+            at = self._wire_free - (len(buf) - end) * BITS_PER_BYTE / self.baudrate
+            if command[:2] == DLE_EOT:
+                replies += self._status(command[2])
+            elif not self.ready:
+                self.stats["lost_bytes"] += len(command)
+            else:
+                self._execute(command, at)
+            i = end
+        del buf[:i]
+        return bytes(replies)
+
+    def _command_end(self, buf: bytearray, i: int) -> Optional[int]:
+        """Index after the command starting at i, None if it isn't complete yet"""
+        lead = buf[i]
+        if lead == 0x10:
+            end = i + 3
+        elif lead not in PARAMETERS:
+            return i + 1
+        elif len(buf) < i + 2:
+            return None
+        elif lead == 0x1D and buf[i + 1] == ord("v"):
+            if len(buf) < i + 8:
+                return None
+            end = i + 8 + (buf[i + 4] | buf[i + 5] << 8) * (buf[i + 6] | buf[i + 7] << 8)
+        elif lead == 0x1D and buf[i + 1] == ord("V"):
+            if len(buf) < i + 3:
+                return None
+            end = i + 3 + (buf[i + 2] in (65, 66))
+        else:
+            params = PARAMETERS[lead].get(buf[i + 1])
+            if params is None:
+                self.stats["unknown"] += 1
+                params = 0
+            end = i + 2 + params
+        return end if len(buf) >= end else None
+
+    def _execute(self, command: bytes, at: float):
+        lead = command[0]
+        if lead == 0x0A:
+            self._print_line(at, empty_feeds=True)
+        elif lead == 0x0D:
+            pass
+        elif lead not in PARAMETERS:
+            self._line.append(lead)
+            self.stats["text_bytes"] += 1
+        else:
+            code = chr(command[1])
+            n = command[2] if len(command) > 2 else 0
+            if lead == 0x1B:
+                if code == "@":
+                    self._initialize()
+                elif code == "a":
+                    # Both 0/1/2 and '0'/'1'/'2' are accepted
+                    self.align = n - 48 if n >= 48 else n
+                elif code == "E":
+                    self.bold = bool(n & 1)
+                elif code == "!":
+                    self.bold = bool(n & 0x08)
+                    self.size = (2 if n & 0x20 else 1, 2 if n & 0x10 else 1)
+                elif code == "d":
+                    self._print_line(at)
+                    self._feed(n * self.line_spacing, at)
+                elif code == "J":
+                    self._print_line(at)
+                    self._feed(n * MOTION_UNIT_DOTS, at)
+                elif code == "2":
+                    self.line_spacing = LINE_SPACING_DOTS
+                elif code == "3":
+                    self.line_spacing = n
+            elif lead == 0x1C:
+                if code in "&.":
+                    self.korean = code == "&"
+            elif code == "!":
+                self.size = ((n >> 4) + 1, (n & 0x0F) + 1)
+            elif code == "v":
+                self._print_line(at)
+                self._raster(command, at)
+            elif code == "V":
+                self._print_line(at)
+                self._cut(at)
+
+    # --- paper -----------------------------------------------------------
+
+    def _motion(self, dots: int, at: float):
+        """Head / paper busy for dots of travel, starting once the command is in"""
+        start = max(at, self._head_free)
+        if self.first_paper_s is None:
+            self.first_paper_s = start
+        self._head_free = start + motion_seconds(dots, self.head_speed_mm_s)
+
+    def _feed(self, dots: int, at: float):
+        if dots <= 0:
+            return
+        self.rows.extend([bytes(self.width_bytes)] * dots)
+        self.stats["feed_dots"] += dots
+        self._motion(dots, at)
+
+    def _append(self, rows: List[bytes], at: float):
+        if self.first_ink_s is None:
+            self.first_ink_s = max(at, self._head_free)
+        self.rows.extend(rows)
+        self.stats["printed_rows"] += len(rows)
+        self._motion(len(rows), at)
+
+    def _raster(self, command: bytes, at: float):
+        width_bytes, height, data = parse_raster(command)
+        self.stats["raster_bytes"] += len(command)
+        mode = command[3] & 3
+        if mode & MODE_DOUBLE_WIDTH:
+            data = b"".join(_DOUBLED_BITS[b] for b in data)
+            width_bytes *= 2
+        # Justification applies to raster images too, to the nearest byte here
+        spare = max(0, self.width_bytes - width_bytes)
+        offset = (0, spare // 2, spare)[min(self.align, 2)]
+        pad = bytes(offset)
+        rows = [(pad + data[r * width_bytes:(r + 1) * width_bytes])[:self.width_bytes].ljust(self.width_bytes, b"\0")
+                for r in range(height)]
+        if mode & MODE_DOUBLE_HEIGHT:
+            rows = [row for row in rows for _ in range(2)]
+        self._append(rows, at)
+
+    def _print_line(self, at: float, empty_feeds: bool = False):
+        """Print the buffered text; an empty LF feeds one line"""
+        if not self._line:
+            if empty_feeds:
+                self._feed(self.line_spacing, at)
+            return
+        text = bytes(self._line).decode("cp949" if self.korean else "cp437", errors="replace")
+        self._line.clear()
+        for line in self._wrap(text):
+            self._append(self._render_text(line), at)
+
+    def _wrap(self, text: str) -> List[str]:
+        """Split where the printer would run out of head width"""
+        columns = self.width_dots // (CHAR_DOTS * self.size[0])
+        lines, current = [], ""
+        for ch in text:
+            if current and display_width(current + ch) > columns:
+                lines.append(current)
+                current = ""
+            current += ch
+        return lines + [current]
+
+    def _render_text(self, text: str) -> List[bytes]:
+        width_mult, height_mult = self.size
+        cell = CHAR_DOTS * height_mult
+        glyphs = Image.new("L", (max(1, display_width(text) * cell), CHAR_HEIGHT * height_mult), 255)
+        draw = ImageDraw.Draw(glyphs)
+        font = _font(self.font_path, CHAR_HEIGHT * height_mult - 2 * height_mult)
+        x = 0
+        for ch in text:
+            draw.text((x, 0), ch, font=font, fill=0)
+            if self.bold:
+                draw.text((x + 1, 0), ch, font=font, fill=0)
+            x += display_width(ch) * cell
+        if width_mult != height_mult:
+            glyphs = glyphs.resize((glyphs.width * width_mult // height_mult, glyphs.height))
+        glyphs = glyphs.crop((0, 0, min(glyphs.width, self.width_dots), glyphs.height))
+
+        line = Image.new("1", (self.width_dots, max(self.line_spacing, glyphs.height)), 255)
+        spare = self.width_dots - glyphs.width
+        line.paste(glyphs.point(lambda v: 255 if v >= 128 else 0, "1"), ((0, spare // 2, spare)[min(self.align, 2)], 0))
+        packed = pack_raster(line)[8:]
+        return [packed[r * self.width_bytes:(r + 1) * self.width_bytes] for r in range(line.height)]
+
+    def _cut(self, at: float):
+        self.cuts.append(len(self.rows))
+        start = max(at, self._head_free)
+        self._head_free = start + CUT_SECONDS
+        if self.on_cut:
+            self.on_cut(self.pages()[-1])
+
+    def _status(self, n: int) -> bytes:
+        """DLE EOT n reply byte"""
+        self.stats["status_queries"] += 1
+        if n == 1:
+            value = 0 if self.ready else 0x08
+        elif n == 2:
+            value = (0x04 if self.cover_open else 0) | (0x20 if self.paper_out else 0) | (0x40 if self.cutter_error else 0)
+        elif n == 3:
+            value = 0x08 if self.cutter_error else 0
+        elif n == 4:
+            value = (0x0C if self.paper_near_end else 0) | (0x60 if self.paper_out else 0)
+        else:
+            return b""
+        return bytes([STATUS_FIXED_BITS | value])
+
+    # --- output ----------------------------------------------------------
+
+    def render(self, start: int = 0, end: Optional[int] = None) -> Image.Image:
+        """Printed paper (rows start..end) as a 1-bit image"""
+        with self._lock:
+            rows = self.rows[start:end]
+        if not rows:
+            return Image.new("1", (self.width_dots, 1), 1)
+        # Printer rows are 1 = black; PIL's 1-bit images are 1 = white
+        return ImageChops.invert(Image.frombytes("1", (self.width_dots, len(rows)), b"".join(rows)))
+
+    def pages(self) -> List[Image.Image]:
+        """Paper cut into pages; anything after the last cut is the last page"""
+        bounds = [0] + self.cuts + ([len(self.rows)] if not self.cuts or self.cuts[-1] < len(self.rows) else [])
+        return [self.render(top, bottom) for top, bottom in zip(bounds, bounds[1:])]
+
+    def save(self, path: str) -> str:
+        """Paper image with cut positions marked"""
+        image = self.render().convert("L")
+        draw = ImageDraw.Draw(image)
+        for row in self.cuts:
+            for x in range(0, image.width, 16):
+                draw.line((x, row, x + 8, row), fill=128)
+        image.save(path)
+        return path
+
+    def report(self) -> Dict:
+        """Bytes, modelled times (seconds from the first byte) and paper used"""
+        with self._lock:
+            return {
+                **self.stats,
+                "transfer_s": round(self._wire_free, 3),
+                "first_paper_s": None if self.first_paper_s is None else round(self.first_paper_s, 3),
+                "first_ink_s": None if self.first_ink_s is None else round(self.first_ink_s, 3),
+                "done_s": round(max(self._wire_free, self._head_free), 3),
+                "paper_mm": round(len(self.rows) / DOTS_PER_MM, 1),
+                "cuts": len(self.cuts),
+            }
+
+    # --- transports ------------------------------------------------------
+
+    def _pump(self, read: Callable[[], bytes], write: Callable[[bytes], object], realtime: bool):
+        """Feed chunks from read() until EOF; with realtime, read no faster than the baud rate"""
+        while not self._stop.is_set():
+            try:
+                chunk = read()
+            except (OSError, socket.timeout):
+                break
+            if not chunk:
+                break
+            replies = self.feed_realtime(chunk)
+            if replies:
+                write(replies)
+            if realtime:
+                time.sleep(max(0.0, self._wire_free - (time.perf_counter() - self._t0)))
+
+    def serve_tcp(self, host: str = "127.0.0.1", port: int = 9100, realtime: bool = False) -> int:
+        """Accept one connection at a time on a raw TCP port; returns the bound port"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, port))
+        server.listen(1)
+        server.settimeout(0.5)
+        chunk = 64 if realtime else 65536
+
+        def accept_loop():
+            while not self._stop.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                with conn:
+                    # Short timeouts so stop() isn't stuck behind an idle client
+                    conn.settimeout(0.5)
+
+                    def read():
+                        while not self._stop.is_set():
+                            try:
+                                return conn.recv(chunk)
+                            except socket.timeout:
+                                continue
+                        return b""
+
+                    self._pump(read, conn.sendall, realtime)
+
+        self._closers.append(server.close)
+        self._start_thread(accept_loop, "emulator-tcp")
+        return server.getsockname()[1]
+
+    def open_pty(self, realtime: bool = False) -> str:
+        """Serve on a pseudo-terminal (POSIX); returns the device path to open as the serial port"""
+        if not hasattr(os, "openpty"):
+            raise OSError("pseudo-terminals are not available on this platform")
+        import select
+        import tty
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        chunk = 64 if realtime else 65536
+
+        def read():
+            while not self._stop.is_set():
+                if select.select([master], [], [], 0.5)[0]:
+                    return os.read(master, chunk)
+            return b""
+
+        self._closers += [lambda: os.close(master), lambda: os.close(slave)]
+        self._start_thread(lambda: self._pump(read, lambda data: os.write(master, data), realtime), "emulator-pty")
+        return os.ttyname(slave)
+
+    def _start_thread(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        for close in self._closers:
+            try:
+                close()
+            except OSError:
+                pass
+        self._threads, self._closers = [], []
+        self._stop.clear()
+
+
+class EmulatedThermalPrinter(ThermalPrinter):
+    """ThermalPrinter that writes to a PrinterEmulator, in-process or over TCP"""
+
+    def __init__(self, emulator: Optional[PrinterEmulator] = None,
+                 address: Optional[Tuple[str, int]] = None, baudrate: int = DEFAULT_BAUDRATE):
+        # WindowsThermalPrinter.__init__ needs pywin32; only its fields are set up here
+        self.printer_name = "HMK-072 emulator"
+        self.emulator = emulator
+        self.address = address
+        self.baudrate = emulator.baudrate if emulator else baudrate
+        self.is_connected = False
+        self._socket: Optional[socket.socket] = None
+        # Status polls come from another thread; keep each exchange whole
+        self._io_lock = threading.Lock()
+        self.check_printer()
+
+    def check_printer(self) -> bool:
+        if self.emulator is not None:
+            self.is_connected = True
+        elif self.address:
+            try:
+                self._socket = socket.create_connection(self.address, timeout=2)
+                self.is_connected = True
+            except OSError as e:
+                print(f"Emulator not reachable at {self.address}: {e}")
+                self.is_connected = False
+        return self.is_connected
+
+    def disconnect(self):
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+        self.is_connected = False
+
+    def _exchange(self, data: bytes, reply_size: int = 0) -> bytes:
+        if self.emulator is not None:
+            return self.emulator.feed(data)
+        with self._io_lock:
+            self._socket.sendall(data)
+            reply = b""
+            while len(reply) < reply_size:
+                part = self._socket.recv(reply_size - len(reply))
+                if not part:
+                    break
+                reply += part
+            return reply
+
+    def print_raw_text(self, text, encoding: str = 'cp949') -> bool:
+        if not self.is_connected:
+            print("Printer not connected")
+            return False
+        try:
+            self._exchange(text.encode(encoding) if isinstance(text, str) else text)
+            return True
+        except Exception as e:
+            print(f"Error printing to emulator: {e}")
+            return False
+
+    def print_bitmap(self, image) -> bool:
+        """Print an image as one raster command (there is no GDI driver to draw with)"""
+        if isinstance(image, str):
+            image = Image.open(image)
+        segment = RasterSegment(to_thermal_bitmap(image))
+        return self.print_raw_text(b"\x1B\x40" + segment.optimized)
+
+    def query_status(self, n: int) -> Optional[int]:
+        """DLE EOT n reply byte, None without an answer"""
+        try:
+            reply = self._exchange(DLE_EOT + bytes([n]), reply_size=1)
+            return reply[0] if reply else None
+        except Exception:
+            return None
+
+    def get_status(self) -> int:
+        """0 when ready, the DLE EOT 1 offline bit when not, -1 without an answer"""
+        reply = self.query_status(1)
+        return -1 if reply is None else reply & 0x08
+
+    def write_stream(self, chunks) -> bool:
+        """One job sent chunk by chunk as chunks produces them
+
+        In-process, the emulator sees each chunk arrive when it was produced.
+        """
+        if not self.is_connected:
+            print("Printer not connected")
+            return False
+        try:
+            for chunk in chunks:
+                if self.emulator is not None:
+                    self.emulator.feed_realtime(chunk)
+                else:
+                    self._exchange(chunk)
+            return True
+        except Exception as e:
+            print(f"Error printing to emulator: {e}")
+            return False
+
+
+def benchmark(numbers=range(1, 25), baudrate: int = DEFAULT_BAUDRATE) -> Dict[str, Dict]:
+    """Modelled print of every receipt template as raw raster, optimized raster and text"""
+    from receipt_printer import ReceiptPrinter
+    from receipt_text_printer import ReceiptTextPrinter
+    from pairing_table import load_pairing_rows
+
+    printer = ReceiptPrinter(enable_thermal=False)
+    text_printer = ReceiptTextPrinter()
+    rows = {row["번호"]: row for row in load_pairing_rows()}
+    cut = b"\n\n\n\x1D\x56\x01"
+    totals: Dict[str, Dict] = {}
+    for number in numbers:
+        data = dict(rows.get(str(number), {}), 이름="김치맛강정은별로야", 번호=str(number))
+        segments = printer.build_segments(data)
+        streams = {
+            "raw raster": b"\x1B\x40" + b"".join(s.packed for s in segments) + cut,
+            "optimized": b"\x1B\x40" + b"".join(s.optimized for s in segments) + cut,
+            "text": text_printer.build_receipt_bytes(data) + cut,
+        }
+        for name, stream in streams.items():
+            emulator = PrinterEmulator(baudrate=baudrate)
+            emulator.feed(stream)
+            report = emulator.report()
+            total = totals.setdefault(name, {"jobs": 0, "bytes": 0, "first_paper_s": 0.0, "done_s": 0.0})
+            total["jobs"] += 1
+            total["bytes"] += report["bytes"]
+            total["first_paper_s"] += report["first_paper_s"] or 0.0
+            total["done_s"] += report["done_s"]
+    return totals
+
+
+def band_benchmark(numbers=range(1, 25), baudrate: int = DEFAULT_BAUDRATE) -> Dict[str, Dict]:
+    """Time to first paper / ink when the receipt is built whole and then sent vs streamed band by band
+
+    Model time starts when rendering starts, so conversion time counts. "cold"
+    runs start without converted templates, as the first receipt of a type does.
+    """
+    import receipt_printer
+    from print_planner import CUT, INIT, band_stream
+
+    printer = receipt_printer.ReceiptPrinter(enable_thermal=False)
+    emulator = PrinterEmulator(baudrate=baudrate)
+    link = EmulatedThermalPrinter(emulator)
+    totals: Dict[str, Dict] = {}
+    for cache in ("cold", "warm"):
+        for number in numbers:
+            data = {"이름": "김치맛강정은별로야", "번호": str(number)}
+            for name in ("whole", "streamed"):
+                if cache == "cold":
+                    receipt_printer._TEMPLATE_CACHE.clear()
+                else:
+                    for seg in printer.build_segments(data):
+                        seg.optimized
+                emulator.reset()
+                emulator.start_clock()
+                if name == "whole":
+                    segments = printer.build_segments(data)
+                    link.write_stream([INIT + b"".join(seg.optimized for seg in segments) + CUT])
+                else:
+                    link.write_stream(band_stream(printer.iter_bands(data)))
+                report = emulator.report()
+                total = totals.setdefault(f"{cache} {name}",
+                                          {"jobs": 0, "first_paper_s": 0.0, "first_ink_s": 0.0, "done_s": 0.0})
+                total["jobs"] += 1
+                total["first_paper_s"] += report["first_paper_s"] or 0.0
+                total["first_ink_s"] += report["first_ink_s"] or 0.0
+                total["done_s"] += report["done_s"]
+    return totals
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    command = args[0] if args else "bench"
+    if command == "decode":
+        emulator = PrinterEmulator()
+        emulator.feed_file(args[1])
+        print(emulator.report())
+        print("Saved", emulator.save(args[2] if len(args) > 2 else "emulator_output.png"))
+    elif command in ("tcp", "pty"):
+        saved = []
+
+        def save_page(page):
+            saved.append(f"emulator_{len(saved) + 1:03d}.png")
+            page.save(saved[-1])
+            print(f"Cut -> {saved[-1]}  {emulator.report()}")
+
+        emulator = PrinterEmulator(on_cut=save_page)
+        if command == "tcp":
+            print(f"HMK-072 emulator on 127.0.0.1:{emulator.serve_tcp(port=int(args[1]) if len(args) > 1 else 9100)}")
+        else:
+            print(f"HMK-072 emulator on {emulator.open_pty()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            emulator.stop()
+    elif command == "bands":
+        baudrate = int(args[1]) if len(args) > 1 else DEFAULT_BAUDRATE
+        print(f"Whole vs band-streamed receipts at {baudrate} baud (averages, from the start of rendering):\n")
+        for name, total in band_benchmark(baudrate=baudrate).items():
+            jobs = total["jobs"]
+            print(f"{name:14s} first paper {total['first_paper_s'] / jobs * 1000:6.1f} ms"
+                  f"  first ink {total['first_ink_s'] / jobs * 1000:6.1f} ms  done {total['done_s'] / jobs:6.2f}s")
+    else:
+        baudrate = int(args[1]) if len(args) > 1 else DEFAULT_BAUDRATE
+        print(f"Modelled receipt prints at {baudrate} baud, {DEFAULT_HEAD_SPEED_MM_S:.0f} mm/s (averages):\n")
+        for name, total in benchmark(baudrate=baudrate).items():
+            jobs = total["jobs"]
+            print(f"{name:11s} {total['bytes'] / jobs:9,.0f} bytes  first paper {total['first_paper_s'] / jobs:6.2f}s"
+                  f"  done {total['done_s'] / jobs:6.2f}s")
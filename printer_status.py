@@ -0,0 +1,336 @@
+"""Printer status monitor and status-aware print scheduling
+
+get_status() used to return 0 whenever the printer was connected, so a
+job sent while the paper was out or the cover open just disappeared.
+StatusMonitor polls the backend's real status in the background (DLE EOT
+on an ESC/POS link, the spooler's status flags, or the DLL's
+printerStatus) and tells listeners about every transition.
+PrintScheduler sends one job at a time: it re-checks the status right
+before sending, holds jobs while the printer isn't ready and resumes them
+as soon as it is.
+
+    python printer_status.py    paper-out / cover-open run on the emulator
+"""
+
+import collections
+import queue
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+READY = "ready"
+PAPER_OUT = "paper_out"
+COVER_OPEN = "cover_open"
+ERROR = "error"
+# No answer from the printer
+OFFLINE = "offline"
+# The backend can't report status; jobs are not held
+UNKNOWN = "unknown"
+
+# win32print PRINTER_STATUS_* flags
+SPOOLER_PAUSED = 0x1
+SPOOLER_ERROR = 0x2
+SPOOLER_PAPER_JAM = 0x8
+SPOOLER_PAPER_OUT = 0x10
+SPOOLER_PAPER_PROBLEM = 0x40
+SPOOLER_OFFLINE = 0x80
+SPOOLER_NOT_AVAILABLE = 0x1000
+SPOOLER_USER_INTERVENTION = 0x100000
+SPOOLER_DOOR_OPEN = 0x400000
+
+
+class PrinterStatus:
+    """One status reading"""
+
+    def __init__(self, state: str, near_end: bool = False, raw=None):
+        self.state = state
+        self.near_end = near_end
+        self.raw = raw
+        self.ts = time.time()
+
+    @property
+    def ready(self) -> bool:
+        return self.state in (READY, UNKNOWN)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PrinterStatus) and (self.state, self.near_end) == (other.state, other.near_end)
+
+    def __str__(self) -> str:
+        return self.state + (" (paper near end)" if self.near_end else "")
+
+
+def decode_realtime(replies: Dict[int, int]) -> PrinterStatus:
+    """Status from DLE EOT n reply bytes keyed by n (1 required; 2 and 4 when known)"""
+    if 1 not in replies:
+        return PrinterStatus(OFFLINE, raw=replies)
+    paper = replies.get(4, 0)
+    near_end = bool(paper & 0x0C)
+    if not replies[1] & 0x08:
+        return PrinterStatus(READY, near_end, replies)
+    cause = replies.get(2, 0)
+    if paper & 0x60 or cause & 0x20:
+        return PrinterStatus(PAPER_OUT, near_end, replies)
+    if cause & 0x04:
+        return PrinterStatus(COVER_OPEN, near_end, replies)
+    return PrinterStatus(ERROR, near_end, replies)
+
+
+def decode_spooler(flags: int) -> PrinterStatus:
+    """Status from the Windows spooler's PRINTER_INFO_2.Status flags (-1: printer not reachable)"""
+    if flags < 0 or flags & (SPOOLER_OFFLINE | SPOOLER_NOT_AVAILABLE):
+        return PrinterStatus(OFFLINE, raw=flags)
+    if flags & (SPOOLER_PAPER_OUT | SPOOLER_PAPER_PROBLEM):
+        return PrinterStatus(PAPER_OUT, raw=flags)
+    if flags & SPOOLER_DOOR_OPEN:
+        return PrinterStatus(COVER_OPEN, raw=flags)
+    if flags & (SPOOLER_ERROR | SPOOLER_PAPER_JAM | SPOOLER_USER_INTERVENTION | SPOOLER_PAUSED):
+        return PrinterStatus(ERROR, raw=flags)
+    return PrinterStatus(READY, raw=flags)
+
+
+def decode_dll(code: int) -> PrinterStatus:
+    """Status from HW_API printerStatus(): 0 is ready; other codes aren't documented, so not ready"""
+    if code < 0:
+        return PrinterStatus(OFFLINE, raw=code)
+    return PrinterStatus(READY if code == 0 else ERROR, raw=code)
+
+
+class StatusMonitor:
+    """Polls printer status; listeners hear every transition"""
+
+    def __init__(self, read_status: Callable[[], PrinterStatus], interval: float = 2.0,
+                 not_ready_interval: float = 0.5):
+        """
+        Args:
+            read_status: Reads the status now (a backend's read_status)
+            interval: Seconds between polls while ready
+            not_ready_interval: Seconds between polls while waiting for the printer
+        """
+        self.read_status = read_status
+        self.interval = interval
+        self.not_ready_interval = not_ready_interval
+        # Held while a job is being sent, so no status query lands inside it
+        self.io_lock = threading.RLock()
+        self.transitions: Deque[Tuple[float, str, str]] = collections.deque(maxlen=200)
+        self._current = PrinterStatus(UNKNOWN)
+        self._listeners: List[Callable[[PrinterStatus, PrinterStatus], None]] = []
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> PrinterStatus:
+        return self._current
+
+    def add_listener(self, listener: Callable[[PrinterStatus, PrinterStatus], None]):
+        self._listeners.append(listener)
+
+    def check(self) -> PrinterStatus:
+        """Read the status now (waits for a job being sent to finish)"""
+        with self.io_lock:
+            try:
+                status = self.read_status()
+            except Exception as e:
+                status = PrinterStatus(OFFLINE, raw=str(e))
+        self._set(status)
+        return status
+
+    def _set(self, status: PrinterStatus):
+        with self._changed:
+            old = self._current
+            self._current = status
+            changed = status != old
+            if changed:
+                self.transitions.append((status.ts, old.state, status.state))
+            self._changed.notify_all()
+        if changed:
+            print(f"Printer status: {old} -> {status}")
+            for listener in self._listeners:
+                try:
+                    listener(old, status)
+                except Exception as e:
+                    print(f"Printer status listener failed: {e}")
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until the printer is ready, up to timeout seconds"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not self._current.ready and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return self._current.ready
+
+    def _run(self):
+        self.check()
+        while not self._stop.wait(self.interval if self._current.ready else self.not_ready_interval):
+            self.check()
+
+    def start(self) -> "StatusMonitor":
+        self._thread = threading.Thread(target=self._run, name="printer-status", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+
+
+class PrintTicket:
+    """A scheduled print job; done once printed, failed or dropped at shutdown"""
+
+    def __init__(self, job: Callable[[], bool], name: str = ""):
+        self.job = job
+        self.name = name
+        self.submitted = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.held_s = 0.0
+        self.attempts = 0
+        self.ok = False
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+        self._callbacks: List[Callable[["PrintTicket"], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[["PrintTicket"], None]):
+        """Run callback(ticket) when done (right away if it already is)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, ok: bool, error: Optional[str] = None):
+        self.ok = ok
+        self.error = error
+        self.finished = time.perf_counter()
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Print ticket callback failed: {e}")
+
+
+class PrintScheduler:
+    """Sends print jobs one at a time, only while the printer is ready"""
+
+    def __init__(self, monitor: StatusMonitor, event_log=None):
+        self.monitor = monitor
+        self.event_log = event_log
+        self.stats = {"printed": 0, "failed": 0, "held": 0, "reprinted": 0, "stopped_after": 0}
+        self._jobs: "queue.Queue[PrintTicket]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, job: Callable[[], bool], name: str = "") -> PrintTicket:
+        """Queue job (returns True once printed); returns right away"""
+        ticket = PrintTicket(job, name)
+        self._jobs.put(ticket)
+        return ticket
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                ticket = self._jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._print(ticket)
+        # Anything left is dropped with an error rather than waited on forever
+        while True:
+            try:
+                self._jobs.get_nowait()._finish(False, "scheduler stopped")
+            except queue.Empty:
+                break
+
+    def _print(self, ticket: PrintTicket):
+        held_since = None
+        while not self._stop.is_set():
+            with self.monitor.io_lock:
+                # Fresh reading right before sending, not the last poll
+                status = self.monitor.check()
+                if status.ready:
+                    ticket.attempts += 1
+                    try:
+                        ok, error = bool(ticket.job()), None
+                    except Exception as e:
+                        ok, error = False, str(e)
+                    after = self.monitor.check()
+                    if ok or after.ready:
+                        self.stats["printed" if ok else "failed"] += 1
+                        if ok and not after.ready:
+                            # Usually paper running out as the last receipt is cut; it printed,
+                            # so don't print it a second time after the refill
+                            self._stopped_after(ticket, after)
+                        ticket._finish(ok, error)
+                        return
+                    # The job failed and the printer stopped: send it again once it is back
+                    self.stats["reprinted"] += 1
+                    status = after
+            if held_since is None:
+                held_since = time.perf_counter()
+                self.stats["held"] += 1
+                print(f"Holding print job {ticket.name}: printer {status}")
+            self.monitor.wait_ready(timeout=1.0)
+            ticket.held_s = time.perf_counter() - held_since
+        ticket._finish(False, "scheduler stopped")
+
+    def _stopped_after(self, ticket: PrintTicket, status: PrinterStatus):
+        self.stats["stopped_after"] += 1
+        print(f"Printer stopped after job {ticket.name}: {status}")
+        if self.event_log:
+            self.event_log.record("print_warning", {"name": ticket.name, "state": status.state},
+                                  ok=False, error="printer stopped after job")
+
+    def start(self) -> "PrintScheduler":
+        self._thread = threading.Thread(target=self._run, name="print-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    from printer_backends import EmulatorBackend
+    from printer_emulator import PrinterEmulator
+    from receipt_printer import ReceiptPrinter
+
+    emulator = PrinterEmulator()
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    printer = ReceiptPrinter(enable_thermal=False)
+    printer.use_backend(backend)
+    printer.enable_scheduler(interval=0.2)
+    data = {"이름": "지수", "번호": "1"}
+    segments = printer.build_segments(data)
+
+    for flag in ("paper_out", "cover_open"):
+        setattr(emulator, flag, True)
+        printer.print_prepared(data, segments, None)
+        ticket = printer.last_ticket
+        time.sleep(1.0)
+        print(f"{flag}: job done after 1s? {ticket.done}; printed rows so far {len(emulator.rows)}")
+        setattr(emulator, flag, False)
+        ticket.wait(5)
+        print(f"{flag} cleared: ok={ticket.ok}, held {ticket.held_s:.1f}s, cuts {len(emulator.cuts)}")
+    printer.scheduler.stop()
+    printer.status_monitor.stop()
+    print("Transitions:", [f"{old}->{new}" for _, old, new in printer.status_monitor.transitions])
+    print("Scheduler:", printer.scheduler.stats, "status queries:", emulator.stats["status_queries"])
@@ -0,0 +1,109 @@
+"""Speculative parse-and-render of a visitor's receipt
+
+As soon as the gem's closing "Gems Station" message is detected, the
+transcript is parsed and the receipt rendered in the background while the
+visitor is still reading and reaching for the print button. The click then
+only has to confirm the transcript and send the ready raster.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from receipt_printer import ReceiptPrinter
+
+
+class ReceiptJob:
+    """Parse + render of one transcript on a background thread"""
+
+    def __init__(self, parser, conversation_text: str, renderer=None):
+        self.parser = parser
+        self.conversation_text = conversation_text
+        self.renderer = renderer
+        self.parsed_data: Optional[Dict] = None
+        self.segments = None
+        self.error: Optional[Exception] = None
+        self.timings: Dict[str, float] = {}
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="receipt-job", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            start = time.perf_counter()
+            print(f"Parsing conversation data with Gemini (length: {len(self.conversation_text)})...")
+            self.parsed_data = self.parser.parse_and_save(self.conversation_text)
+            self.timings['parse'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            renderer = self.renderer or ReceiptPrinter(enable_thermal=False)
+            self.segments = renderer.build_segments(self.parsed_data)
+            self.timings['render'] = time.perf_counter() - start
+        except Exception as e:
+            print(f"Error in speculative receipt job: {e}")
+            self.error = e
+        finally:
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for parse and render to finish; True when finished"""
+        return self._done.wait(timeout)
+
+
+class LocalParse:
+    """parse_and_save from the parser's local extractor only, for when Gemini takes too long"""
+
+    def __init__(self, parser):
+        self.parser = parser
+
+    def parse_and_save(self, conversation_text: str) -> Dict:
+        reduced, _ = self.parser.reducer.reduce(conversation_text)
+        result, confidence = self.parser.local.extract(reduced)
+        print(f"Local parse (confidence {confidence:.2f})")
+        return result
+
+
+class SpeculativeReceipt:
+    """Keeps at most one in-flight ReceiptJob per visitor
+
+    update() is called whenever the transcript is (re)captured after the end
+    of the conversation; take() is called on the print click with the final
+    transcript and returns a job for exactly that text, reusing the
+    speculative one when the transcript hasn't changed since.
+    """
+
+    def __init__(self, parser, renderer=None):
+        self.parser = parser
+        self.renderer = renderer
+        self.job: Optional[ReceiptJob] = None
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, conversation_text: str) -> ReceiptJob:
+        """Start (or keep) a job for the latest transcript"""
+        if self.job is None or self.job.conversation_text != conversation_text:
+            if self.job is not None:
+                print("Transcript changed after detection, restarting speculative parse")
+            self.job = ReceiptJob(self.parser, conversation_text, self.renderer)
+        return self.job
+
+    def take(self, conversation_text: str) -> ReceiptJob:
+        """Job for the final transcript; consumes the speculative job"""
+        job = self.job
+        if job is not None and job.conversation_text == conversation_text:
+            self.hits += 1
+            state = "ready" if job.done else "in progress"
+            print(f"Using speculative receipt ({state})")
+        else:
+            self.misses += 1
+            job = ReceiptJob(self.parser, conversation_text, self.renderer)
+        self.job = None
+        return job
+
+    def reset(self):
+        """Drop any speculative work (visitor left without printing)"""
+        self.job = None
@@ -1,17 +1,87 @@
 from PIL import Image, ImageDraw, ImageFont
+import functools
 import json
 import os
-import platform
-from typing import Dict
+from typing import Dict, Iterator, List, Optional
+from bitmap_converter import BAND_ROWS, RasterSegment, iter_raster_bands, to_thermal_bitmap, stack_segments
+from debug_sink import get_debug_sink
+from print_planner import PrintPlanner, band_stream
+from printer_backends import get_printer_registry
+from printer_status import OFFLINE, PrinterStatus, PrintScheduler, StatusMonitor
+
+@functools.lru_cache(maxsize=64)
+def _load_font(font_path, font_size):
+    """Load a TrueType font once per (path, size)"""
+    return ImageFont.truetype(font_path, font_size)
+
+
+class ReceiptTemplate:
+    """A receipt type's pre-made image, split around the name band
+    
+    Everything outside the name band is identical for every customer, so the
+    header and body are converted to printer rasters once and reused. They
+    are converted on first use, either whole or band by band while printing.
+    """
+    
+    def __init__(self, path, band_top, band_bottom, crop_top, crop_bottom, crop_left):
+        self.path = path
+        self.image = Image.open(path)
+        self.image.load()
+        height = self.image.height
+        
+        self.band_top = band_top
+        self.band_bottom = band_bottom
+        self.crop_top = crop_top
+        self.crop_left = crop_left
+        
+        # Row ranges after cropping; the band may be partly cropped away at the top
+        self._rows = {
+            'header': (crop_top, max(crop_top, band_top)),
+            'body': (max(band_bottom, crop_top), max(band_bottom, height - crop_bottom)),
+        }
+        self._segments = {}
+    
+    @property
+    def header(self):
+        return self._part('header')
+    
+    @property
+    def body(self):
+        return self._part('body')
+    
+    def _part(self, part):
+        if part not in self._segments:
+            self._segments[part] = self._segment(*self._rows[part])
+        return self._segments[part]
+    
+    def _segment(self, top, bottom):
+        if bottom <= top:
+            return None
+        strip = self.image.crop((0, top, self.image.width, bottom))
+        return RasterSegment(to_thermal_bitmap(strip, crop_left=self.crop_left))
+    
+    def bands(self, part, band_rows=BAND_ROWS) -> Iterator[RasterSegment]:
+        """'header' or 'body' in bands of band_rows; the first time, each band is converted as it's reached"""
+        if part in self._segments:
+            if self._segments[part] is not None:
+                yield from self._segments[part].bands(band_rows)
+            return
+        top, bottom = self._rows[part]
+        strips = []
+        for band in iter_raster_bands(self.image, self.crop_left, band_rows, top, bottom):
+            strips.append(band)
+            yield band
+        # Kept whole for the next receipt of this type
+        self._segments[part] = RasterSegment(stack_segments(strips)) if strips else None
+    
+    def band_background(self):
+        """Fresh copy of the name band rows to draw on"""
+        return self.image.crop((0, self.band_top, self.image.width, self.band_bottom))
+
+
+# Templates keyed by (path, mtime, band, crop settings)
+_TEMPLATE_CACHE = {}
 
-# Import thermal printer only on Windows
-if platform.system() == 'Windows':
-    try:
-        from thermal_printer import ThermalPrinter
-    except ImportError:
-        ThermalPrinter = None
-else:
-    ThermalPrinter = None
 
 class ReceiptPrinter:
     def __init__(self, font_path=None, enable_thermal=True):
@@ -22,6 +92,10 @@ class ReceiptPrinter:
         self.max_width = 162  # Maximum text width
         self.bounding_x = 140  # Bounding box start x
         
+        # Template rows holding the name line; only these change per customer
+        self.name_band_top = 0
+        self.name_band_bottom = 90
+        
         # Font settings
         if font_path and os.path.exists(font_path):
             self.font_path = font_path
@@ -35,15 +109,49 @@ class ReceiptPrinter:
             else:
                 print(f"Using font: {self.font_path}")
         
-        # Initialize thermal printer on Windows
+        # Fastest healthy printer backend, probed once per process
+        self.printers = None
+        self.backend = None
         self.thermal_printer = None
-        if enable_thermal and platform.system() == 'Windows' and ThermalPrinter:
-            try:
-                # Use SERIAL interface with port 0 for LPT0
-                self.thermal_printer = ThermalPrinter(port=0, baudrate=19200, interface='SERIAL')
-                print("Thermal printer initialized")
-            except Exception as e:
-                print(f"Failed to initialize thermal printer: {e}")
+        if enable_thermal:
+            self.printers = get_printer_registry()
+            self.use_backend(self.printers.best())
+        
+        # Image artifacts are for debugging only; by default they're written
+        # when there is no printer to look at. Override with "debug_images".
+        self.debug_sink = get_debug_sink()
+        settings = self.load_print_settings()
+        self.save_debug_images = settings.get('debug_images', self.thermal_printer is None)
+        
+        # Picks raster / reduced / text per job to fit the print time budget
+        self.planner = PrintPlanner(settings['print_budget_seconds'],
+                                    getattr(self.thermal_printer, 'baudrate', 19200))
+        self.last_plan = None
+        
+        # Off until enable_scheduler(); jobs then wait for a ready printer
+        self.status_monitor = None
+        self.scheduler = None
+        self.last_ticket = None
+    
+    def use_backend(self, backend):
+        """Print through backend (a probed printer_backends.PrinterBackend, or None)"""
+        self.backend = backend
+        self.thermal_printer = backend.printer if backend else None
+        if backend and getattr(self, 'planner', None):
+            self.planner.baudrate = backend.baudrate
+    
+    def read_status(self) -> PrinterStatus:
+        """Status of the printer currently printed to"""
+        if self.backend:
+            return self.backend.read_status()
+        return PrinterStatus(OFFLINE, raw="no printer backend")
+    
+    def enable_scheduler(self, interval: float = 2.0, event_log=None) -> PrintScheduler:
+        """Poll printer status in the background and hold jobs while it isn't ready"""
+        if self.scheduler is None:
+            self.status_monitor = StatusMonitor(self.read_status, interval, min(interval, 0.5)).start()
+            self.scheduler = PrintScheduler(self.status_monitor, event_log).start()
+        return self.scheduler
     
     def get_optimal_font_size(self, text, max_width):
         """Calculate optimal font size to fit text within max_width"""
@@ -52,7 +160,7 @@ class ReceiptPrinter:
         while font_size > 6:  # Minimum font size
             try:
                 if self.font_path:
-                    font = ImageFont.truetype(self.font_path, font_size)
+                    font = _load_font(self.font_path, font_size)
                 else:
                     font = ImageFont.load_default()
                     return font  # Default font doesn't support size adjustment
@@ -71,98 +179,255 @@ class ReceiptPrinter:
         
         # Return smallest size if nothing fits
         if self.font_path:
-            return ImageFont.truetype(self.font_path, 6)
+            return _load_font(self.font_path, 6)
         else:
             return ImageFont.load_default()
     
+    def load_print_settings(self) -> Dict:
+        """Load crop settings from credentials.json"""
+        settings = {'crop_top': 0, 'crop_bottom': 0, 'printer_crop_left': 88, 'print_budget_seconds': None}
+        try:
+            with open('credentials.json', 'r') as f:
+                creds = json.load(f)
+                for key in settings:
+                    settings[key] = creds.get(key, settings[key])
+                if 'debug_images' in creds:
+                    settings['debug_images'] = bool(creds['debug_images'])
+        except:
+            pass  # Use defaults if file not found
+        return settings
+    
+    def get_template(self, type_number) -> ReceiptTemplate:
+        """Load (or reuse) the pre-split template for a receipt type"""
+        receipt_path = f"res/receipt/{type_number}.png"
+        if not os.path.exists(receipt_path):
+            print(f"Warning: Receipt image not found at {receipt_path}, using default")
+            receipt_path = "res/receipt/1.png"  # Default to type 1
+        
+        settings = self.load_print_settings()
+        key = (receipt_path, os.path.getmtime(receipt_path), self.name_band_top, self.name_band_bottom,
+               settings['crop_top'], settings['crop_bottom'], settings['printer_crop_left'])
+        template = _TEMPLATE_CACHE.get(key)
+        if template is None:
+            template = ReceiptTemplate(receipt_path, self.name_band_top, self.name_band_bottom,
+                                       settings['crop_top'], settings['crop_bottom'],
+                                       settings['printer_crop_left'])
+            _TEMPLATE_CACHE[key] = template
+        return template
+    
+    def render_name_band(self, template: ReceiptTemplate, name: str) -> Image.Image:
+        """Draw "{name}님을 위한" onto the template's name band rows only"""
+        band = template.band_background()
+        draw = ImageDraw.Draw(band)
+        
+        # Append "님을 위한" to the name
+        full_name = name + "님을 위한"
+        
+        # Get optimal font size for the full text (max width 497px)
+        max_text_width = 497
+        font = self.get_optimal_font_size(full_name, max_text_width)
+        
+        # Get text dimensions
+        bbox = font.getbbox(full_name)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        
+        # Center align: text should be centered on the image
+        text_x = (band.width - text_width) // 2
+        
+        # Keep the same Y position, relative to the band
+        text_y = self.name_y - text_height - template.band_top
+        
+        # Draw the text centered
+        draw.text((text_x, text_y), full_name, font=font, fill='black')
+        return band
+    
+    def printed_name_band(self, template: ReceiptTemplate, name: str):
+        """The rendered name band without the rows inside crop_top (None if all of it is cropped)"""
+        band = self.render_name_band(template, name)
+        skip = max(0, template.crop_top - template.band_top)
+        if skip >= band.height:
+            return None
+        if skip:
+            band = band.crop((0, skip, band.width, band.height))
+        return band
+    
+    def build_segments(self, data: Dict) -> List[RasterSegment]:
+        """Printer raster segments for a receipt: header, name band, body"""
+        name = data.get('이름', '고객')
+        template = self.get_template(data.get('번호', '1'))
+        band = self.printed_name_band(template, name)
+        
+        segments = [template.header]
+        if band is not None:
+            segments.append(RasterSegment(to_thermal_bitmap(band, crop_left=template.crop_left)))
+        segments.append(template.body)
+        return [seg for seg in segments if seg is not None]
+    
+    def iter_bands(self, data: Dict, band_rows: int = BAND_ROWS) -> Iterator[RasterSegment]:
+        """The receipt build_segments makes, as bands of band_rows produced one at a time
+        
+        The name band is rendered once the header has been handed out, and a
+        template not converted yet is converted band by band.
+        """
+        template = self.get_template(data.get('번호', '1'))
+        yield from template.bands('header', band_rows)
+        band = self.printed_name_band(template, data.get('이름', '고객'))
+        if band is not None:
+            yield from iter_raster_bands(band, template.crop_left, band_rows)
+        yield from template.bands('body', band_rows)
+    
+    def render_receipt(self, data: Dict) -> Image.Image:
+        """Render the full receipt in memory, exactly as the printer receives it"""
+        return stack_segments(self.build_segments(data))
+    
     def add_name_to_receipt(self, data, output_path="thermal_print.png"):
-        """Add customer name to pre-made receipt image"""
+        """Add customer name to pre-made receipt image and print it
+        
+        The receipt stays in memory from rendering to printing. output_path is
+        only written, in the background, when debug images are enabled.
+        """
         
         # Extract data
         name = data.get('이름', '고객')
         type_number = data.get('번호', '1')  # Get type number, default to 1
-        
-        # Load the corresponding receipt image
-        receipt_path = f"res/receipt/{type_number}.png"
-        if not os.path.exists(receipt_path):
-            print(f"Warning: Receipt image not found at {receipt_path}, using default")
-            receipt_path = "res/receipt/1.png"  # Default to type 1
             
         try:
-            # Open the receipt image
-            img = Image.open(receipt_path)
-            draw = ImageDraw.Draw(img)
-            
-            # Append "님을 위한" to the name
-            full_name = name + "님을 위한"
-            
-            # Get optimal font size for the full text (max width 497px)
-            max_text_width = 497
-            font = self.get_optimal_font_size(full_name, max_text_width)
-            
-            # Get text dimensions
-            bbox = font.getbbox(full_name)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            # Calculate center position
-            # Center align: text should be centered on the image
-            text_x = (img.width - text_width) // 2
-            
-            # Keep the same Y position (baseline at y=66)
-            text_y = self.name_y - text_height
-            
-            # Draw the text centered
-            draw.text((text_x, text_y), full_name, font=font, fill='black')
-            
-            # Load crop settings from credentials.json
-            crop_top = 0
-            crop_bottom = 0
-            try:
-                with open('credentials.json', 'r') as f:
-                    creds = json.load(f)
-                    crop_top = creds.get('crop_top', 0)
-                    crop_bottom = creds.get('crop_bottom', 0)
-            except:
-                pass  # Use defaults if file not found
-            
-            # Apply cropping if specified
-            if crop_top > 0 or crop_bottom > 0:
-                width, height = img.size
-                # Calculate new height
-                new_height = height - crop_top - crop_bottom
-                if new_height > 0:
-                    img = img.crop((0, crop_top, width, height - crop_bottom))
-                    print(f"Cropped image: {crop_top}px from top, {crop_bottom}px from bottom")
-            
-            # Save the modified image
-            img.save(output_path, 'PNG')
-            print(f"Receipt saved to: {output_path}")
-            print(f"Used type {type_number} receipt, added name: {full_name}")
-            
-            # Print to thermal printer if available
-            if self.thermal_printer:
-                # Try image printing first
-                if not self.print_to_thermal(output_path):
-                    # If image fails, try text printing
-                    print("Image printing failed, trying text mode...")
-                    self.print_text_receipt(data)
-            
-            return output_path
+            if self.thermal_printer and self.streams_bands():
+                # Rendered band by band while the first bands are already printing
+                print(f"Streaming type {type_number} receipt, added name: {name}님을 위한")
+                return self.print_prepared(data, None, output_path)
+            segments = self.build_segments(data)
+            print(f"Used type {type_number} receipt, added name: {name}님을 위한")
+            return self.print_prepared(data, segments, output_path)
             
         except Exception as e:
             print(f"Error processing receipt: {e}")
             return None
     
-    def print_to_thermal(self, image_path: str) -> bool:
-        """Send the receipt image to the thermal printer"""
+    def print_prepared(self, data: Dict, segments: Optional[List[RasterSegment]], output_path="thermal_print.png"):
+        """Print segments that were already rendered by build_segments
+        
+        segments=None renders the receipt as it prints (see print_bands).
+        With the scheduler enabled the job is queued and last_ticket tracks it.
+        """
+        self.last_plan = None
+        self.last_ticket = None
+        if self.save_debug_images and output_path:
+            if segments is None:
+                self.debug_sink.save(lambda: self.render_receipt(data), output_path, 'PNG')
+            else:
+                self.debug_sink.save(lambda: stack_segments(segments), output_path, 'PNG')
+        
+        # Print to thermal printer if available
+        if self.thermal_printer:
+            if self.scheduler:
+                self.last_ticket = self.scheduler.submit(lambda: self._print_job(data, segments),
+                                                         name=data.get('이름', ''))
+            else:
+                self._print_job(data, segments)
+        
+        return output_path
+    
+    def _print_job(self, data: Dict, segments: Optional[List[RasterSegment]]) -> bool:
+        if self._print_once(data, segments):
+            return True
+        if self.printers and self.backend:
+            # The failed backend is out; this job goes to the next one once
+            self.use_backend(self.printers.report_failure(self.backend))
+            if self.thermal_printer:
+                return self._print_once(data, segments)
+        return False
+    
+    def _print_once(self, data: Dict, segments: Optional[List[RasterSegment]]) -> bool:
+        if segments is None:
+            if self.streams_bands():
+                return self.print_bands(data)
+            segments = self.build_segments(data)
+        return self.print_segments(segments, data)
+    
+    def streams_bands(self) -> bool:
+        """Whether unrendered receipts are streamed: a raw-capable backend and no print budget to plan for"""
+        return bool(self.backend and self.backend.supports('raster') and self.planner.budget_s is None)
+    
+    def print_bands(self, data: Dict, band_rows: int = BAND_ROWS) -> bool:
+        """Render, convert and send the raster receipt band by band
+        
+        The printer gets the header while the name band and body are still
+        being rendered and converted.
+        """
+        if not self.thermal_printer:
+            print("Thermal printer not available")
+            return False
+        
+        sent = []
+        paper_dots = 0
+        
+        def bands():
+            nonlocal paper_dots
+            for band in self.iter_bands(data, band_rows):
+                paper_dots += band.height
+                yield band
+        
+        def chunks():
+            for chunk in band_stream(bands()):
+                sent.append(chunk)
+                yield chunk
+        
+        try:
+            print("Streaming receipt bands to thermal printer...")
+            success = self.thermal_printer.write_stream(chunks())
+            self.last_plan = self.planner.streamed(b"".join(sent), paper_dots)
+            print(f"Print plan: {self.last_plan.summary()}")
+            if success:
+                print("Receipt printed successfully!")
+            else:
+                print("Failed to print receipt")
+            return success
+        except Exception as e:
+            print(f"Thermal printing error: {e}")
+            return False
+    
+    def print_segments(self, segments: List[RasterSegment], data: Dict = None) -> bool:
+        """Send a receipt to the thermal printer in the form its backend supports
+        
+        Raw-capable backends get the print planner's choice, which fits the
+        time budget; image backends get the raster segments; text-only
+        backends get the text receipt.
+        """
+        if not self.thermal_printer:
+            print("Thermal printer not available")
+            return False
+        
+        # A printer set without a backend is driven through its image path
+        capabilities = self.backend.capabilities if self.backend else {'image'}
+        try:
+            if data is not None and 'raster' in capabilities:
+                self.last_plan = self.planner.plan(data, segments)
+                success = self.thermal_printer.write_raw(self.last_plan.stream)
+            elif data is not None and 'image' not in capabilities:
+                success = self.print_text_receipt(data)
+            else:
+                print(f"Sending {len(segments)} raster segments to thermal printer...")
+                success = self.thermal_printer.print_raster_segments(segments, cut=True)
+            if success:
+                print("Receipt printed successfully!")
+            else:
+                print("Failed to print receipt")
+            return success
+        except Exception as e:
+            print(f"Thermal printing error: {e}")
+            return False
+    
+    def print_to_thermal(self, image) -> bool:
+        """Send the receipt image (PIL image or file path) to the thermal printer"""
         if not self.thermal_printer:
             print("Thermal printer not available")
             return False
         
         try:
             print("Sending to thermal printer...")
-            success = self.thermal_printer.print_receipt(image_path, cut=True)
+            success = self.thermal_printer.print_receipt(image, cut=True)
             if success:
                 print("Receipt printed successfully!")
             else:
@@ -201,4 +466,5 @@ if __name__ == "__main__":
     }
     
     printer = ReceiptPrinter()
-    printer.add_name_to_receipt(test_data)
\ No newline at end of file
+    printer.add_name_to_receipt(test_data)
+    printer.debug_sink.flush()
\ No newline at end of file
@@ -1,20 +1,72 @@
 """Text-based receipt printer for thermal printers"""
 
 import json
-from typing import Dict
+from typing import Dict, List
+from escpos import EscPosBuilder
+from text_layout import LineWrapper, columns_for_width, display_width
 
 class ReceiptTextPrinter:
     """Generate text-based receipts for thermal printers"""
     
-    def __init__(self):
-        self.width = 32  # Standard thermal printer width
+    def __init__(self, paper_width: int = None):
+        """
+        Args:
+            paper_width: Printable width in dots (384 for 58mm, 576 for 80mm;
+                default: get_thermal_printer_width())
+        """
+        if paper_width is None:
+            from bitmap_converter import get_thermal_printer_width
+            paper_width = get_thermal_printer_width()
+        self.paper_width = paper_width
+        self.width = columns_for_width(paper_width)  # Columns at 1x size
+        self._wrappers = {}
     
     def center_text(self, text: str) -> str:
         """Center text within printer width"""
-        return text.center(self.width)
+        padding = max(0, self.width - display_width(text))
+        return " " * (padding // 2) + text + " " * (padding - padding // 2)
+    
+    def wrap(self, text: str, size: int = 1, indent: int = 0) -> List[str]:
+        """Wrap text to the lines the printer will actually print
+        
+        Args:
+            text: Text to wrap
+            size: Text width multiplier in effect
+            indent: Columns already used on the first line (continuations get the same indent)
+        """
+        columns = columns_for_width(self.paper_width, size) - indent
+        wrapper = self._wrappers.get(columns)
+        if wrapper is None:
+            wrapper = self._wrappers[columns] = LineWrapper(columns)
+        lines = wrapper.wrap(text)
+        return [lines[0]] + [" " * indent + line for line in lines[1:]] if lines else []
+    
+    def build_receipt_bytes(self, data: Dict, include_name: bool = True) -> bytes:
+        """Encode the whole text receipt as one ESC/POS byte string"""
+        builder = EscPosBuilder()
+        self.compose_receipt(data, builder, include_name)
+        return builder.getvalue()
     
     def print_receipt_text(self, data: Dict, printer) -> bool:
-        """Print receipt as formatted text"""
+        """Print receipt as formatted text
+        
+        Printers that accept raw bytes get the whole receipt in one write;
+        others are driven command by command.
+        """
+        try:
+            if hasattr(printer, 'write_raw'):
+                return printer.write_raw(self.build_receipt_bytes(data))
+            return self.compose_receipt(data, printer)
+        except Exception as e:
+            print(f"Error printing text receipt: {e}")
+            return False
+    
+    def compose_receipt(self, data: Dict, printer, include_name: bool = True) -> bool:
+        """Lay out the receipt on a printer or an EscPosBuilder
+        
+        include_name=False leaves out the closing name lines, for when the
+        name is printed as a raster band above the text.
+        """
         try:
             # Header
             printer.set_align(printer.ALIGN_CENTER)
@@ -26,7 +78,8 @@ class ReceiptTextPrinter:
             # Type name (large)
             printer.set_text_size(1, 2)
             type_name = data.get('타입명', 'Unknown')
-            printer.print_line(type_name)
+            for line in self.wrap(type_name):
+                printer.print_line(line)
             printer.print_line("")
             
             # Reset size
@@ -35,31 +88,21 @@ class ReceiptTextPrinter:
             # Type description
             printer.set_align(printer.ALIGN_CENTER)
             description = data.get('타입_설명', '')
-            if description:
-                # Wrap long description
-                words = description.split()
-                line = ""
-                for word in words:
-                    if len(line + word) > 30:
-                        printer.print_line(line.strip())
-                        line = word + " "
-                    else:
-                        line += word + " "
-                if line:
-                    printer.print_line(line.strip())
+            for line in self.wrap(description):
+                printer.print_line(line)
             
             printer.print_line("")
-            printer.print_line("-" * 32)
+            printer.print_line("-" * self.width)
             printer.print_line("")
             
             # Personal Keywords
             printer.print_line("Personal Keywords")
             keywords = data.get('성향_키워드', '')
-            if keywords:
-                printer.print_line(keywords)
+            for line in self.wrap(keywords):
+                printer.print_line(line)
             
             printer.print_line("")
-            printer.print_line("-" * 32)
+            printer.print_line("-" * self.width)
             printer.print_line("")
             
             # Your Pairing
@@ -72,10 +115,12 @@ class ReceiptTextPrinter:
             
             if food:
                 printer.print_text("Food  ")
-                printer.print_line(food)
+                for line in self.wrap(food, indent=6):
+                    printer.print_line(line)
             if drink:
                 printer.print_text("Drink ")
-                printer.print_line(drink)
+                for line in self.wrap(drink, indent=6):
+                    printer.print_line(line)
             
             printer.print_line("")
             printer.print_line("")
@@ -86,10 +131,12 @@ class ReceiptTextPrinter:
             printer.print_line("")
             
             # Customer name (large)
-            printer.set_text_size(1, 2)
-            name = data.get('이름', '고객')
-            printer.print_line(name + " 님을 위한")
-            printer.print_line("맞춤 추천")
+            if include_name:
+                printer.set_text_size(1, 2)
+                name = data.get('이름', '고객')
+                for line in self.wrap(name + " 님을 위한"):
+                    printer.print_line(line)
+                printer.print_line("맞춤 추천")
             
             # Reset and finish
             printer.set_text_size(1, 1)
@@ -0,0 +1,243 @@
+"""Receipt rendering in a separate process, rasters returned through shared memory
+
+Pillow rendering and raster packing used to run in the kiosk process, where
+they hold the GIL against the Selenium monitor and the controller loop.
+RenderWorker runs ReceiptPrinter.build_segments in a spawned process:
+
+- jobs (the parsed receipt dict) go over a multiprocessing queue
+- the worker writes the packed GS v 0 segments into a slot of a
+  SharedMemory ring and answers with offsets and sizes only, so no image
+  bytes are pickled
+- the kiosk copies the segments out, frees the slot and prints
+
+If the worker is gone or too slow, the job is rendered in-process.
+
+    python render_worker.py [receipts]    UI-thread responsiveness benchmark
+"""
+
+import itertools
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional
+
+from bitmap_converter import RasterSegment
+
+# A full receipt is about 72 bytes x 1,050 rows; room for taller templates
+SLOT_SIZE = 512 * 1024
+SLOTS = 4
+
+WARMUP_DATA = {"이름": "고객", "번호": "1"}
+
+
+def _worker_main(jobs, results, shm_name: str, slot_size: int):
+    """Worker process loop: render each job into its slot, answer with the layout"""
+    from receipt_printer import ReceiptPrinter
+
+    # spawn children share the parent's resource tracker; the parent unlinks
+    shm = shared_memory.SharedMemory(name=shm_name)
+    printer = ReceiptPrinter(enable_thermal=False)
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            job_id, slot, data = job
+            started = time.perf_counter()
+            try:
+                base = slot * slot_size
+                offset = 0
+                layout = []
+                for segment in printer.build_segments(data):
+                    packed = segment.packed
+                    if offset + len(packed) > slot_size:
+                        raise ValueError(f"receipt needs more than {slot_size} bytes")
+                    shm.buf[base + offset:base + offset + len(packed)] = packed
+                    layout.append((offset, len(packed), segment.width, segment.height))
+                    offset += len(packed)
+                results.put((job_id, layout, time.perf_counter() - started, None))
+            except Exception as e:
+                results.put((job_id, None, time.perf_counter() - started, repr(e)))
+    finally:
+        shm.close()
+
+
+class RenderWorker:
+    """Drop-in for ReceiptPrinter.build_segments, backed by a worker process"""
+
+    def __init__(self, slots: int = SLOTS, slot_size: int = SLOT_SIZE, timeout: float = 10.0):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.timeout = timeout
+        self.stats = {"jobs": 0, "fallbacks": 0, "worker_seconds": 0.0}
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._process = None
+        self._jobs = None
+        self._results = None
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        self._pending: Dict[int, Dict] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._fallback_printer = None
+
+    def start(self, warm: bool = True) -> "RenderWorker":
+        # spawn everywhere, so Linux behaves like the Windows kiosk
+        context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_size)
+        self._jobs = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(target=_worker_main, name="render-worker", daemon=True,
+                                        args=(self._jobs, self._results, self._shm.name, self.slot_size))
+        self._process.start()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+        threading.Thread(target=self._dispatch, name="render-results", daemon=True).start()
+        if warm:
+            # Loads Pillow, the font and a template before the first visitor
+            threading.Thread(target=self.build_segments, args=(WARMUP_DATA,), daemon=True).start()
+        print(f"Render worker started (pid {self._process.pid})")
+        return self
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive() and not self._stop.is_set()
+
+    def _dispatch(self):
+        """Hand each worker answer to the thread waiting for it"""
+        while not self._stop.is_set():
+            try:
+                job_id, layout, seconds, error = self._results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            # Popped and filled under one lock: a caller that times out either
+            # still finds its job pending or finds the answer in place
+            with self._pending_lock:
+                waiter = self._pending.pop(job_id, None)
+                if waiter is None:
+                    continue
+                if waiter["abandoned"]:
+                    # The caller fell back in-process; the slot is only safe to reuse now
+                    self._free_slots.put(waiter["slot"])
+                    continue
+                waiter.update(layout=layout, seconds=seconds, error=error)
+                waiter["done"].set()
+
+    def build_segments(self, data: Dict) -> List[RasterSegment]:
+        """Header, name band and body segments for a receipt"""
+        if not self.alive:
+            return self._render_in_process(data, "worker not running")
+        try:
+            slot = self._free_slots.get(timeout=self.timeout)
+        except queue.Empty:
+            return self._render_in_process(data, "no free slot")
+
+        job_id = next(self._ids)
+        waiter = {"slot": slot, "done": threading.Event(), "abandoned": False}
+        with self._pending_lock:
+            self._pending[job_id] = waiter
+        self._jobs.put((job_id, slot, dict(data)))
+
+        if not waiter["done"].wait(self.timeout):
+            with self._pending_lock:
+                if job_id in self._pending:
+                    waiter["abandoned"] = True
+                    return self._render_in_process(data, "timed out")
+            # The answer came in as the wait ran out; it is already filled in
+        try:
+            if waiter["error"]:
+                return self._render_in_process(data, waiter["error"])
+            base = slot * self.slot_size
+            segments = [RasterSegment.from_packed(bytes(self._shm.buf[base + offset:base + offset + size]),
+                                                  width, height)
+                        for offset, size, width, height in waiter["layout"]]
+            self.stats["jobs"] += 1
+            self.stats["worker_seconds"] += waiter["seconds"]
+            return segments
+        finally:
+            self._free_slots.put(slot)
+
+    def _render_in_process(self, data: Dict, reason: str) -> List[RasterSegment]:
+        print(f"Rendering in-process ({reason})")
+        self.stats["fallbacks"] += 1
+        if self._fallback_printer is None:
+            from receipt_printer import ReceiptPrinter
+            self._fallback_printer = ReceiptPrinter(enable_thermal=False)
+        return self._fallback_printer.build_segments(data)
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._stop.set()
+        try:
+            self._jobs.put(None)
+            self._process.join(timeout=3)
+        except Exception:
+            pass
+        if self._process.is_alive():
+            self._process.terminate()
+        self._shm.close()
+        self._shm.unlink()
+        self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def measure_responsiveness(render: Callable[[Dict], object], receipts: int = 24,
+                           tick: float = 0.005) -> Dict:
+    """Lateness of a polling thread (like the Selenium monitor) while receipts render"""
+    lateness: List[float] = []
+    stop = threading.Event()
+
+    def ticker():
+        expected = time.perf_counter() + tick
+        while not stop.is_set():
+            time.sleep(max(0.0, expected - time.perf_counter()))
+            now = time.perf_counter()
+            lateness.append(now - expected)
+            expected = max(expected + tick, now)
+
+    thread = threading.Thread(target=ticker)
+    thread.start()
+    started = time.perf_counter()
+    for i in range(receipts):
+        render({"이름": "김치맛강정은별로야", "번호": str(i % 24 + 1)})
+    duration = time.perf_counter() - started
+    stop.set()
+    thread.join()
+
+    lateness.sort()
+    return {
+        "receipts": receipts,
+        "render_s": round(duration, 2),
+        "tick_p50_ms": round(lateness[len(lateness) // 2] * 1000, 2),
+        "tick_p99_ms": round(lateness[int(len(lateness) * 0.99)] * 1000, 2),
+        "tick_max_ms": round(lateness[-1] * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    from receipt_printer import ReceiptPrinter
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    printer = ReceiptPrinter(enable_thermal=False)
+    print(f"Polling thread lateness (5 ms ticks) while rendering {count} receipts, "
+          f"templates loaded on first use in both cases:\n")
+    # Packing included: in-process it happens on the print path anyway
+    result = measure_responsiveness(lambda data: [s.packed for s in printer.build_segments(data)], count)
+    print("in-process:", json.dumps(result))
+    with RenderWorker() as worker:
+        worker.build_segments(WARMUP_DATA)
+        print("worker:    ", json.dumps(measure_responsiveness(worker.build_segments, count)))
+        print("worker stats:", json.dumps({k: round(v, 3) for k, v in worker.stats.items()}))
@@ -1,4 +1,5 @@
 """Simplified startup script for Windows"""
+import multiprocessing
 import os
 import sys
 import platform
@@ -74,4 +75,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # google_gems spawns a render worker process
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
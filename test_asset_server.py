@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Cache and Range behaviour of the embedded kiosk asset server"""
+
+import os
+import urllib.error
+import urllib.request
+
+from asset_server import AssetServer
+
+VIDEO = "res/Gems 트랜지션.mp4"
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_range_and_revalidation():
+    root = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(root, VIDEO), "rb") as f:
+        video = f.read()
+
+    with AssetServer(root) as server:
+        status, headers, body = fetch(server.url(VIDEO))
+        assert status == 200 and body == video
+        assert "immutable" in headers["Cache-Control"]
+        assert headers["Accept-Ranges"] == "bytes"
+
+        status, headers, body = fetch(server.url(VIDEO), {"Range": "bytes=100-199"})
+        assert status == 206 and body == video[100:200]
+        assert headers["Content-Range"] == f"bytes 100-199/{len(video)}"
+
+        status, _, body = fetch(server.url(VIDEO), {"Range": "bytes=-10"})
+        assert status == 206 and body == video[-10:]
+
+        status, _, _ = fetch(server.url(VIDEO), {"Range": f"bytes={len(video)}-"})
+        assert status == 416
+
+        status, _, body = fetch(server.url(VIDEO), {"If-None-Match": headers["ETag"]})
+        assert status == 304 and body == b""
+
+        status, _, _ = fetch(server.url("credentials.json"))
+        assert status == 404
+
+
+if __name__ == "__main__":
+    test_range_and_revalidation()
+    print("Asset server test passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Band-streamed receipts print the same paper as whole ones, converted as they go"""
+
+import receipt_printer
+from print_planner import CUT, INIT, band_stream
+from printer_backends import EmulatorBackend
+from printer_emulator import EmulatedThermalPrinter, PrinterEmulator
+from receipt_printer import ReceiptPrinter
+
+DATA = {"이름": "지수", "번호": "2"}
+
+
+def test_streamed_receipt_matches_whole_receipt():
+    printer = ReceiptPrinter(enable_thermal=False)
+    whole = PrinterEmulator()
+    whole.feed(INIT + b"".join(seg.optimized for seg in printer.build_segments(DATA)) + CUT)
+
+    receipt_printer._TEMPLATE_CACHE.clear()
+    streamed = PrinterEmulator()
+    EmulatedThermalPrinter(streamed).write_stream(band_stream(printer.iter_bands(DATA)))
+    assert streamed.rows == whole.rows and streamed.cuts == whole.cuts
+
+
+def test_template_is_converted_band_by_band_and_kept():
+    receipt_printer._TEMPLATE_CACHE.clear()
+    printer = ReceiptPrinter(enable_thermal=False)
+    bands = printer.iter_bands(DATA, band_rows=24)
+    first = next(bands)
+    template = printer.get_template(DATA["번호"])
+    # The body hasn't been converted when the first band is handed out
+    assert first.height <= 24 and "body" not in template._segments
+
+    streamed = list(bands)
+    assert all(band.height <= 24 for band in streamed)
+    settings = printer.load_print_settings()
+    reference = receipt_printer.ReceiptTemplate(template.path, template.band_top, template.band_bottom,
+                                                template.crop_top, settings["crop_bottom"], template.crop_left)
+    assert template.body.packed == reference.body.packed
+
+
+def test_unrendered_receipt_is_streamed_to_a_raw_backend():
+    emulator = PrinterEmulator()
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    printer = ReceiptPrinter(enable_thermal=False)
+    printer.use_backend(backend)
+    assert printer.streams_bands()
+
+    printer.add_name_to_receipt(DATA, None)
+    assert len(emulator.cuts) == 1
+    assert printer.last_plan.representation == "raster" and printer.last_plan.stream.startswith(INIT)
+
+
+if __name__ == "__main__":
+    test_streamed_receipt_matches_whole_receipt()
+    test_template_is_converted_band_by_band_and_kept()
+    test_unrendered_receipt_is_streamed_to_a_raw_backend()
+    print("Band stream tests passed")
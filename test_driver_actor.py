@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Every WebDriver call runs on the actor thread, in order; snapshots share one round trip"""
+
+import threading
+import time
+
+from driver_actor import SNAPSHOT_SCRIPT, DriverActor, LatencyDriver
+
+
+class RecordingDriver(LatencyDriver):
+    """Logs each call with the thread it ran on; snapshots can be held at a gate"""
+
+    def __init__(self):
+        super().__init__(latency=0.0)
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def execute_script(self, script, *args):
+        if script is not SNAPSHOT_SCRIPT:
+            self.calls.append((threading.current_thread().name, script))
+        else:
+            self.calls.append((threading.current_thread().name, "snapshot"))
+            self.entered.set()
+            self.gate.wait(5)
+        return super().execute_script(script, *args)
+
+
+def test_calls_run_on_the_actor_thread_in_order():
+    driver = RecordingDriver()
+    actor = DriverActor(driver)
+    try:
+        futures = [actor.submit(actor._execute, f"step {i}") for i in range(20)]
+        for future in futures:
+            future.result(5)
+        # A call made from the actor thread runs inline instead of deadlocking
+        assert actor.call(lambda: actor.execute_script("nested"), timeout=5) is False
+        assert [script for _, script in driver.calls] == [f"step {i}" for i in range(20)] + ["nested"]
+        assert {name for name, _ in driver.calls} == {"driver-actor"}
+    finally:
+        actor.stop()
+
+
+def test_concurrent_snapshots_share_one_round_trip():
+    driver = RecordingDriver()
+    actor = DriverActor(driver)
+    try:
+        driver.flags["printButtonClicked"] = True
+        driver.gate.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(actor.snapshot(timeout=5))) for _ in range(5)]
+        threads[0].start()
+        assert driver.entered.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        # Let the others reach the in-flight snapshot before it answers
+        time.sleep(0.2)
+        driver.gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert actor.round_trips == 1 and len(results) == 5
+        assert all(result["printButtonClicked"] for result in results)
+    finally:
+        actor.stop()
+
+
+def test_one_shot_flags_are_cleared_exactly_once():
+    driver = RecordingDriver()
+    actor = DriverActor(driver)
+    try:
+        driver.flags.update(exitCommand=True, gemsConversationEnded=True)
+        first, second = actor.snapshot(timeout=5), actor.snapshot(timeout=5)
+        assert first["exitCommand"] and not second["exitCommand"]
+        # State flags stay set until the page changes them
+        assert first["gemsConversationEnded"] and second["gemsConversationEnded"]
+        assert actor.round_trips == 2
+
+        driver.flags["exitCommand"] = True
+        assert actor.snapshot(timeout=5)["exitCommand"]
+    finally:
+        actor.stop()
+
+
+if __name__ == "__main__":
+    test_calls_run_on_the_actor_thread_in_order()
+    test_concurrent_snapshots_share_one_round_trip()
+    test_one_shot_flags_are_cleared_exactly_once()
+    print("Driver actor tests passed")
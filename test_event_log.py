@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Rollups of the visitor event log stay consistent with the raw events"""
+
+import os
+import tempfile
+import time
+
+from event_log import EventLog, hour_key
+
+RECEIPT = {"이름": "시우", "번호": "2", "타입명": "Unexpected Innovator"}
+
+
+def test_rollups_track_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(os.path.join(tmp, "events.sqlite3"))
+        ts = time.time()
+        log.record("visit", ts=ts)
+        log.record("visit", ts=ts)
+        log.record("print", RECEIPT, {"parse": 2.0, "print": 0.5, "latency": 1.5}, ts=ts)
+        log.record("parse_failure", ok=False, error="timeout", ts=ts)
+        log.record("print", RECEIPT, {"parse": 1.0, "print": 0.2, "latency": 0.5}, ok=False, ts=ts)
+
+        (hour,) = log.hourly()
+        assert hour["hour"] == hour_key(ts)
+        assert (hour["visits"], hour["prints"], hour["parse_failures"], hour["print_failures"]) == (2, 2, 1, 1)
+        assert hour["latency_ms_avg"] == 1000.0 and hour["latency_ms_max"] == 1500.0
+        assert log.types() == [{"type_number": "2", "type_name": "Unexpected Innovator", "prints": 2}]
+        log.close()
+
+
+def test_parse_average_counts_every_timed_parse():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(os.path.join(tmp, "events.sqlite3"))
+        ts = time.time()
+        log.record("print", RECEIPT, {"parse": 2.0, "latency": 2.5}, ts=ts)
+        log.record("test_print", RECEIPT, {"parse": 1.0}, ts=ts)
+        log.record("print", RECEIPT, {"parse": 3.6, "latency": 4.0}, ok=False, error="paper out", ts=ts)
+
+        (hour,) = log.hourly()
+        assert (hour["prints"], hour["test_prints"], hour["print_failures"], hour["parse_count"]) == (2, 1, 1, 3)
+        # (2000 + 1000 + 3600) / 3 parses, not / 2 prints
+        assert hour["parse_ms_avg"] == 2200.0
+        log.close()
+
+
+if __name__ == "__main__":
+    test_rollups_track_events()
+    test_parse_average_counts_every_timed_parse()
+    print("Event log tests passed")
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""The cached gem URL is only judged on Gemini's own pages"""
+
+import tempfile
+
+from gem_cache import GemUrlCache
+
+GEM_URL = "https://gemini.google.com/gem/abc123"
+
+
+def test_kiosk_screens_do_not_invalidate_the_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = GemUrlCache(tmp)
+        cache.store(GEM_URL, "Gems Station")
+        assert cache.check_page({"url": GEM_URL, "ready": True}) is True
+        assert cache.check_page({"url": GEM_URL, "ready": False}) is None
+        # Waiting / transition screens the kiosk navigated to meanwhile
+        assert cache.check_page({"url": "http://127.0.0.1:8765/transition_screen.html", "ready": False}) is None
+        assert cache.check_page({"url": "file:///C:/kiosk/waiting_screen.html", "ready": True}) is None
+        assert cache.check_page({"url": "https://gemini.google.com/app", "ready": True}) is False
+
+
+if __name__ == "__main__":
+    test_kiosk_screens_do_not_invalidate_the_cache()
+    print("Gem cache test passed")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""HttpBackend against the stand-in server, its errors, fixture record/replay and WarmClient"""
+
+import email.utils
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gemini_backends import (BackendError, FakeGeminiServer, FixtureBackend, HttpBackend, WarmClient,
+                             parse_retry_after)
+
+PROMPT = "지수님께 네그로니를 추천드려요"
+
+
+def raw_server(status: int, body: bytes, headers=None) -> ThreadingHTTPServer:
+    """Server that answers every POST with the same status, headers and body"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def raised(call) -> BackendError:
+    try:
+        call()
+    except BackendError as e:
+        return e
+    raise AssertionError("expected BackendError")
+
+
+def test_http_backend_reads_plain_and_streamed_answers():
+    with FakeGeminiServer(responder=lambda prompt: f"echo: {prompt}", stream_chunks=3) as server:
+        assert HttpBackend(server.url).generate(PROMPT) == f"echo: {PROMPT}"
+        assert HttpBackend(server.url, stream=True).generate(PROMPT) == f"echo: {PROMPT}"
+        assert server.request_count == 2
+
+
+def test_http_errors_carry_status_and_retry_after():
+    with FakeGeminiServer(retry_after=2.5) as server:
+        backend = HttpBackend(server.url, timeout=1.0)
+        server.fail_next(1, status=429)
+        error = raised(lambda: backend.generate(PROMPT))
+        assert error.status == 429 and error.retry_after == 2.5
+        server.fail_next(1, status=503)
+        error = raised(lambda: backend.generate(PROMPT))
+        assert error.status == 503 and error.retry_after is None
+        # Injected errors are one-shot
+        assert backend.generate(PROMPT) and server.error_count == 2
+
+
+def test_retry_after_http_date_is_read_as_seconds():
+    assert parse_retry_after("3") == 3.0 and parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    in_ten = email.utils.formatdate(time.time() + 10, usegmt=True)
+    assert 8 < parse_retry_after(in_ten) <= 10
+
+    server = raw_server(503, b"{}", {'Retry-After': in_ten})
+    try:
+        error = raised(lambda: HttpBackend(f"http://127.0.0.1:{server.server_port}").generate(PROMPT))
+        assert error.status == 503 and 8 < error.retry_after <= 10
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unreadable_answer_is_not_a_connection_failure():
+    server = raw_server(200, b"<html>captive portal</html>", {'Content-Type': 'text/html'})
+    try:
+        error = raised(lambda: HttpBackend(f"http://127.0.0.1:{server.server_port}").generate(PROMPT))
+        # A status tells callers the server answered; connection failures have none
+        assert error.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with FakeGeminiServer() as server:
+        server.outage = True
+        threading.Timer(1.0, setattr, (server, "outage", False)).start()
+        error = raised(lambda: HttpBackend(server.url, timeout=0.3).generate(PROMPT))
+        assert error.status is None
+
+
+def test_quota_is_enforced_with_retry_after():
+    with FakeGeminiServer(quota=(2, 60.0)) as server:
+        backend = HttpBackend(server.url)
+        backend.generate(PROMPT)
+        backend.generate(PROMPT)
+        error = raised(lambda: backend.generate(PROMPT))
+        assert error.status == 429 and 0 < error.retry_after <= 60
+        assert server.request_count == 3 and server.error_count == 1
+
+
+def test_fixtures_record_then_replay_without_the_server():
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeGeminiServer() as server:
+            recorder = FixtureBackend(tmp, HttpBackend(server.url), mode='record')
+            recorded = recorder.generate(PROMPT)
+            assert json.loads(recorded)["음료"] == "Negroni"
+
+        replay = FixtureBackend(tmp)
+        assert replay.generate(PROMPT) == recorded
+        error = raised(lambda: replay.generate("처음 보는 대화"))
+        assert FixtureBackend.fixture_key("처음 보는 대화") in str(error)
+
+
+def test_warm_client_reuses_the_warmed_connection():
+    with FakeGeminiServer() as server:
+        client = WarmClient(HttpBackend(server.url), ping_interval=60)
+        assert client.warm()
+        client.generate(PROMPT)
+        client.generate(PROMPT)
+        # The warm-up's connection served both calls
+        assert server.connection_count == 1
+        assert client.latency_report()["warm"]["calls"] == 2 and "cold" not in client.latency_report()
+
+
+def test_warm_up_does_not_spend_generate_quota():
+    with FakeGeminiServer(quota=(1, 60.0)) as server:
+        client = WarmClient(HttpBackend(server.url), ping_interval=60)
+        for _ in range(3):
+            assert client.warm()
+        assert client.pings == 3 and server.request_count == 0
+        # The only request the quota allows is still there for the visitor
+        assert client.generate(PROMPT)
+        error = raised(lambda: client.generate(PROMPT))
+        assert error.status == 429
+
+
+if __name__ == "__main__":
+    test_http_backend_reads_plain_and_streamed_answers()
+    test_http_errors_carry_status_and_retry_after()
+    test_retry_after_http_date_is_read_as_seconds()
+    test_unreadable_answer_is_not_a_connection_failure()
+    test_quota_is_enforced_with_retry_after()
+    test_fixtures_record_then_replay_without_the_server()
+    test_warm_client_reuses_the_warmed_connection()
+    test_warm_up_does_not_spend_generate_quota()
+    print("Gemini backend tests passed")
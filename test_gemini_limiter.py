@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Admission timeouts, priority order and Retry-After backoff of the Gemini limiter"""
+
+import threading
+import time
+
+from gemini_backends import BackendError, FakeGeminiServer, HttpBackend
+from gemini_limiter import PRIORITY_LIVE, PRIORITY_TEST, GeminiRateLimiter
+
+try:
+    from gemini_parser import GeminiParser
+except ImportError:
+    from gemini_parser_no_pandas import GeminiParser
+
+
+def test_acquire_times_out_while_the_only_slot_is_held():
+    limiter = GeminiRateLimiter(requests_per_minute=6000, max_concurrency=1)
+    assert limiter.acquire(10)
+    started = time.monotonic()
+    assert limiter.acquire(10, timeout=0.2) is False
+    assert 0.15 < time.monotonic() - started < 1.0
+    limiter.release()
+    assert limiter.acquire(10, timeout=0.2)
+
+
+def test_live_calls_are_admitted_before_queued_test_calls():
+    limiter = GeminiRateLimiter(requests_per_minute=6000, max_concurrency=1)
+    limiter.acquire(10)
+    order = []
+
+    def waiter(priority, label):
+        limiter.acquire(10, priority)
+        order.append(label)
+        limiter.release()
+
+    threads = [threading.Thread(target=waiter, args=(PRIORITY_TEST, "test"))]
+    threads[0].start()
+    time.sleep(0.05)
+    threads.append(threading.Thread(target=waiter, args=(PRIORITY_LIVE, "live")))
+    threads[1].start()
+    time.sleep(0.05)
+    limiter.release()
+    for t in threads:
+        t.join(2)
+    assert order == ["live", "test"]
+
+
+def test_rate_limited_call_waits_for_retry_after_and_retries():
+    limiter = GeminiRateLimiter(requests_per_minute=6000, base_delay=0.01, max_delay=0.02)
+    attempts = []
+
+    def fn():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise BackendError("quota", status=429, retry_after=0.3)
+        return "ok"
+
+    assert limiter.call(fn, 10) == "ok"
+    assert attempts[1] - attempts[0] >= 0.29
+    assert limiter.stats["rate_limited"] == 1 and limiter.stats["retries"] == 1
+
+
+def test_non_retryable_error_is_raised_at_once():
+    limiter = GeminiRateLimiter(requests_per_minute=6000)
+
+    def fn():
+        raise BackendError("bad request", status=400)
+
+    try:
+        limiter.call(fn, 10)
+        assert False, "expected BackendError"
+    except BackendError as e:
+        assert e.status == 400
+    assert limiter.stats["failed"] == 1 and limiter.in_flight == 0
+
+
+def test_quota_exhausted_parse_prints_the_local_result():
+    with FakeGeminiServer() as server:
+        server.fail_next(1, status=429)
+        parser = GeminiParser("", backend=HttpBackend(server.url, timeout=1.0), local_threshold=1.01)
+        result = parser.parse_conversation("지수님께는 네그로니를 추천드려요. Gems Station에서 만나요!")
+        assert parser.last_source == "local-quota"
+        assert (result["이름"], result["음료"]) == ("지수", "Negroni")
+
+
+if __name__ == "__main__":
+    test_acquire_times_out_while_the_only_slot_is_held()
+    test_live_calls_are_admitted_before_queued_test_calls()
+    test_rate_limited_call_waits_for_retry_after_and_retries()
+    test_non_retryable_error_is_raised_at_once()
+    test_quota_exhausted_parse_prints_the_local_result()
+    print("Gemini limiter tests passed")
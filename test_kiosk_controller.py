@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Soak test for the kiosk state machine against a simulated kiosk"""
+
+import threading
+import time
+
+from kiosk_controller import KioskController, KioskState, SimulatedKiosk, run_soak_benchmark
+from local_extractor import LocalExtractor
+from transcript_reducer import TranscriptReducer
+
+
+class StuckParser:
+    """Gemini stuck in rate-limit retries"""
+
+    def __init__(self):
+        self.reducer = TranscriptReducer.from_csv()
+        self.local = LocalExtractor()
+        self.release = threading.Event()
+
+    def parse_and_save(self, conversation_text):
+        self.release.wait(10)
+        return {"이름": "늦은", "번호": "1"}
+
+
+class RecordingRenderer:
+    def __init__(self):
+        self.rendered = []
+
+    def build_segments(self, data):
+        self.rendered.append(data)
+        return []
+
+
+class NullPrinter:
+    last_plan = last_ticket = None
+
+    def print_prepared(self, data, segments, output_path):
+        pass
+
+
+def test_visitor_cycles_do_not_leak_threads():
+    result = run_soak_benchmark(cycles=300, report_every=100, warmup=50)
+    assert result["cycles"] == 300
+    assert result["threads_max"] - result["threads_start"] <= 2
+    assert result["threads_end"] <= result["threads_start"] + 1
+
+
+def test_print_click_falls_back_to_the_local_parse_when_gemini_is_stuck():
+    parser, renderer = StuckParser(), RecordingRenderer()
+    kiosk = SimulatedKiosk()
+    kiosk.capture_transcript = lambda: "지수님께는 네그로니를 추천드려요. Gems Station에서 만나요!"
+    controller = KioskController(kiosk, parser, printer_factory=NullPrinter, renderer=renderer)
+    controller.PRINT_WAIT_SECONDS = 0.2
+    controller.enter(KioskState.CHATTING)
+    started = time.perf_counter()
+    try:
+        controller.handle_print_click()
+    finally:
+        parser.release.set()
+    assert time.perf_counter() - started < 2
+    assert renderer.rendered and renderer.rendered[-1]["이름"] == "지수"
+
+
+if __name__ == "__main__":
+    test_visitor_cycles_do_not_leak_threads()
+    test_print_click_falls_back_to_the_local_parse_when_gemini_is_stuck()
+    print("Kiosk controller soak test passed")
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Offline extraction finds the name and type, and knows when it is unsure"""
+
+from local_extractor import DEFAULT_THRESHOLD, LocalExtractor
+
+
+def test_closing_messages_parse_locally():
+    extractor = LocalExtractor()
+    cases = [
+        ("지수님을 위한 특별한 메뉴를 Gems Station에서 바로 준비해 드리겠습니다.\n"
+         "지수님께는 네그로니와 코랄 소스의 랍스터 테일을 추천드립니다.", "지수", "1"),
+        ("Gems Station에서 민준님을 위한 메뉴를 소개합니다.\n"
+         "민준님께는 네그로니와 파가든 브리오쉬 한우 버거를 추천드립니다.", "민준", "2"),
+        ("서빈버스트와 망고크림새우를 추천드려요.\n김서연님, Gems Station에서 만나요!", "김서연", "12"),
+    ]
+    for text, name, number in cases:
+        result, confidence = extractor.extract(text)
+        assert (result["이름"], result["번호"]) == (name, number), result
+        assert confidence >= DEFAULT_THRESHOLD
+
+
+def test_unclear_transcripts_fall_back_to_gemini():
+    extractor = LocalExtractor()
+    # No pairing mentioned, and no name at all
+    assert extractor.extract("지수님을 위한 메뉴를 Gems Station에서 준비해 드릴게요.")[1] < DEFAULT_THRESHOLD
+    assert extractor.extract("고객님께는 네그로니와 코랄 소스의 랍스터 테일을 추천드립니다.")[1] < DEFAULT_THRESHOLD
+
+
+if __name__ == "__main__":
+    test_closing_messages_parse_locally()
+    test_unclear_transcripts_fall_back_to_gemini()
+    print("Local extractor tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Offline parses print locally, are journaled, and reconcile once back online"""
+
+import os
+import tempfile
+
+from gemini_backends import FakeGeminiServer, HttpBackend
+from offline_mode import (MAX_RECONCILE_ATTEMPTS, ConnectivityMonitor, OfflineAwareParser, Reconciler,
+                          TranscriptJournal)
+
+try:
+    from gemini_parser import GeminiParser
+except ImportError:
+    from gemini_parser_no_pandas import GeminiParser
+
+# Drink only: not confident enough to skip Gemini
+TRANSCRIPT = "지수님께는 네그로니를 추천드려요. Gems Station에서 만나요!"
+
+
+def test_outage_is_journaled_and_reconciled():
+    network = {"up": False}
+    with FakeGeminiServer() as server, tempfile.TemporaryDirectory() as tmp:
+        parser = GeminiParser("", backend=HttpBackend(server.url, timeout=1.0), local_threshold=1.01)
+        monitor = ConnectivityMonitor(lambda: network["up"], interval=60)
+        monitor.check()
+        journal = TranscriptJournal(os.path.join(tmp, "journal.sqlite3"))
+        front = OfflineAwareParser(parser, monitor, journal)
+
+        result = front.parse_conversation(TRANSCRIPT)
+        assert (result["이름"], result["음료"]) == ("지수", "Negroni")
+        assert server.request_count == 0
+        assert journal.counts() == {"pending": 1}
+
+        network["up"] = True
+        monitor.check()
+        assert Reconciler(parser, journal, monitor).run_once() == 1
+        # The stand-in always answers 지수 / type 1, the local guess for Negroni
+        assert journal.counts() == {"match": 1}
+        journal.close()
+
+
+def test_malformed_reply_is_not_an_outage():
+    network = {"up": True}
+    with FakeGeminiServer(responder=lambda prompt: "죄송합니다, JSON은 없어요") as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        parser = GeminiParser("", backend=HttpBackend(server.url, timeout=1.0), local_threshold=1.01)
+        monitor = ConnectivityMonitor(lambda: network["up"], interval=60)
+        monitor.check()
+        journal = TranscriptJournal(os.path.join(tmp, "journal.sqlite3"))
+        front = OfflineAwareParser(parser, monitor, journal)
+
+        result = front.parse_conversation(TRANSCRIPT)
+        assert (result["이름"], result["음료"]) == ("지수", "Negroni")
+        assert monitor.online and journal.counts() == {"pending": 1}
+
+        reconciler = Reconciler(parser, journal, monitor)
+        for _ in range(MAX_RECONCILE_ATTEMPTS):
+            assert reconciler.run_once() == 0
+            assert monitor.online
+        # Given up on, not retried forever
+        assert journal.counts() == {"failed": 1} and reconciler.failed == 1
+        requests = server.request_count
+        assert reconciler.run_once() == 0 and server.request_count == requests
+        journal.close()
+
+
+if __name__ == "__main__":
+    test_outage_is_journaled_and_reconciled()
+    test_malformed_reply_is_not_an_outage()
+    print("Offline mode tests passed")
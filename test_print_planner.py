@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""The planner's choice prints within budget on the emulated serial printer"""
+
+from print_planner import PrintPlanner
+from printer_backends import EmulatorBackend
+from printer_emulator import PrinterEmulator
+from receipt_printer import ReceiptPrinter
+
+DATA = {"이름": "지수", "번호": "1", "타입명": "Universal Pleaser", "타입_설명": "설명",
+        "성향_키워드": "#열정", "음료": "Negroni", "푸드": "랍스터 테일"}
+
+
+def print_with_budget(budget_s):
+    printer = ReceiptPrinter(enable_thermal=False)
+    emulator = PrinterEmulator(baudrate=19200)
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    printer.use_backend(backend)
+    printer.planner = PrintPlanner(budget_s, baudrate=19200)
+    segments = printer.build_segments(DATA)
+    printer.print_prepared(DATA, segments, None)
+    return printer.last_plan, emulator, segments
+
+
+def test_full_raster_without_budget():
+    plan, emulator, segments = print_with_budget(None)
+    assert plan.representation == "raster"
+    assert len(emulator.rows) >= sum(seg.height for seg in segments)
+    assert abs(emulator.report()["done_s"] - plan.seconds) < 1.0
+
+
+def test_budget_picks_a_cheaper_representation_that_fits():
+    for budget_s in (6.0, 2.0):
+        plan, emulator, segments = print_with_budget(budget_s)
+        assert plan.representation != "raster" and plan.fits
+        assert emulator.report()["done_s"] <= budget_s
+        assert emulator.cuts
+
+
+def test_half_height_keeps_the_paper_length():
+    segments = ReceiptPrinter(enable_thermal=False).build_segments(DATA)
+    emulator = PrinterEmulator()
+    emulator.feed(b"".join(seg.half_height for seg in segments))
+    total = sum(seg.height for seg in segments)
+    assert total <= len(emulator.rows) <= total + len(segments)
+
+
+if __name__ == "__main__":
+    test_full_raster_without_budget()
+    test_budget_picks_a_cheaper_representation_that_fits()
+    test_half_height_keeps_the_paper_length()
+    print("Print planner tests passed")
@@ -28,6 +28,7 @@ def test_receipt_generation():
     # Generate receipt
     printer = ReceiptPrinter()
     output_path = printer.add_name_to_receipt(test_data, "test_receipt.png")
+    printer.debug_sink.flush()
     
     if output_path:
         print(f"✓ Receipt generated: {output_path}")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Backends are probed once, ranked by speed, and failed ones are skipped"""
+
+from printer_backends import EmulatorBackend, PrinterRegistry
+from printer_emulator import PrinterEmulator
+from receipt_printer import ReceiptPrinter
+
+DATA = {"이름": "지수", "번호": "1", "타입명": "Universal Pleaser", "타입_설명": "설명",
+        "성향_키워드": "#열정", "음료": "Negroni", "푸드": "랍스터 테일"}
+
+
+class TextOnlyBackend(EmulatorBackend):
+    name = "text-only"
+    capabilities = frozenset({"text", "cut"})
+
+
+def printer_with(registry):
+    printer = ReceiptPrinter(enable_thermal=False)
+    printer.printers = registry
+    printer.use_backend(registry.best())
+    return printer
+
+
+def test_fastest_healthy_backend_is_chosen():
+    slow = EmulatorBackend(PrinterEmulator(baudrate=9600))
+    fast = EmulatorBackend(PrinterEmulator(baudrate=115200))
+    unreachable = EmulatorBackend(address=("127.0.0.1", 1), baudrate=921600)
+    registry = PrinterRegistry([slow, unreachable, fast]).probe()
+    assert registry.best() is fast
+    assert not unreachable.healthy and unreachable.error
+
+
+def test_failed_backend_hands_the_job_over_once():
+    failing = EmulatorBackend(PrinterEmulator(baudrate=115200))
+    spare = PrinterEmulator()
+    registry = PrinterRegistry([failing, EmulatorBackend(spare)]).probe()
+    printer = printer_with(registry)
+    failing.printer.disconnect()
+
+    segments = printer.build_segments(DATA)
+    printer.print_prepared(DATA, segments, None)
+    assert printer.backend.emulator is spare and spare.cuts
+    printer.print_prepared(DATA, segments, None)
+    assert len(spare.cuts) == 2 and not failing.healthy
+
+
+def test_text_only_backend_prints_text_directly():
+    emulator = PrinterEmulator()
+    printer = printer_with(PrinterRegistry([TextOnlyBackend(emulator)]).probe())
+    printer.print_prepared(DATA, printer.build_segments(DATA), None)
+    assert emulator.stats["raster_bytes"] == 0 and emulator.stats["text_bytes"] > 0
+
+
+if __name__ == "__main__":
+    test_fastest_healthy_backend_is_chosen()
+    test_failed_backend_hands_the_job_over_once()
+    test_text_only_backend_prints_text_directly()
+    print("Printer backend tests passed")
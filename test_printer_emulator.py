@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""The emulator prints what the kiosk sends, times it and reports its status"""
+
+from printer_emulator import DLE_EOT, EmulatedThermalPrinter, PrinterEmulator
+from raster_optimizer import parse_raster
+from receipt_printer import ReceiptPrinter
+from receipt_text_printer import ReceiptTextPrinter
+
+DATA = {"이름": "지수", "번호": "1", "타입명": "Universal Pleaser", "타입_설명": "설명",
+        "성향_키워드": "#열정", "음료": "Negroni", "푸드": "랍스터 테일"}
+
+
+def test_raster_receipt_is_decoded_and_timed():
+    segments = ReceiptPrinter(enable_thermal=False).build_segments(DATA)
+    expected = b"".join(parse_raster(s.packed)[2] for s in segments)
+    timings = {}
+    for name in ("packed", "optimized"):
+        emulator = PrinterEmulator(baudrate=19200)
+        emulator.feed(b"\x1B\x40" + b"".join(getattr(s, name) for s in segments) + b"\x1D\x56\x01")
+        assert b"".join(emulator.rows) == expected
+        report = emulator.report()
+        assert report["cuts"] == 1
+        assert abs(report["transfer_s"] - report["bytes"] * 10 / 19200) < 0.01
+        timings[name] = report["done_s"]
+    assert timings["optimized"] < timings["packed"] / 2
+
+
+def test_status_and_offline_drop():
+    emulator = PrinterEmulator()
+    assert emulator.feed(DLE_EOT + b"\x01") == b"\x12"
+    emulator.paper_out = True
+    assert emulator.feed(DLE_EOT + b"\x01" + DLE_EOT + b"\x04") == b"\x1A\x72"
+    emulator.feed(b"lost while out of paper\n")
+    assert not emulator.rows and emulator.stats["lost_bytes"] > 0
+    emulator.paper_out = False
+    emulator.feed(b"printed\n")
+    assert emulator.stats["printed_rows"] > 0
+
+
+def test_text_receipt_over_tcp():
+    emulator = PrinterEmulator()
+    port = emulator.serve_tcp(port=0)
+    try:
+        printer = EmulatedThermalPrinter(address=("127.0.0.1", port))
+        assert printer.get_status() == 0
+        assert ReceiptTextPrinter().print_receipt_text(DATA, printer)
+        # The reply comes after everything sent before it has been processed
+        assert printer.get_status() == 0
+        emulator.paper_out = True
+        assert printer.get_status() == 0x08
+        printer.disconnect()
+    finally:
+        emulator.stop()
+    assert emulator.cuts and emulator.stats["printed_rows"] > 0
+
+
+if __name__ == "__main__":
+    test_raster_receipt_is_decoded_and_timed()
+    test_status_and_offline_drop()
+    test_text_receipt_over_tcp()
+    print("Printer emulator tests passed")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Jobs wait while the printer isn't ready and print once it is"""
+
+import threading
+import time
+
+from printer_backends import EmulatorBackend
+from printer_emulator import PrinterEmulator
+from printer_status import (COVER_OPEN, PAPER_OUT, READY, SPOOLER_DOOR_OPEN, PrintScheduler, StatusMonitor,
+                            decode_realtime, decode_spooler)
+from receipt_printer import ReceiptPrinter
+
+DATA = {"이름": "지수", "번호": "1", "타입명": "Universal Pleaser", "타입_설명": "설명",
+        "성향_키워드": "#열정", "음료": "Negroni", "푸드": "랍스터 테일"}
+
+
+def emulated_printer(emulator):
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    printer = ReceiptPrinter(enable_thermal=False)
+    printer.use_backend(backend)
+    return printer
+
+
+def test_status_is_decoded_from_realtime_replies():
+    emulator = PrinterEmulator()
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    assert backend.read_status().state == READY
+    emulator.paper_near_end = True
+    assert backend.read_status().state == READY and backend.read_status().near_end
+    emulator.cover_open = True
+    assert backend.read_status().state == COVER_OPEN
+    emulator.cover_open, emulator.paper_out = False, True
+    assert backend.read_status().state == PAPER_OUT
+    assert decode_realtime({}).state == "offline"
+    assert decode_spooler(SPOOLER_DOOR_OPEN).state == COVER_OPEN
+
+
+def test_job_is_held_until_paper_is_loaded():
+    emulator = PrinterEmulator()
+    emulator.paper_out = True
+    printer = emulated_printer(emulator)
+    printer.enable_scheduler(interval=0.05)
+    try:
+        printer.print_prepared(DATA, printer.build_segments(DATA), None)
+        ticket = printer.last_ticket
+        time.sleep(0.3)
+        # Nothing was sent into the void while the paper was out
+        assert not ticket.done and emulator.stats["lost_bytes"] == 0 and not emulator.cuts
+
+        emulator.paper_out = False
+        assert ticket.wait(5) and ticket.ok
+        assert len(emulator.cuts) == 1 and ticket.held_s > 0.2
+        states = [(old, new) for _, old, new in printer.status_monitor.transitions]
+        assert states[-2:] == [("unknown", PAPER_OUT), (PAPER_OUT, READY)]
+    finally:
+        printer.scheduler.stop()
+        printer.status_monitor.stop()
+
+
+class RecordingLog:
+    def __init__(self):
+        self.events = []
+
+    def record(self, kind, data=None, ok=True, error=None, **kwargs):
+        self.events.append((kind, data, ok, error))
+        return True
+
+
+def test_job_interrupted_by_paper_out_is_reprinted():
+    emulator = PrinterEmulator()
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    monitor = StatusMonitor(backend.read_status, interval=0.05, not_ready_interval=0.05).start()
+    scheduler = PrintScheduler(monitor).start()
+    attempts = []
+
+    def job():
+        attempts.append(1)
+        if len(attempts) == 1:
+            # Roll ran out mid-receipt: the send failed before the cut
+            emulator.paper_out = True
+            threading.Timer(0.2, setattr, (emulator, "paper_out", False)).start()
+            return False
+        backend.printer.write_raw(b"\x1B\x40receipt\n\x1D\x56\x01")
+        return True
+
+    try:
+        ticket = scheduler.submit(job, "지수")
+        assert ticket.wait(5) and ticket.ok
+        assert ticket.attempts == 2 and len(emulator.cuts) == 1
+        assert scheduler.stats["reprinted"] == 1
+    finally:
+        scheduler.stop()
+        monitor.stop()
+
+
+def test_paper_out_right_after_the_cut_does_not_reprint():
+    emulator = PrinterEmulator()
+    backend = EmulatorBackend(emulator)
+    backend.probe()
+    monitor = StatusMonitor(backend.read_status, interval=0.05, not_ready_interval=0.05).start()
+    log = RecordingLog()
+    scheduler = PrintScheduler(monitor, log).start()
+
+    def job():
+        backend.printer.write_raw(b"\x1B\x40receipt\n\x1D\x56\x01")
+        # The receipt is out; the roll ends as it is cut
+        emulator.paper_out = True
+        return True
+
+    try:
+        ticket = scheduler.submit(job, "지수")
+        assert ticket.wait(5) and ticket.ok
+        assert ticket.attempts == 1 and len(emulator.cuts) == 1
+        assert scheduler.stats == {"printed": 1, "failed": 0, "held": 0, "reprinted": 0, "stopped_after": 1}
+        assert log.events == [("print_warning", {"name": "지수", "state": PAPER_OUT}, False,
+                               "printer stopped after job")]
+        emulator.paper_out = False
+        time.sleep(0.2)
+        assert len(emulator.cuts) == 1
+    finally:
+        scheduler.stop()
+        monitor.stop()
+
+
+if __name__ == "__main__":
+    test_status_is_decoded_from_realtime_replies()
+    test_job_is_held_until_paper_is_loaded()
+    test_job_interrupted_by_paper_out_is_reprinted()
+    test_paper_out_right_after_the_cut_does_not_reprint()
+    print("Printer status tests passed")
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Optimized rasters print the same dots with fewer bytes"""
+
+from receipt_printer import ReceiptPrinter
+from raster_optimizer import parse_raster
+
+
+def replay(stream: bytes, width_bytes: int) -> bytes:
+    """Rows of dots a printer would produce from GS v 0 / ESC J commands"""
+    rows, i = [], 0
+    while i < len(stream):
+        if stream[i:i + 2] == b"\x1B\x4A":
+            rows += [bytes(width_bytes)] * stream[i + 2]
+            i += 3
+        else:
+            w, h, data = parse_raster(stream[i:])
+            rows += [data[r * w:(r + 1) * w].ljust(width_bytes, b"\0") for r in range(h)]
+            i += 8 + w * h
+    return b"".join(rows)
+
+
+def test_optimized_receipt_prints_identically():
+    printer = ReceiptPrinter(enable_thermal=False)
+    for number in ("1", "13", "24"):
+        for segment in printer.build_segments({"이름": "지수", "번호": number}):
+            width_bytes, _, data = parse_raster(segment.packed)
+            assert replay(segment.optimized, width_bytes) == data
+            assert len(segment.optimized) <= len(segment.packed)
+
+
+if __name__ == "__main__":
+    test_optimized_receipt_prints_identically()
+    print("Raster optimizer test passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Byte-exact golden test for the buffered ESC/POS text receipt"""
+
+from receipt_text_printer import ReceiptTextPrinter
+
+TEST_DATA = {
+    "이름": "시우",
+    "번호": "2",
+    "타입명": "Unexpected Innovator",
+    "타입_설명": "틀을 깨는 아이디어로 고객에게 놀라움을 선사하고, 늘 새로운 변화를 시도하는 마케터.",
+    "성향_키워드": "#열정 #변주 #모험적",
+    "음료": "Negroni",
+    "푸드": "파가든 브리오쉬 한우 버거"
+}
+
+
+def ko(text):
+    return text.encode('cp949')
+
+
+GOLDEN = b"".join([
+    b"\x1b@", b"\x1bR\x0d", b"\x1c&",                  # init, Korean charset, double-byte mode
+    b"\x1ba\x01", b"\x1d!\x11",                         # center, 2x2
+    b"\n", b"Gourmet Gems\n", b"\n",
+    b"\x1d!\x01", b"Unexpected Innovator\n", b"\n",     # 1x2
+    b"\x1d!\x00", b"\x1ba\x01",                         # 1x1, center
+    ko("틀을 깨는 아이디어로 고객에게 놀라움을 선사하고,") + b"\n",
+    ko("늘 새로운 변화를 시도하는 마케터.") + b"\n",
+    b"\n", b"-" * 48 + b"\n", b"\n",
+    b"Personal Keywords\n",
+    ko("#열정 #변주 #모험적") + b"\n",
+    b"\n", b"-" * 48 + b"\n", b"\n",
+    b"Your Pairing\n", b"\n",
+    b"\x1ba\x00",                                       # left
+    b"Food  " + ko("파가든 브리오쉬 한우 버거") + b"\n",
+    b"Drink Negroni\n",
+    b"\n", b"\n",
+    b"\x1ba\x01", b"Google Marketing Live\n", b"\n",
+    b"\x1d!\x01", ko("시우 님을 위한") + b"\n", ko("맞춤 추천") + b"\n",
+    b"\x1d!\x00", b"\x1bd\x04", b"\x1dV\x01",          # 1x1, feed 4, partial cut
+])
+
+
+class RecordingPrinter:
+    """Stands in for a raw-capable printer and records every write"""
+
+    def __init__(self):
+        self.writes = []
+
+    def write_raw(self, data):
+        self.writes.append(data)
+        return True
+
+
+def test_text_receipt_golden_bytes():
+    assert ReceiptTextPrinter(paper_width=576).build_receipt_bytes(TEST_DATA) == GOLDEN
+
+
+def test_text_receipt_is_one_write():
+    printer = RecordingPrinter()
+    assert ReceiptTextPrinter(paper_width=576).print_receipt_text(TEST_DATA, printer)
+    assert printer.writes == [GOLDEN]
+
+
+def test_wrapped_lines_fit_58mm_paper():
+    text_printer = ReceiptTextPrinter(paper_width=384)
+    lines = text_printer.wrap(TEST_DATA["타입_설명"])
+    assert all(len(line.encode('cp949')) <= 32 for line in lines)
+    assert " ".join(lines) == TEST_DATA["타입_설명"]
+    assert text_printer.wrap("#전략적 #넓은시야 #영감 #도전 #리더십") == ["#전략적 #넓은시야 #영감 #도전", "#리더십"]
+
+
+if __name__ == "__main__":
+    test_text_receipt_golden_bytes()
+    test_text_receipt_is_one_write()
+    test_wrapped_lines_fit_58mm_paper()
+    print("Text receipt golden test passed")
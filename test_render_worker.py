@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""The render worker returns the same printer bytes as in-process rendering"""
+
+import time
+
+from receipt_printer import ReceiptPrinter
+from render_worker import RenderWorker
+
+RECEIPTS = [{"이름": "지수", "번호": "1"}, {"이름": "김치맛강정은별로야", "번호": "12"}]
+
+
+def test_worker_matches_in_process_rendering():
+    printer = ReceiptPrinter(enable_thermal=False)
+    with RenderWorker(slots=2, timeout=30.0) as worker:
+        for data in RECEIPTS:
+            expected = printer.build_segments(data)
+            segments = worker.build_segments(data)
+            assert [s.packed for s in segments] == [s.packed for s in expected]
+            assert [s.bitmap.size for s in segments] == [s.bitmap.size for s in expected]
+        assert worker.stats["fallbacks"] == 0
+
+
+def test_answers_racing_the_timeout_are_used_or_dropped_cleanly():
+    printer = ReceiptPrinter(enable_thermal=False)
+    expected = [s.packed for s in printer.build_segments(RECEIPTS[0])]
+    with RenderWorker(slots=2, timeout=30.0) as worker:
+        worker.build_segments(RECEIPTS[0])
+        # Timeouts around one render's length: answers land just before, during and after the wait
+        for timeout in (0.002, 0.005, 0.01, 0.02, 0.05) * 4:
+            worker.timeout = timeout
+            assert [s.packed for s in worker.build_segments(RECEIPTS[0])] == expected
+        worker.timeout = 30.0
+        time.sleep(0.5)
+        # Abandoned slots came back once their answers arrived
+        assert [s.packed for s in worker.build_segments(RECEIPTS[0])] == expected
+        assert worker._free_slots.qsize() == 2
+
+
+if __name__ == "__main__":
+    test_worker_matches_in_process_rendering()
+    test_answers_racing_the_timeout_are_used_or_dropped_cleanly()
+    print("Render worker tests passed")
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""The transcript reducer keeps the turns the parser needs and stays bounded"""
+
+from transcript_reducer import TranscriptReducer, synthetic_transcript
+
+
+def test_reduced_transcript_is_small_and_keeps_the_pairing():
+    reducer = TranscriptReducer.from_csv()
+    short, short_stats = reducer.reduce(synthetic_transcript(5))
+    long, long_stats = reducer.reduce(synthetic_transcript(200))
+
+    assert long == short
+    assert long_stats["ratio"] < 0.05
+    assert "네그로니와 코랄 소스의 랍스터 테일" in long
+    assert "Gems Station" in long
+    assert "thumb_up" not in long and "Copy" not in long.split("\n")
+    assert len(long.split("\n")) == len(set(long.split("\n")))
+
+
+if __name__ == "__main__":
+    test_reduced_transcript_is_small_and_keeps_the_pairing()
+    print("Transcript reducer test passed")
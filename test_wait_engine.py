@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Waits on the sign-in flow only return elements a visitor could type into"""
+
+import time
+
+from google_gems import PASSWORD_SELECTORS
+from wait_engine import first_element, wait_for
+
+
+class FakeElement:
+    def __init__(self, name: str, displayed: bool = True, enabled: bool = True):
+        self.name = name
+        self.displayed = displayed
+        self.enabled = enabled
+
+    def is_displayed(self) -> bool:
+        return self.displayed
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+
+class SignInDriver:
+    """Identifier step (with Google's hidden password field) that turns into the password step"""
+
+    def __init__(self, password_step_after: float):
+        self.password_step_at = time.monotonic() + password_step_after
+        self.hidden_password = FakeElement("hiddenPassword", displayed=False)
+        self.password = FakeElement("Passwd")
+
+    def find_elements(self, by, value):
+        if time.monotonic() < self.password_step_at:
+            # Only the CSS / XPath type selectors match the hidden field
+            return [self.hidden_password] if "password'" in value else []
+        if value == "Passwd":
+            return [self.password]
+        return [self.hidden_password, self.password] if "password'" in value else []
+
+
+def test_hidden_password_field_on_the_identifier_step_is_skipped():
+    driver = SignInDriver(password_step_after=0.3)
+    started = time.monotonic()
+    element = wait_for(driver, first_element(PASSWORD_SELECTORS), 5, poll=0.02)
+    assert element is driver.password
+    assert time.monotonic() - started >= 0.3
+
+
+def test_wait_times_out_when_only_hidden_fields_exist():
+    driver = SignInDriver(password_step_after=60)
+    assert wait_for(driver, first_element(PASSWORD_SELECTORS), 0.2, poll=0.02) is None
+
+
+if __name__ == "__main__":
+    test_hidden_password_field_on_the_identifier_step_is_skipped()
+    test_wait_times_out_when_only_hidden_fields_exist()
+    print("Wait engine tests passed")
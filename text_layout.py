@@ -0,0 +1,84 @@
+"""Display-width-aware line wrapping for thermal printer text
+
+The printer's font A is 12 dots per half-width column. Hangul and other
+cp949 double-byte characters take two columns, which is exactly their
+encoded length in cp949, so the encoded length is the display width.
+"""
+
+import functools
+from typing import List
+
+# Dots per half-width column in font A (12x24)
+CHAR_DOTS = 12
+# Default line feed (ESC 2), in dots
+LINE_SPACING_DOTS = 30
+
+
+@functools.lru_cache(maxsize=4096)
+def display_width(text: str) -> int:
+    """Printed width of text in half-width columns"""
+    return len(text.encode('cp949', errors='replace'))
+
+
+def columns_for_width(paper_dots: int, size_multiplier: int = 1) -> int:
+    """Columns that fit on the paper at a text width multiplier
+
+    58mm (384 dots) -> 32 columns, 80mm (576 dots) -> 48 columns at 1x.
+    """
+    return max(1, paper_dots // (CHAR_DOTS * max(1, size_multiplier)))
+
+
+class LineWrapper:
+    """Greedy word wrapper that measures in printer columns
+
+    Whitespace-separated tokens are kept whole, which also keeps hashtag
+    keywords (#전략적) intact; only a token wider than a full line is split.
+    """
+
+    def __init__(self, columns: int):
+        self.columns = columns
+
+    def wrap(self, text: str) -> List[str]:
+        """Return the final printed lines for text"""
+        lines = []
+        line = ""
+        line_width = 0
+
+        for token in text.split():
+            token_width = display_width(token)
+
+            if token_width > self.columns:
+                # Flush, then hard-split the oversized token by characters
+                if line:
+                    lines.append(line)
+                pieces = self._split_token(token)
+                lines.extend(pieces[:-1])
+                line = pieces[-1]
+                line_width = display_width(line)
+                continue
+
+            needed = token_width if not line else line_width + 1 + token_width
+            if needed > self.columns:
+                lines.append(line)
+                line, line_width = token, token_width
+            else:
+                line = token if not line else f"{line} {token}"
+                line_width = needed
+
+        if line:
+            lines.append(line)
+        return lines
+
+    def _split_token(self, token: str) -> List[str]:
+        pieces = []
+        piece = ""
+        piece_width = 0
+        for ch in token:
+            ch_width = display_width(ch)
+            if piece and piece_width + ch_width > self.columns:
+                pieces.append(piece)
+                piece, piece_width = "", 0
+            piece += ch
+            piece_width += ch_width
+        pieces.append(piece)
+        return pieces
@@ -13,13 +13,8 @@ try:
 except ImportError:
     USE_WINDOWS_PRINTER = False
 
-# Use Windows printer if available
-if USE_WINDOWS_PRINTER:
-    ThermalPrinter = WindowsPrinter
-else:
-    # Fallback to DLL-based printer
-    class ThermalPrinter:
-        """Windows thermal printer driver for HMK-072 using HW_API.dll"""
+class DllThermalPrinter:
+    """Windows thermal printer driver for HMK-072 using HW_API.dll"""
     
     # Constants from API
     INT_SERIAL = 1
@@ -231,22 +226,28 @@ else:
             print(f"Image print error: {e}")
             return False
     
-    def print_receipt(self, image_path: str, cut: bool = True):
-        """Print a receipt image with proper formatting"""
+    def print_raster_segments(self, segments, cut: bool = True):
+        """Print raster segments (the DLL only prints files, so join them into one BMP)"""
+        from bitmap_converter import stack_segments
+        return self.print_receipt(stack_segments(segments), cut=cut)
+    
+    def print_receipt(self, image, cut: bool = True):
+        """Print a receipt image (PIL image or file path) with proper formatting"""
         if not self.is_connected:
             if not self.connect():
                 return False
         
         try:
-            # Convert to bitmap if needed
-            if image_path.lower().endswith('.png'):
-                from bitmap_converter import convert_to_bitmap
-                bmp_path = convert_to_bitmap(image_path)
-                if bmp_path:
-                    image_path = bmp_path
-                else:
-                    print("Failed to convert to bitmap")
-                    return False
+            # printImage only reads BMP files, so in-memory and PNG images
+            # are written once as a 1-bit BMP
+            if not isinstance(image, str) or image.lower().endswith('.png'):
+                from PIL import Image
+                from bitmap_converter import to_bitmap
+                img = image if not isinstance(image, str) else Image.open(image)
+                image_path = "thermal_print.bmp"
+                to_bitmap(img).save(image_path, 'BMP')
+            else:
+                image_path = image
             
             # Reset printer settings
             self.set_align(self.ALIGN_CENTER)
@@ -272,6 +273,10 @@ else:
         self.disconnect()
 
 
+# Use Windows printer if available, else the DLL
+ThermalPrinter = WindowsPrinter if USE_WINDOWS_PRINTER else DllThermalPrinter
+
+
 # Test function
 if __name__ == "__main__":
     # Example usage - LPT0 interface
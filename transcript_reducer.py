@@ -0,0 +1,191 @@
+"""Cut the scraped conversation down to the turns the parser needs
+
+CONVERSATION_TEXT_SCRIPT collects textContent from overlapping selectors,
+so every message arrives several times (the element, its container, the
+whole response), mixed with button labels and icon names. The reducer:
+
+- strips Gemini UI strings and icon ligatures
+- drops exact and near duplicate blocks, and blocks that only repeat
+  smaller blocks already kept (a container of nested messages)
+- keeps the blocks that mention a name (…님), a menu item or type from
+  the CSV, or the closing "Gems Station" message
+- caps the result, keeping the end of the conversation
+
+so the prompt stays about the same size however long the visitor chatted.
+
+    python transcript_reducer.py    reduction on a synthetic long chat
+"""
+
+import difflib
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pairing_table import DEFAULT_CSV_PATH, compact, menu_terms
+
+# Whole blocks that are Gemini chrome, not conversation
+UI_STRINGS = {
+    "gemini", "gems", "copy", "복사", "share", "공유", "공유 및 내보내기", "edit", "수정",
+    "show drafts", "답안 더보기", "show thinking", "생각하는 과정 표시", "regenerate",
+    "다시 생성", "modify response", "대답 수정", "more", "더보기", "listen", "듣기",
+    "good response", "bad response", "좋은 응답", "나쁜 응답", "google 검색",
+    "double-check response", "대답 재확인", "conversation with gemini", "gemini와의 대화",
+}
+
+# Material icon ligatures that leak into textContent
+ICON_PATTERN = re.compile(
+    r"\b(?:thumb_up|thumb_down|content_copy|more_vert|more_horiz|volume_up|expand_more|"
+    r"expand_less|share|edit|refresh|tune|mic|send|keyboard_arrow_down|keyboard_arrow_up|"
+    r"check_circle|done_all|stop_circle|arrow_upward)\b")
+
+# Footer disclaimers, matched as prefixes
+UI_PREFIXES = (
+    "gemini can make mistakes",
+    "gemini는 인물 등에 관한",
+    "gemini은(는) 인물 등에 관한",
+    "gemini may display inaccurate info",
+)
+
+NAME_PATTERN = re.compile(r"[가-힣A-Za-z]{1,10}\s?님|이름")
+CLOSING_MARKER = "gemsstation"
+
+DEFAULT_MAX_CHARS = 3000
+NEAR_DUPLICATE_RATIO = 0.9
+# A block is a container when less than this much of it is new text
+COVERED_FRACTION = 0.15
+
+
+class TranscriptReducer:
+    """Dedupes, strips and filters a scraped transcript before the prompt"""
+
+    def __init__(self, terms: Iterable[str], max_chars: int = DEFAULT_MAX_CHARS):
+        self.terms = [t for t in dict.fromkeys(compact(t) for t in terms) if len(t) >= 2]
+        self.max_chars = max_chars
+
+    @classmethod
+    def from_csv(cls, csv_path: str = DEFAULT_CSV_PATH, **kwargs) -> "TranscriptReducer":
+        return cls(menu_terms(csv_path), **kwargs)
+
+    def reduce(self, text: str) -> Tuple[str, Dict]:
+        """(reduced text, stats); stats['ratio'] is reduced/original chars"""
+        text = text or ""
+        stats = {"original_chars": len(text), "blocks": 0, "ui": 0, "duplicates": 0,
+                 "irrelevant": 0, "truncated": 0}
+
+        blocks = []
+        for line in text.splitlines():
+            block = self._strip_ui(line)
+            if line.strip():
+                stats["blocks"] += 1
+                if not block:
+                    stats["ui"] += 1
+            if block:
+                blocks.append(block)
+
+        unique = self._dedupe(blocks)
+        stats["duplicates"] = len(blocks) - len(unique)
+
+        relevant = [b for b in unique if self.is_relevant(b)]
+        stats["irrelevant"] = len(unique) - len(relevant)
+        # Nothing recognizable: better to send the deduped chat than nothing
+        kept = self._fit(relevant or unique, stats)
+
+        reduced = "\n".join(kept)
+        stats["reduced_chars"] = len(reduced)
+        stats["ratio"] = round(len(reduced) / len(text), 3) if text else 1.0
+        return reduced, stats
+
+    @staticmethod
+    def _strip_ui(line: str) -> str:
+        block = " ".join(ICON_PATTERN.sub(" ", line).split())
+        lowered = block.lower()
+        if lowered in UI_STRINGS or lowered.startswith(UI_PREFIXES):
+            return ""
+        return block
+
+    @staticmethod
+    def _dedupe(blocks: List[str]) -> List[str]:
+        """Blocks in original order, without repeats, near repeats or containers"""
+        keys = [compact(b) for b in blocks]
+        kept_keys: List[str] = []
+        kept_index = set()
+        # Shortest first, so a container is judged against the messages it nests
+        for i in sorted(range(len(blocks)), key=lambda i: len(keys[i])):
+            key = keys[i]
+            if not key or key in kept_keys:
+                continue
+            remainder = key
+            for k in kept_keys:
+                if k in remainder:
+                    remainder = remainder.replace(k, "")
+            if len(remainder) <= len(key) * COVERED_FRACTION:
+                continue
+            if any(_similar(key, k) for k in kept_keys):
+                continue
+            kept_keys.append(key)
+            kept_index.add(i)
+        return [blocks[i] for i in sorted(kept_index)]
+
+    def is_relevant(self, block: str) -> bool:
+        key = compact(block)
+        return (CLOSING_MARKER in key
+                or bool(NAME_PATTERN.search(block))
+                or any(term in key for term in self.terms))
+
+    def _fit(self, blocks: List[str], stats: Dict) -> List[str]:
+        """Latest blocks that fit max_chars (the closing message is at the end)"""
+        kept, total = [], 0
+        for block in reversed(blocks):
+            if total + len(block) + 1 > self.max_chars and kept:
+                break
+            kept.append(block[-self.max_chars:])
+            total += len(block) + 1
+        stats["truncated"] = len(blocks) - len(kept)
+        return kept[::-1]
+
+
+def _similar(a: str, b: str) -> bool:
+    if min(len(a), len(b)) < NEAR_DUPLICATE_RATIO * max(len(a), len(b)):
+        return False
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return matcher.quick_ratio() >= NEAR_DUPLICATE_RATIO and matcher.ratio() >= NEAR_DUPLICATE_RATIO
+
+
+def format_stats(stats: Dict) -> str:
+    return (f"{stats['original_chars']:,} -> {stats['reduced_chars']:,} chars "
+            f"({stats['ratio']:.0%}; {stats['duplicates']} duplicate, {stats['ui']} UI, "
+            f"{stats['irrelevant']} irrelevant, {stats['truncated']} truncated blocks dropped)")
+
+
+def synthetic_transcript(turns: int = 40) -> str:
+    """Long chat as CONVERSATION_TEXT_SCRIPT scrapes it: nested duplicates and chrome"""
+    small_talk = [
+        "오늘 날씨가 정말 좋네요. 어떤 분위기의 하루를 보내고 계신가요?",
+        "주말에는 보통 집에서 쉬는 편이에요",
+        "새로운 일에 도전하는 걸 좋아하시는군요! 조금 더 여쭤볼게요.",
+        "친구들과 여행 계획을 세우는 중이에요",
+    ]
+    messages = ["안녕하세요! Gems에 오신 것을 환영합니다. 성함이 어떻게 되시나요?", "지수예요",
+                "지수님, 반갑습니다!"]
+    messages += [small_talk[i % len(small_talk)] for i in range(turns)]
+    messages += ["지수님께는 네그로니와 코랄 소스의 랍스터 테일을 추천드립니다.",
+                 "지수님을 위한 특별한 메뉴를 Gems Station에서 바로 준비해 드리겠습니다."]
+
+    lines = []
+    for message in messages:
+        lines += [message, message, "thumb_up thumb_down content_copy more_vert", "Copy", "Show drafts"]
+    lines.append("".join(messages))  # the whole chat container
+    lines.append("Gemini can make mistakes, so double-check it")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    import time
+
+    reducer = TranscriptReducer.from_csv()
+    for turns in (5, 40, 200):
+        transcript = synthetic_transcript(turns)
+        started = time.perf_counter()
+        reduced, stats = reducer.reduce(transcript)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{turns:3d} turns: {format_stats(stats)} in {elapsed:.1f} ms")
+    print("\n" + reduced)
@@ -0,0 +1,226 @@
+"""Build, choose and measure the transition animation variants
+
+Chrome runs without GPU on the Windows kiosk, so the full-resolution MP4
+is decoded and scaled on the CPU exactly while the receipt is parsed and
+rendered. `build` transcodes the source into cheaper variants with ffmpeg:
+
+    webm    VP8, 960px wide, 24 fps, low bitrate
+    sprite  12 fps JPEG frame grid played by stepping background-position
+
+`measure` plays each variant in the kiosk Chrome and records the CPU
+time Chrome spent; the runtime then picks the cheapest measured variant.
+
+    python transition_assets.py build
+    python transition_assets.py measure [repeats]
+"""
+
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_VIDEO = "res/Gems 트랜지션.mp4"
+OUTPUT_DIR = "res/transition"
+WEBM_PATH = f"{OUTPUT_DIR}/transition.webm"
+SPRITE_PATH = f"{OUTPUT_DIR}/sprite.jpg"
+SPRITE_META_PATH = f"{OUTPUT_DIR}/sprite.json"
+MEASUREMENTS_PATH = f"{OUTPUT_DIR}/variants.json"
+
+# Files each variant needs, relative to ROOT
+VARIANT_FILES = {
+    "webm": (WEBM_PATH,),
+    "sprite": (SPRITE_PATH, SPRITE_META_PATH),
+    "mp4": (SOURCE_VIDEO,),
+    "gif": ("res/Gems 트랜지션.gif",),
+}
+
+# Used when nothing has been measured yet
+DEFAULT_PREFERENCE = ("webm", "mp4", "gif")
+
+WEBM_WIDTH = 960
+WEBM_FPS = 24
+SPRITE_WIDTH = 480
+SPRITE_FPS = 12
+SPRITE_COLUMNS = 8
+
+
+def _path(relative_path: str) -> str:
+    return os.path.join(ROOT, relative_path)
+
+
+def available_variants() -> List[str]:
+    return [name for name, files in VARIANT_FILES.items()
+            if all(os.path.exists(_path(f)) for f in files)]
+
+
+def load_measurements() -> Dict[str, Dict]:
+    try:
+        with open(_path(MEASUREMENTS_PATH), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def choose_variant() -> str:
+    """Variant for the kiosk: $GEMS_TRANSITION_VARIANT, cheapest measured, or default order"""
+    available = available_variants()
+    override = os.environ.get('GEMS_TRANSITION_VARIANT')
+    if override in available:
+        return override
+
+    measured = {name: m for name, m in load_measurements().items()
+                if name in available and m.get('cpu_seconds') is not None}
+    if measured:
+        return min(measured, key=lambda name: measured[name]['cpu_seconds'])
+
+    for name in DEFAULT_PREFERENCE:
+        if name in available:
+            return name
+    return "mp4"
+
+
+# Build
+
+def _run(cmd: List[str]):
+    print(" ".join(f'"{c}"' if " " in c else c for c in cmd))
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def probe_duration(video_path: str) -> float:
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", video_path],
+        check=True, capture_output=True, text=True).stdout
+    return float(out.strip())
+
+
+def build_webm(source: str, output: str):
+    _run(["ffmpeg", "-y", "-i", source, "-an",
+          "-vf", f"scale={WEBM_WIDTH}:-2,fps={WEBM_FPS}",
+          "-c:v", "libvpx", "-b:v", "900k", "-crf", "30", "-deadline", "good",
+          "-auto-alt-ref", "0", output])
+
+
+def build_sprite(source: str, output: str, meta_output: str):
+    duration = probe_duration(source)
+    frames = max(1, int(round(duration * SPRITE_FPS)))
+    rows = math.ceil(frames / SPRITE_COLUMNS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Frame size first, from one scaled frame
+        probe_frame = os.path.join(tmp, "probe.png")
+        _run(["ffmpeg", "-y", "-i", source, "-vf", f"scale={SPRITE_WIDTH}:-2",
+              "-frames:v", "1", probe_frame])
+        from PIL import Image
+        with Image.open(probe_frame) as im:
+            frame_w, frame_h = im.size
+
+    _run(["ffmpeg", "-y", "-i", source, "-an",
+          "-vf", f"fps={SPRITE_FPS},scale={SPRITE_WIDTH}:-2,tile={SPRITE_COLUMNS}x{rows}",
+          "-frames:v", "1", "-q:v", "5", output])
+
+    meta = {
+        "frames": frames, "columns": SPRITE_COLUMNS, "rows": rows,
+        "frame_width": frame_w, "frame_height": frame_h,
+        "fps": SPRITE_FPS, "src": os.path.basename(output),
+    }
+    with open(meta_output, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def build(source: str = SOURCE_VIDEO):
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        print("ffmpeg/ffprobe not found on PATH - install ffmpeg to build transition variants")
+        return False
+    os.makedirs(_path(OUTPUT_DIR), exist_ok=True)
+    source_path = _path(source)
+    build_webm(source_path, _path(WEBM_PATH))
+    build_sprite(source_path, _path(SPRITE_PATH), _path(SPRITE_META_PATH))
+    for name in ("mp4", "webm", "sprite"):
+        size = sum(os.path.getsize(_path(f)) for f in VARIANT_FILES[name])
+        print(f"{name:7s} {size / 2**20:6.2f} MB")
+    return True
+
+
+# Measurement
+
+def _chrome_processes(driver):
+    import psutil
+    root = psutil.Process(driver.service.process.pid)
+    return [root] + root.children(recursive=True)
+
+
+def _cpu_seconds(processes, readings: Dict) -> float:
+    """Total CPU seconds; a process that has exited counts with its last reading"""
+    for process in processes:
+        try:
+            times = process.cpu_times()
+            readings[process] = times.user + times.system
+        except Exception:
+            pass
+    return sum(readings.values())
+
+
+def measure_variant(driver, transition_url: str, timeout: float = 15.0) -> Dict:
+    """CPU seconds Chrome spends playing one transition"""
+    processes = _chrome_processes(driver)
+    readings = {}
+    cpu_before = _cpu_seconds(processes, readings)
+    started = time.perf_counter()
+    driver.get(transition_url)
+    while time.perf_counter() - started < timeout:
+        if driver.execute_script("return window.transitionComplete || false;"):
+            break
+        time.sleep(0.05)
+    wall = time.perf_counter() - started
+    # Renderer processes can be spawned by the navigation itself
+    cpu = _cpu_seconds(set(processes) | set(_chrome_processes(driver)), readings) - cpu_before
+    return {"cpu_seconds": cpu, "wall_seconds": wall, "cpu_percent": 100.0 * cpu / wall}
+
+
+def measure(repeats: int = 3) -> Dict[str, Dict]:
+    """Play every available variant in the kiosk Chrome and save the results"""
+    from asset_server import get_asset_server
+    from google_gems import setup_driver
+
+    server = get_asset_server()
+    if not server:
+        raise RuntimeError("asset server is required to measure variants")
+    driver = setup_driver()
+    results = {}
+    try:
+        for name in available_variants():
+            url = server.url("transition_screen.html") + f"?variant={name}"
+            driver.get(url)  # warm the HTTP cache, like the idle preload does
+            time.sleep(1)
+            runs = [measure_variant(driver, url) for _ in range(repeats)]
+            results[name] = {
+                key: round(sum(r[key] for r in runs) / len(runs), 3)
+                for key in ("cpu_seconds", "wall_seconds", "cpu_percent")
+            }
+            print(f"{name:7s} cpu={results[name]['cpu_seconds']:.2f}s "
+                  f"({results[name]['cpu_percent']:.0f}% of a core over {results[name]['wall_seconds']:.1f}s)")
+    finally:
+        driver.quit()
+
+    os.makedirs(_path(OUTPUT_DIR), exist_ok=True)
+    with open(_path(MEASUREMENTS_PATH), 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved to {MEASUREMENTS_PATH}; kiosk will use '{choose_variant()}'")
+    return results
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        sys.exit(0 if build() else 1)
+    elif command == "measure":
+        measure(int(sys.argv[2]) if len(sys.argv) > 2 else 3)
+    else:
+        print(__doc__)
@@ -0,0 +1,135 @@
+"""Condition-based waits and a boot timeline for the Selenium startup path
+
+Every wait has its own deadline and returns as soon as the page is ready,
+instead of sleeping a fixed time. Steps are recorded on a BootTimeline so
+the startup report shows where boot time actually went.
+"""
+
+import contextlib
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+GEMINI_URL = "https://gemini.google.com/"
+
+# Google session cookies that mean the profile is already signed in
+SESSION_COOKIES = ("__Secure-1PSID", "__Secure-3PSID", "SID")
+
+
+class BootTimeline:
+    """Records how long each startup step took"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps: List[Tuple[int, str, float]] = []
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        """Time the enclosed block as one step (steps may nest)"""
+        index = len(self.steps)
+        self.steps.append((self._depth, name, 0.0))
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.steps[index] = (self._depth, name, time.perf_counter() - start)
+
+    def report(self) -> str:
+        lines = ["Boot timeline:"]
+        for depth, name, duration in self.steps:
+            lines.append(f"  {'  ' * depth}{name:<{44 - 2 * depth}} {duration:7.2f}s")
+        lines.append(f"  {'total':<44} {time.perf_counter() - self.started:7.2f}s")
+        return "\n".join(lines)
+
+
+boot_timeline = BootTimeline()
+
+
+def wait_for(driver, condition: Callable, timeout: float, poll: float = 0.1,
+             ignored=(WebDriverException,)):
+    """Wait until condition(driver) is truthy; returns its value, or None on timeout"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll,
+                             ignored_exceptions=ignored).until(condition)
+    except TimeoutException:
+        return None
+
+
+# Conditions (callables taking the driver, like selenium's expected_conditions)
+
+def document_ready(driver) -> bool:
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def url_startswith(*prefixes: str) -> Callable:
+    def condition(driver):
+        url = driver.current_url
+        return url if url.startswith(prefixes) else False
+    return condition
+
+
+def url_contains(*fragments: str) -> Callable:
+    def condition(driver):
+        url = driver.current_url
+        return url if any(f in url for f in fragments) else False
+    return condition
+
+
+def first_element(locators: Sequence[Tuple[str, str]]) -> Callable:
+    """Condition returning the first visible, enabled element for any of the locators
+
+    Hidden matches are skipped: Google's sign-in identifier step already
+    carries a hidden password input before the password step exists.
+    """
+    def condition(driver):
+        for by, value in locators:
+            for element in driver.find_elements(by, value):
+                if element.is_displayed() and element.is_enabled():
+                    return element
+        return False
+    return condition
+
+
+def js_truthy(script: str) -> Callable:
+    """Condition returning the value of a script once it is truthy"""
+    def condition(driver):
+        return driver.execute_script(script) or False
+    return condition
+
+
+def any_of(*conditions: Callable) -> Callable:
+    """Condition returning (index, value) of the first condition that holds"""
+    def condition(driver):
+        for index, cond in enumerate(conditions):
+            try:
+                value = cond(driver)
+            except WebDriverException:
+                continue
+            if value:
+                return index, value
+        return False
+    return condition
+
+
+def has_session_cookies(driver) -> bool:
+    """Whether the browser profile already holds a Google session
+
+    Reads the cookie jar over the DevTools protocol, so it works before any
+    Google page is loaded. Returns False when the driver can't tell.
+    """
+    try:
+        cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+    except Exception:
+        return False
+    now = time.time()
+    for cookie in cookies:
+        if cookie.get('name') in SESSION_COOKIES and cookie.get('domain', '').endswith('google.com'):
+            expires = cookie.get('expires', -1)
+            if expires in (-1, 0) or expires > now:
+                return True
+    return False
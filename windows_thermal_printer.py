@@ -27,6 +27,8 @@ class WindowsThermalPrinter:
         """
         self.printer_name = printer_name
         self.is_connected = False
+        # Link speed, only used to estimate raster transfer times
+        self.baudrate = 19200
         
         if not WINDOWS_PRINT_AVAILABLE:
             raise ImportError("pywin32 is required. Install with: pip install pywin32")
@@ -63,8 +65,33 @@ class WindowsThermalPrinter:
             print(f"Error checking printer: {e}")
             return False
     
+    def spooler_status(self) -> int:
+        """The spooler's PRINTER_STATUS_* flags for this printer (0 when ready), -1 if unreachable"""
+        try:
+            handle = win32print.OpenPrinter(self.printer_name)
+            try:
+                return win32print.GetPrinter(handle, 2)['Status']
+            finally:
+                win32print.ClosePrinter(handle)
+        except Exception as e:
+            print(f"Error reading printer status: {e}")
+            return -1
+    
     def print_raw_text(self, text: str, encoding: str = 'cp949') -> bool:
         """Print raw text to printer"""
+        # Convert text to bytes
+        if isinstance(text, str):
+            data = text.encode(encoding)
+        else:
+            data = text
+        return self.write_stream([data], "Text Print")
+    
+    def write_stream(self, chunks, title: str = "Raster Print") -> bool:
+        """Send bytes as one RAW job, each chunk written as soon as chunks produces it
+        
+        With the printer's spooling set to "Start printing immediately", the
+        printer receives the first chunks while later ones are still being made.
+        """
         if not self.is_connected:
             print("Printer not connected")
             return False
@@ -74,20 +101,15 @@ class WindowsThermalPrinter:
             hprinter = win32print.OpenPrinter(self.printer_name)
             
             # Start document
-            job_info = ("Text Print", None, "RAW")
+            job_info = (title, None, "RAW")
             hjob = win32print.StartDocPrinter(hprinter, 1, job_info)
             
             try:
                 win32print.StartPagePrinter(hprinter)
                 
-                # Convert text to bytes
-                if isinstance(text, str):
-                    data = text.encode(encoding)
-                else:
-                    data = text
-                    
                 # Send data
-                win32print.WritePrinter(hprinter, data)
+                for chunk in chunks:
+                    win32print.WritePrinter(hprinter, chunk)
                 
                 win32print.EndPagePrinter(hprinter)
                 
@@ -101,34 +123,33 @@ class WindowsThermalPrinter:
             print(f"Error printing text: {e}")
             return False
     
-    def print_bitmap(self, image_path: str) -> bool:
-        """Print bitmap image using Windows GDI"""
+    def print_bitmap(self, image) -> bool:
+        """Print bitmap image using Windows GDI
+        
+        Args:
+            image: PIL image or path to an image file. Images already at the
+                printer's dot width are treated as printer-ready and not cropped.
+        """
         if not self.is_connected:
             print("Printer not connected")
             return False
-            
-        if not os.path.exists(image_path):
-            print(f"Image not found: {image_path}")
-            return False
+        
+        if isinstance(image, str):
+            if not os.path.exists(image):
+                print(f"Image not found: {image}")
+                return False
+            image = Image.open(image)
             
         try:
-            # Convert to BMP if needed
-            if not image_path.lower().endswith('.bmp'):
-                from bitmap_converter import convert_to_bitmap
-                bmp_path = convert_to_bitmap(image_path)
-                if not bmp_path:
-                    print("Failed to convert to bitmap")
-                    return False
-                image_path = bmp_path
+            # Convert to 1-bit in memory (no intermediate BMP file)
+            from bitmap_converter import to_bitmap, get_thermal_printer_width
+            img = to_bitmap(image)
+            print(f"Original image: {img.size[0]}x{img.size[1]} pixels")
             
             # Create printer device context
             hdc = win32ui.CreateDC()
             hdc.CreatePrinterDC(self.printer_name)
             
-            # Open image
-            img = Image.open(image_path)
-            print(f"Original image: {img.size[0]}x{img.size[1]} pixels")
-            
             # Load crop amount from credentials.json or use default
             crop_left = 88  # Default value
             try:
@@ -142,7 +163,7 @@ class WindowsThermalPrinter:
             # Simple crop from left to compensate for printer margin
             width, height = img.size
             
-            if width > crop_left:
+            if width != get_thermal_printer_width() and width > crop_left:
                 img = img.crop((crop_left, 0, width, height))
                 print(f"Cropped {crop_left}px from left side")
                 print(f"New image size: {img.size[0]}x{img.size[1]} pixels")
@@ -190,9 +211,24 @@ class WindowsThermalPrinter:
             print(f"Error printing bitmap: {e}")
             return False
     
-    def print_receipt(self, image_path: str, cut: bool = True) -> bool:
-        """Print receipt image"""
-        success = self.print_bitmap(image_path)
+    def print_raster_segments(self, segments, cut: bool = True) -> bool:
+        """Print raster segments as ESC/POS raster commands in one RAW job
+        
+        Args:
+            segments: RasterSegment strips, top to bottom, already at printer width
+            cut: Feed and cut after the last segment
+        """
+        from raster_optimizer import format_report, raster_report
+        optimized = [seg.optimized for seg in segments]
+        print(f"Raster: {format_report(raster_report([seg.packed for seg in segments], optimized, self.baudrate))}")
+        data = b"\x1B\x40" + b"".join(optimized)
+        if cut:
+            data += b"\n\n\n\x1D\x56\x01"
+        return self.print_raw_text(data)
+    
+    def print_receipt(self, image, cut: bool = True) -> bool:
+        """Print receipt image (PIL image or file path)"""
+        success = self.print_bitmap(image)
         
         if success and cut:
             # Send cut command as raw data
@@ -238,8 +274,9 @@ class ThermalPrinter(WindowsThermalPrinter):
     CUT_BM = 2
     
     def __init__(self, port: int = 0, baudrate: int = 19200, interface: str = 'SERIAL'):
-        # Ignore port/baudrate/interface - use Windows printer name
+        # Ignore port/interface - use Windows printer name; baudrate only feeds transfer estimates
         super().__init__("HWASUNG HMK-072")
+        self.baudrate = baudrate
     
     def connect(self) -> bool:
         """Check if printer is available"""
@@ -250,13 +287,17 @@ class ThermalPrinter(WindowsThermalPrinter):
         pass
     
     def get_status(self) -> int:
-        """Get printer status"""
-        return 0 if self.is_connected else -1
+        """Spooler status flags: 0 when ready, -1 if not connected"""
+        return self.spooler_status() if self.is_connected else -1
     
     def print_text(self, text: str, encoding: str = 'cp949'):
         """Print text string"""
         return self.print_raw_text(text, encoding)
     
+    def write_raw(self, data: bytes) -> bool:
+        """Send pre-built ESC/POS bytes as a single print job"""
+        return self.print_raw_text(data)
+    
     def print_line(self, text: str = ""):
         """Print text with newline"""
         return self.print_raw_text(text + "\n")
@@ -281,9 +322,9 @@ class ThermalPrinter(WindowsThermalPrinter):
         """Cut paper"""
         self.print_raw_text("\x1D\x56\x01")  # Partial cut
     
-    def print_image(self, image_path: str, line_count: int = 0):
-        """Print image file"""
-        return self.print_bitmap(image_path)
+    def print_image(self, image, line_count: int = 0):
+        """Print image (PIL image or file path)"""
+        return self.print_bitmap(image)
 
 
 if __name__ == "__main__":